@@ -9,3 +9,62 @@ CREATE TABLE IF NOT EXISTS text_data (
 
 );
 
+
+-- File contents for delta uploads, addressed by SHA-256 of the content
+
+CREATE TABLE IF NOT EXISTS file_blobs (
+
+    digest TEXT PRIMARY KEY,
+
+    content TEXT NOT NULL,
+
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+
+);
+
+
+-- Chunk uploads name their collection and seq. Each (collection_id, seq) is
+
+-- stored once, so a chunk sent again after a lost response or by
+
+-- `weaver resume` is not duplicated. Rows without a collection are unaffected.
+
+ALTER TABLE text_data ADD COLUMN IF NOT EXISTS collection_id TEXT;
+
+ALTER TABLE text_data ADD COLUMN IF NOT EXISTS seq INTEGER;
+
+CREATE UNIQUE INDEX IF NOT EXISTS text_data_collection_seq ON text_data (collection_id, seq);
+
+
+-- Batched uploads stage their chunks here until the CLI completes the
+
+-- collection, which is then reassembled into one text_data row (seq NULL)
+
+CREATE TABLE IF NOT EXISTS collection_chunks (
+
+    collection_id TEXT NOT NULL,
+
+    seq INTEGER NOT NULL,
+
+    content TEXT NOT NULL,
+
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+
+    PRIMARY KEY (collection_id, seq)
+
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS text_data_collection ON text_data (collection_id) WHERE seq IS NULL;
+
+
+-- The listing reads only metadata, never the content: size in bytes and the
+
+-- number of "File:" records, counted by the separator line under each header
+
+ALTER TABLE text_data ADD COLUMN IF NOT EXISTS size INTEGER GENERATED ALWAYS AS (octet_length(content)) STORED;
+
+ALTER TABLE text_data ADD COLUMN IF NOT EXISTS file_count INTEGER GENERATED ALWAYS AS ((char_length(content) - char_length(replace(content, E'\n' || repeat('=', 80) || E'\n', ''))) / 82) STORED;
+
+-- Keyset pagination of the listing on (created_at, id)
+
+CREATE INDEX IF NOT EXISTS text_data_created_at_id ON text_data (created_at, id);
@@ -0,0 +1,151 @@
+import express, { Router } from "express";
+import { Server } from "socket.io";
+import { DIGEST_PATTERN, sha256 } from "./delta";
+import {
+  ACCEPTED_ENCODINGS,
+  COLLECTION_ID_PATTERN,
+  DecodeError,
+  decodeBody,
+  decoders,
+} from "./encoding";
+import { Store } from "./store";
+
+// Batched collection uploads: the CLI posts its chunks in batches, each
+// written with one multi-row insert, then completes the collection. The
+// staged chunks are joined into a single text row and clients get a small
+// "collectionReady" event instead of the content. Batches and completion
+// are idempotent, so either may be sent again after a lost response.
+
+interface BatchChunk {
+  seq: number;
+  content?: string;
+  digest?: string;
+}
+
+// Batch bodies are JSON, compressed with any of the chunk encodings
+const rawBody = express.raw({ type: () => true, inflate: false, limit: "50mb" });
+
+function parseBatch(body: any): BatchChunk[] | null {
+  const chunks = body?.chunks;
+  if (!Array.isArray(chunks) || chunks.length === 0) return null;
+  for (const chunk of chunks) {
+    if (!Number.isInteger(chunk?.seq) || chunk.seq < 0) return null;
+    if (chunk.content !== undefined && typeof chunk.content !== "string") return null;
+    if (chunk.digest !== undefined && !DIGEST_PATTERN.test(chunk.digest)) return null;
+    if (chunk.content === undefined && chunk.digest === undefined) return null;
+  }
+  return chunks;
+}
+
+export function collectionsRouter(store: Store, io: Server): Router {
+  const router = Router();
+
+  router.param("id", (req, res, next, id) => {
+    if (!COLLECTION_ID_PATTERN.test(id)) {
+      res.status(400).json({ error: "Invalid collection ID" });
+      return;
+    }
+    next();
+  });
+
+  // Stage a batch of chunks; chunks already staged are kept as they are
+  router.post("/:id/chunks", rawBody, async (req, res) => {
+    try {
+      const encoding = (req.get("Content-Encoding") || "identity").toLowerCase();
+      const decode = decoders.get(encoding);
+      if (!decode) {
+        res.set("Accept-Encoding", ACCEPTED_ENCODINGS);
+        res.status(415).json({ error: `Unsupported Content-Encoding: ${encoding}` });
+        return;
+      }
+
+      let chunks: BatchChunk[] | null = null;
+      if (Buffer.isBuffer(req.body)) {
+        const json = decodeBody(decode, req.body).toString("utf8");
+        try {
+          chunks = parseBatch(JSON.parse(json));
+        } catch {
+          chunks = null;
+        }
+      }
+      if (!chunks) {
+        res.status(400).json({ error: "Invalid chunk batch" });
+        return;
+      }
+
+      // Chunks sent as a bare digest reuse content stored by earlier uploads
+      const references = Array.from(
+        new Set(
+          chunks
+            .filter((chunk) => chunk.content === undefined)
+            .map((chunk) => chunk.digest as string)
+        )
+      );
+      const blobs =
+        references.length > 0 ? await store.getBlobs(references) : new Map<string, string>();
+      const missing = references.filter((digest) => !blobs.has(digest));
+      if (missing.length > 0) {
+        res.status(409).json({ error: "Unknown chunk digest", missing });
+        return;
+      }
+
+      const sent = chunks.filter(
+        (chunk) => chunk.content !== undefined && chunk.digest !== undefined
+      );
+      for (const chunk of sent) {
+        if (sha256(chunk.content as string) !== chunk.digest) {
+          res.status(400).json({ error: `Chunk digest mismatch for seq ${chunk.seq}` });
+          return;
+        }
+      }
+      await store.putBlobs(
+        sent.map((chunk) => ({
+          digest: chunk.digest as string,
+          content: chunk.content as string,
+        }))
+      );
+
+      const staged = await store.stageChunks(
+        req.params.id,
+        chunks.map((chunk) => ({
+          seq: chunk.seq,
+          content: chunk.content ?? (blobs.get(chunk.digest as string) as string),
+        }))
+      );
+      res.status(201).json({ received: chunks.length, staged });
+    } catch (error) {
+      if (error instanceof DecodeError) {
+        res.status(error.status).json({ error: error.message });
+        return;
+      }
+      console.error("Error staging chunks:", error);
+      res.status(500).json({ error: "Failed to save chunks" });
+    }
+  });
+
+  // Join chunks 0..chunks-1 into the collection's text row
+  router.post("/:id/complete", express.json(), async (req, res) => {
+    try {
+      const chunks = req.body?.chunks;
+      if (!Number.isInteger(chunks) || chunks < 1) {
+        res.status(400).json({ error: "Invalid chunk count" });
+        return;
+      }
+
+      const result = await store.completeCollection(req.params.id, chunks);
+      if ("missing" in result) {
+        res.status(409).json({ error: "Missing chunks", missing: result.missing });
+        return;
+      }
+
+      const ready = { ...result.summary, chunks };
+      if (result.created) io.emit("collectionReady", ready);
+      res.status(result.created ? 201 : 200).json(ready);
+    } catch (error) {
+      console.error("Error completing collection:", error);
+      res.status(500).json({ error: "Failed to complete collection" });
+    }
+  });
+
+  return router;
+}
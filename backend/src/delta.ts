@@ -0,0 +1,130 @@
+import { createHash } from "crypto";
+import { Router } from "express";
+import { Server } from "socket.io";
+import { Store } from "./store";
+
+// Delta uploads: the CLI sends a manifest of (path, content hash), uploads
+// only the file bodies the server does not have yet, then commits the
+// manifest. The committed collection is reassembled in the same
+// "File: <path>" record layout the CLI writes for full uploads.
+
+interface ManifestEntry {
+  path: string;
+  digest: string;
+}
+
+export const DIGEST_PATTERN = /^[0-9a-f]{64}$/;
+const RECORD_SEPARATOR = "=".repeat(80);
+
+function parseManifest(body: any): ManifestEntry[] | null {
+  const files = body?.files;
+  if (!Array.isArray(files)) return null;
+  for (const file of files) {
+    if (typeof file?.path !== "string" || !DIGEST_PATTERN.test(file?.digest)) {
+      return null;
+    }
+  }
+  return files;
+}
+
+function uniqueDigests(files: ManifestEntry[]): string[] {
+  return Array.from(new Set(files.map((file) => file.digest)));
+}
+
+export function sha256(content: string): string {
+  return createHash("sha256").update(content, "utf8").digest("hex");
+}
+
+export function deltaRouter(store: Store, io: Server): Router {
+  const router = Router();
+
+  // Which of these content hashes still need their bodies uploaded?
+  router.post("/manifest", async (req, res) => {
+    try {
+      const files = parseManifest(req.body);
+      if (!files) {
+        res.status(400).json({ error: "Invalid manifest" });
+        return;
+      }
+      const missing = await store.missingBlobs(uniqueDigests(files));
+      res.json({ missing });
+    } catch (error) {
+      console.error("Error checking manifest:", error);
+      res.status(500).json({ error: "Failed to check manifest" });
+    }
+  });
+
+  // Which upload chunks (sent to /api/text with a digest) are not stored yet?
+  router.post("/chunks", async (req, res) => {
+    try {
+      const digests = req.body?.digests;
+      if (
+        !Array.isArray(digests) ||
+        !digests.every((digest) => DIGEST_PATTERN.test(digest))
+      ) {
+        res.status(400).json({ error: "Invalid digests" });
+        return;
+      }
+      const missing = await store.missingBlobs(Array.from(new Set<string>(digests)));
+      res.json({ missing });
+    } catch (error) {
+      console.error("Error checking chunks:", error);
+      res.status(500).json({ error: "Failed to check chunks" });
+    }
+  });
+
+  // Upload file bodies; each must hash to its digest
+  router.post("/blobs", async (req, res) => {
+    try {
+      const blobs = req.body?.blobs;
+      if (!Array.isArray(blobs)) {
+        res.status(400).json({ error: "Invalid blobs" });
+        return;
+      }
+      for (const blob of blobs) {
+        if (typeof blob?.content !== "string" || sha256(blob.content) !== blob.digest) {
+          res.status(400).json({ error: `Digest mismatch for ${blob?.digest}` });
+          return;
+        }
+      }
+      await store.putBlobs(blobs);
+      res.status(201).json({ stored: blobs.length });
+    } catch (error) {
+      console.error("Error saving blobs:", error);
+      res.status(500).json({ error: "Failed to save blobs" });
+    }
+  });
+
+  // Assemble a collection from a manifest whose blobs are all present
+  router.post("/collections", async (req, res) => {
+    try {
+      const files = parseManifest(req.body);
+      const header = req.body?.header;
+      if (!files || typeof header !== "string") {
+        res.status(400).json({ error: "Invalid collection" });
+        return;
+      }
+
+      const blobs = await store.getBlobs(uniqueDigests(files));
+      const missing = uniqueDigests(files).filter((digest) => !blobs.has(digest));
+      if (missing.length > 0) {
+        res.status(409).json({ error: "Missing file contents", missing });
+        return;
+      }
+
+      const records = files.map(
+        (file) =>
+          `File: ${file.path}\n${RECORD_SEPARATOR}\n${blobs.get(file.digest)}\n\n`
+      );
+      const savedData = await store.insertText(header + records.join(""));
+
+      io.emit("newText", savedData);
+      res.status(201).json(savedData);
+    } catch (error) {
+      console.error("Error saving collection:", error);
+      res.status(500).json({ error: "Failed to save collection" });
+    }
+  });
+
+  return router;
+}
@@ -0,0 +1,49 @@
+import zlib from "zlib";
+
+// Compressed uploads arrive with a Content-Encoding. zstd is only offered
+// when the running Node version ships it in zlib.
+export const MAX_CONTENT_BYTES = 50 * 1024 * 1024;
+const zstdDecompressSync: ((buffer: Buffer, options?: object) => Buffer) | undefined =
+  (zlib as any).zstdDecompressSync;
+
+export const decoders = new Map<string, (buffer: Buffer) => Buffer>([
+  ["identity", (buffer) => buffer],
+  [
+    "gzip",
+    (buffer) => zlib.gunzipSync(buffer, { maxOutputLength: MAX_CONTENT_BYTES }),
+  ],
+  [
+    "deflate",
+    (buffer) => zlib.inflateSync(buffer, { maxOutputLength: MAX_CONTENT_BYTES }),
+  ],
+]);
+if (zstdDecompressSync) {
+  decoders.set("zstd", (buffer) =>
+    zstdDecompressSync(buffer, { maxOutputLength: MAX_CONTENT_BYTES })
+  );
+}
+export const ACCEPTED_ENCODINGS = Array.from(decoders.keys())
+  .filter((encoding) => encoding !== "identity")
+  .join(", ");
+
+// A body that cannot be decoded, with the status to answer: 413 when it
+// decodes to more than MAX_CONTENT_BYTES, 400 when it is corrupt. Neither
+// is worth retrying, unlike the 500 an unexpected error gets.
+export class DecodeError extends Error {
+  constructor(message: string, readonly status: 400 | 413) {
+    super(message);
+  }
+}
+
+export function decodeBody(decode: (buffer: Buffer) => Buffer, body: Buffer): Buffer {
+  try {
+    return decode(body);
+  } catch (error) {
+    if ((error as NodeJS.ErrnoException)?.code === "ERR_BUFFER_TOO_LARGE") {
+      throw new DecodeError(`Decoded content exceeds ${MAX_CONTENT_BYTES} bytes`, 413);
+    }
+    throw new DecodeError("Corrupt compressed body", 400);
+  }
+}
+
+export const COLLECTION_ID_PATTERN = /^[0-9A-Za-z_-]{1,64}$/;
@@ -3,6 +3,17 @@ import { Pool } from "pg";
 import cors from "cors";
 import { Server } from "socket.io";
 import { createServer } from "http";
+import { MemoryStore, PgStore, Store } from "./store";
+import { DIGEST_PATTERN, deltaRouter, sha256 } from "./delta";
+import { collectionsRouter } from "./collections";
+import {
+  ACCEPTED_ENCODINGS,
+  COLLECTION_ID_PATTERN,
+  DecodeError,
+  decodeBody,
+  decoders,
+} from "./encoding";
+import { textsRouter } from "./texts";
 
 const app = express();
 const httpServer = createServer(app);
@@ -37,9 +48,27 @@ const pool = new Pool({
   password: String(process.env.DB_PASSWORD), // Explicit string conversion})
 });
 
+// STORE=memory runs the API without Postgres (data is lost on restart)
+const store: Store =
+  process.env.STORE === "memory" ? new MemoryStore() : new PgStore(pool);
+
 app.use(cors());
+// Every answer to an upload lists the accepted encodings, errors included,
+// so the CLI can tell this backend from one that predates compression
+app.use(["/api/text", "/api/collections"], (req, res, next) => {
+  res.set("Accept-Encoding", ACCEPTED_ENCODINGS);
+  next();
+});
+// Batched collection uploads parse their own, possibly compressed, bodies
+app.use("/api/collections", collectionsRouter(store, io));
 app.use(express.json({ limit: "50mb" }));
 
+const rawText = express.raw({
+  type: "text/plain",
+  inflate: false,
+  limit: "50mb",
+});
+
 // Health check endpoint
 app.get("/health", (req, res) => {
   res.json({ status: "ok" });
@@ -51,40 +80,102 @@ app.get("/", (req, res) => {
 });
 
 // Post endpoint to receive text data
-app.post("/api/text", async (req, res) => {
+app.post("/api/text", rawText, async (req, res) => {
   try {
-    const { content } = req.body;
+    let content: string | undefined;
+    let digest: string | undefined;
+    let collection: string | undefined;
+    let seq: unknown;
 
-    // Insert into database
-    const result = await pool.query(
-      "INSERT INTO text_data (content) VALUES ($1) RETURNING *",
-      [content]
-    );
+    if (Buffer.isBuffer(req.body)) {
+      const encoding = (req.get("Content-Encoding") || "identity").toLowerCase();
+      const decode = decoders.get(encoding);
+      if (!decode) {
+        res.set("Accept-Encoding", ACCEPTED_ENCODINGS);
+        res.status(415).json({ error: `Unsupported Content-Encoding: ${encoding}` });
+        return;
+      }
+      content = decodeBody(decode, req.body).toString("utf8");
+      digest = req.get("X-Chunk-Digest");
+      collection = req.get("X-Collection-Id");
+      seq = req.get("X-Chunk-Seq") === undefined ? undefined : Number(req.get("X-Chunk-Seq"));
+    } else {
+      ({ content, digest, collection, seq } = req.body);
+    }
+
+    // Chunks naming their collection are stored once per (collection, seq)
+    if (collection !== undefined) {
+      if (typeof collection !== "string" || !COLLECTION_ID_PATTERN.test(collection)) {
+        res.status(400).json({ error: "Invalid collection ID" });
+        return;
+      }
+      if (!Number.isInteger(seq) || (seq as number) < 0) {
+        res.status(400).json({ error: "Invalid chunk seq" });
+        return;
+      }
+    }
+
+    // Chunks carry the SHA-256 of their content and are kept as blobs, so a
+    // later upload of an unchanged chunk can send just the digest
+    if (digest !== undefined && !DIGEST_PATTERN.test(digest)) {
+      res.status(400).json({ error: "Invalid chunk digest" });
+      return;
+    }
+    if (content === undefined && digest !== undefined) {
+      content = (await store.getBlobs([digest])).get(digest);
+      if (content === undefined) {
+        res.status(409).json({ error: "Unknown chunk digest", missing: [digest] });
+        return;
+      }
+    } else if (typeof content !== "string") {
+      res.status(400).json({ error: "Missing content" });
+      return;
+    } else if (digest !== undefined) {
+      if (sha256(content) !== digest) {
+        res.status(400).json({ error: "Chunk digest mismatch" });
+        return;
+      }
+      await store.putBlobs([{ digest, content }]);
+    }
 
-    const savedData = result.rows[0];
+    if (collection !== undefined) {
+      // A chunk sent again (lost response, `weaver resume`) gets the stored row back
+      const { row, created } = await store.insertChunk(
+        { collectionId: collection, seq: seq as number },
+        content
+      );
+      // Clients hear of each new chunk without its content; whole texts
+      // still arrive with it as "newText"
+      if (created) {
+        const { content: _content, ...summary } = row;
+        io.emit("newChunk", summary);
+      }
+      res.status(created ? 201 : 200).json(row);
+      return;
+    }
+
+    // Insert into database
+    const savedData = await store.insertText(content);
 
     // Emit to all connected clients
     io.emit("newText", savedData);
 
     res.status(201).json(savedData);
   } catch (error) {
+    if (error instanceof DecodeError) {
+      res.status(error.status).json({ error: error.message });
+      return;
+    }
     console.error("Error saving text:", error);
     res.status(500).json({ error: "Failed to save text data" });
   }
 });
 
-// Get all texts endpoint
-app.get("/api/texts", async (req, res) => {
-  try {
-    const result = await pool.query(
-      "SELECT * FROM text_data ORDER BY created_at DESC"
-    );
-    res.json(result.rows);
-  } catch (error) {
-    console.error("Error fetching texts:", error);
-    res.status(500).json({ error: "Failed to fetch text data" });
-  }
-});
+// Paged metadata listing and streamed content of stored texts
+app.use("/api/texts", textsRouter(store));
+
+// Content-addressed delta uploads
+app.use("/api/delta", deltaRouter(store, io));
 
 const PORT = process.env.PORT || 4000;
 httpServer.listen(PORT, () => {
@@ -0,0 +1,363 @@
+import { Pool } from "pg";
+
+// The line under each "File:" header of a collection; file_count counts them
+const RECORD_SEPARATOR_LINE = `\n${"=".repeat(80)}\n`;
+
+export interface TextRow {
+  id: number;
+  content: string;
+  created_at: Date;
+  collection_id?: string | null;
+  seq?: number | null;
+  // Bytes of UTF-8 content and number of "File:" records, kept by the database
+  size: number;
+  file_count: number;
+}
+
+// A stored text without its content, as listed
+export type TextSummary = Omit<TextRow, "content">;
+
+export type TextOrder = "newest" | "oldest";
+
+// One page of the listing: texts after `cursor` (the id of the last text
+// of the previous page) in `order`
+export interface TextPageQuery {
+  limit: number;
+  order: TextOrder;
+  cursor?: number;
+}
+
+// Identifies one chunk of a collection upload
+export interface ChunkKey {
+  collectionId: string;
+  seq: number;
+}
+
+export interface ChunkInsert {
+  row: TextRow;
+  // False when the chunk was already stored; row is the stored one
+  created: boolean;
+}
+
+// A chunk of a batched collection upload, held until the collection is complete
+export interface StagedChunk {
+  seq: number;
+  content: string;
+}
+
+// The stored row of a reassembled collection, without its content
+export interface CollectionSummary {
+  id: number;
+  collection_id: string;
+  size: number;
+  file_count: number;
+  created_at: Date;
+}
+
+export type CollectionCompletion =
+  | { summary: CollectionSummary; created: boolean }
+  // Seqs below the expected chunk count that were never staged
+  | { missing: number[] };
+
+export interface Blob {
+  digest: string;
+  content: string;
+}
+
+// Storage used by the API routes. PgStore is the real backend; MemoryStore
+// keeps everything in process so the API can run without Postgres
+// (STORE=memory), e.g. for local testing of the CLI.
+export interface Store {
+  insertText(content: string): Promise<TextRow>;
+  insertChunk(key: ChunkKey, content: string): Promise<ChunkInsert>;
+  listTexts(page: TextPageQuery): Promise<TextSummary[]>;
+  // Characters start..start+length-1 of a text's content ("" past its end),
+  // or null if there is no such text
+  readContent(id: number, start: number, length: number): Promise<string | null>;
+  // Returns how many of the chunks were not staged before
+  stageChunks(collectionId: string, chunks: StagedChunk[]): Promise<number>;
+  // Joins staged chunks 0..chunks-1 into one text row, once per collection
+  completeCollection(collectionId: string, chunks: number): Promise<CollectionCompletion>;
+  missingBlobs(digests: string[]): Promise<string[]>;
+  putBlobs(blobs: Blob[]): Promise<void>;
+  getBlobs(digests: string[]): Promise<Map<string, string>>;
+}
+
+const COLLECTION_SUMMARY = "id, collection_id, size, file_count, created_at";
+const TEXT_SUMMARY = "id, collection_id, seq, size, file_count, created_at";
+
+export class PgStore implements Store {
+  constructor(private readonly pool: Pool) {}
+
+  async insertText(content: string): Promise<TextRow> {
+    const result = await this.pool.query(
+      "INSERT INTO text_data (content) VALUES ($1) RETURNING *",
+      [content]
+    );
+    return result.rows[0];
+  }
+
+  async insertChunk(key: ChunkKey, content: string): Promise<ChunkInsert> {
+    const inserted = await this.pool.query(
+      `INSERT INTO text_data (content, collection_id, seq) VALUES ($1, $2, $3)
+       ON CONFLICT (collection_id, seq) DO NOTHING
+       RETURNING *`,
+      [content, key.collectionId, key.seq]
+    );
+    if (inserted.rows.length > 0) {
+      return { row: inserted.rows[0], created: true };
+    }
+    const existing = await this.pool.query(
+      "SELECT * FROM text_data WHERE collection_id = $1 AND seq = $2",
+      [key.collectionId, key.seq]
+    );
+    return { row: existing.rows[0], created: false };
+  }
+
+  async listTexts(page: TextPageQuery): Promise<TextSummary[]> {
+    // Keyset pagination on (created_at, id), served by text_data_created_at_id
+    const [comparison, direction] = page.order === "oldest" ? [">", "ASC"] : ["<", "DESC"];
+    const after =
+      page.cursor === undefined
+        ? ""
+        : `WHERE (created_at, id) ${comparison}
+           (SELECT created_at, id FROM text_data WHERE id = $2)`;
+    const result = await this.pool.query(
+      `SELECT ${TEXT_SUMMARY} FROM text_data ${after}
+       ORDER BY created_at ${direction}, id ${direction}
+       LIMIT $1`,
+      page.cursor === undefined ? [page.limit] : [page.limit, page.cursor]
+    );
+    return result.rows;
+  }
+
+  async readContent(id: number, start: number, length: number): Promise<string | null> {
+    // Postgres detoasts (and decompresses) only the prefix a substring needs
+    const result = await this.pool.query(
+      "SELECT substring(content from $2 for $3) AS content FROM text_data WHERE id = $1",
+      [id, start + 1, length]
+    );
+    return result.rows.length > 0 ? result.rows[0].content : null;
+  }
+
+  async stageChunks(collectionId: string, chunks: StagedChunk[]): Promise<number> {
+    if (chunks.length === 0) return 0;
+    const result = await this.pool.query(
+      `INSERT INTO collection_chunks (collection_id, seq, content)
+       SELECT $1::text, * FROM unnest($2::int[], $3::text[])
+       ON CONFLICT (collection_id, seq) DO NOTHING`,
+      [collectionId, chunks.map((chunk) => chunk.seq), chunks.map((chunk) => chunk.content)]
+    );
+    return result.rowCount ?? 0;
+  }
+
+  async completeCollection(
+    collectionId: string,
+    chunks: number
+  ): Promise<CollectionCompletion> {
+    const client = await this.pool.connect();
+    try {
+      await client.query("BEGIN");
+      const existing = await client.query(
+        `SELECT ${COLLECTION_SUMMARY} FROM text_data
+         WHERE collection_id = $1 AND seq IS NULL`,
+        [collectionId]
+      );
+      if (existing.rows.length > 0) {
+        await client.query("COMMIT");
+        return { summary: existing.rows[0], created: false };
+      }
+
+      const missing = await client.query(
+        `SELECT s AS seq FROM generate_series(0, $2::int - 1) AS s
+         WHERE NOT EXISTS (
+           SELECT 1 FROM collection_chunks c
+           WHERE c.collection_id = $1 AND c.seq = s
+         )
+         ORDER BY s`,
+        [collectionId, chunks]
+      );
+      if (missing.rows.length > 0) {
+        await client.query("ROLLBACK");
+        return { missing: missing.rows.map((row) => row.seq) };
+      }
+
+      // Reassembled in the database: the chunks never pass through Node
+      const inserted = await client.query(
+        `INSERT INTO text_data (content, collection_id)
+         SELECT string_agg(content, '' ORDER BY seq), $1::text
+         FROM collection_chunks WHERE collection_id = $1 AND seq < $2
+         ON CONFLICT (collection_id) WHERE seq IS NULL DO NOTHING
+         RETURNING ${COLLECTION_SUMMARY}`,
+        [collectionId, chunks]
+      );
+      await client.query("DELETE FROM collection_chunks WHERE collection_id = $1", [
+        collectionId,
+      ]);
+      await client.query("COMMIT");
+      if (inserted.rows.length > 0) {
+        return { summary: inserted.rows[0], created: true };
+      }
+    } catch (error) {
+      await client.query("ROLLBACK");
+      throw error;
+    } finally {
+      client.release();
+    }
+
+    // A concurrent request completed the collection first
+    const completed = await this.pool.query(
+      `SELECT ${COLLECTION_SUMMARY} FROM text_data
+       WHERE collection_id = $1 AND seq IS NULL`,
+      [collectionId]
+    );
+    return { summary: completed.rows[0], created: false };
+  }
+
+  async missingBlobs(digests: string[]): Promise<string[]> {
+    const result = await this.pool.query(
+      "SELECT digest FROM file_blobs WHERE digest = ANY($1::text[])",
+      [digests]
+    );
+    const present = new Set(result.rows.map((row) => row.digest));
+    return digests.filter((digest) => !present.has(digest));
+  }
+
+  async putBlobs(blobs: Blob[]): Promise<void> {
+    if (blobs.length === 0) return;
+    await this.pool.query(
+      `INSERT INTO file_blobs (digest, content)
+       SELECT * FROM unnest($1::text[], $2::text[])
+       ON CONFLICT (digest) DO NOTHING`,
+      [blobs.map((blob) => blob.digest), blobs.map((blob) => blob.content)]
+    );
+  }
+
+  async getBlobs(digests: string[]): Promise<Map<string, string>> {
+    const result = await this.pool.query(
+      "SELECT digest, content FROM file_blobs WHERE digest = ANY($1::text[])",
+      [digests]
+    );
+    return new Map(
+      result.rows.map((row): [string, string] => [row.digest, row.content])
+    );
+  }
+}
+
+export class MemoryStore implements Store {
+  private readonly texts: TextRow[] = [];
+  private readonly blobs = new Map<string, string>();
+  private readonly chunks = new Map<string, TextRow>();
+  private readonly staged = new Map<string, Map<number, string>>();
+  private readonly collections = new Map<string, CollectionSummary>();
+
+  async insertText(content: string): Promise<TextRow> {
+    const row = this.newRow(content);
+    this.texts.push(row);
+    return row;
+  }
+
+  // Sizes and file counts are generated columns in Postgres
+  private newRow(content: string, key?: { collectionId: string; seq: number | null }): TextRow {
+    return {
+      id: this.texts.length + 1,
+      content,
+      created_at: new Date(),
+      ...(key && { collection_id: key.collectionId, seq: key.seq }),
+      size: Buffer.byteLength(content, "utf8"),
+      file_count: content.split(RECORD_SEPARATOR_LINE).length - 1,
+    };
+  }
+
+  async insertChunk(key: ChunkKey, content: string): Promise<ChunkInsert> {
+    const id = `${key.collectionId}/${key.seq}`;
+    const existing = this.chunks.get(id);
+    if (existing) return { row: existing, created: false };
+    const row = this.newRow(content, key);
+    this.texts.push(row);
+    this.chunks.set(id, row);
+    return { row, created: true };
+  }
+
+  async listTexts(page: TextPageQuery): Promise<TextSummary[]> {
+    // Ids grow with created_at here, so they alone order the texts
+    const ordered = page.order === "oldest" ? this.texts : [...this.texts].reverse();
+    const start =
+      page.cursor === undefined
+        ? 0
+        : ordered.findIndex((row) => row.id === page.cursor) + 1;
+    if (start === 0 && page.cursor !== undefined) return [];
+    return ordered
+      .slice(start, start + page.limit)
+      .map(({ content, ...summary }) => summary);
+  }
+
+  // Counts UTF-16 code units, so a slice may end halfway through a surrogate pair
+  async readContent(id: number, start: number, length: number): Promise<string | null> {
+    return this.texts[id - 1]?.content.slice(start, start + length) ?? null;
+  }
+
+  async stageChunks(collectionId: string, chunks: StagedChunk[]): Promise<number> {
+    let staged = this.staged.get(collectionId);
+    if (!staged) {
+      staged = new Map();
+      this.staged.set(collectionId, staged);
+    }
+    let created = 0;
+    for (const chunk of chunks) {
+      if (staged.has(chunk.seq)) continue;
+      staged.set(chunk.seq, chunk.content);
+      created++;
+    }
+    return created;
+  }
+
+  async completeCollection(
+    collectionId: string,
+    chunks: number
+  ): Promise<CollectionCompletion> {
+    const existing = this.collections.get(collectionId);
+    if (existing) return { summary: existing, created: false };
+
+    const staged = this.staged.get(collectionId) ?? new Map<number, string>();
+    const missing: number[] = [];
+    for (let seq = 0; seq < chunks; seq++) {
+      if (!staged.has(seq)) missing.push(seq);
+    }
+    if (missing.length > 0) return { missing };
+
+    const parts: string[] = [];
+    for (let seq = 0; seq < chunks; seq++) parts.push(staged.get(seq) as string);
+    const row = this.newRow(parts.join(""), { collectionId, seq: null });
+    this.texts.push(row);
+    this.staged.delete(collectionId);
+    const summary = {
+      id: row.id,
+      collection_id: collectionId,
+      size: row.size,
+      file_count: row.file_count,
+      created_at: row.created_at,
+    };
+    this.collections.set(collectionId, summary);
+    return { summary, created: true };
+  }
+
+  async missingBlobs(digests: string[]): Promise<string[]> {
+    return digests.filter((digest) => !this.blobs.has(digest));
+  }
+
+  async putBlobs(blobs: Blob[]): Promise<void> {
+    for (const blob of blobs) {
+      if (!this.blobs.has(blob.digest)) this.blobs.set(blob.digest, blob.content);
+    }
+  }
+
+  async getBlobs(digests: string[]): Promise<Map<string, string>> {
+    const found = new Map<string, string>();
+    for (const digest of digests) {
+      const content = this.blobs.get(digest);
+      if (content !== undefined) found.set(digest, content);
+    }
+    return found;
+  }
+}
@@ -0,0 +1,104 @@
+import { Response, Router } from "express";
+import { once } from "events";
+import { Store, TextOrder } from "./store";
+
+// Reading stored texts: the listing carries metadata only (size, file
+// count, dates) a page at a time, and each text's content is fetched on
+// its own, read from the store and streamed to the client in slices.
+
+const DEFAULT_PAGE_SIZE = 50;
+const MAX_PAGE_SIZE = 200;
+const ORDERS: TextOrder[] = ["newest", "oldest"];
+const CONTENT_SLICE_CHARS = 256 * 1024;
+
+function parseId(value: unknown): number | null {
+  const id = Number(value);
+  return Number.isInteger(id) && id > 0 ? id : null;
+}
+
+function isHighSurrogate(code: number): boolean {
+  return code >= 0xd800 && code <= 0xdbff;
+}
+
+// Read a slice, write it and wait for the socket to drain before reading
+// the next, so neither the server nor a slow client holds the whole text.
+// `slice` is the first slice, already read.
+async function streamContent(
+  res: Response,
+  store: Store,
+  id: number,
+  slice: string | null
+): Promise<void> {
+  let carry = "";
+  for (let start = 0; slice; ) {
+    if (res.destroyed) return;
+    // A surrogate pair split between slices is written whole with the next
+    let piece = carry + slice;
+    carry = isHighSurrogate(piece.charCodeAt(piece.length - 1)) ? piece.slice(-1) : "";
+    if (carry) piece = piece.slice(0, -1);
+    if (!res.write(piece, "utf8")) {
+      await Promise.race([once(res, "drain"), once(res, "close")]);
+    }
+    start += CONTENT_SLICE_CHARS;
+    slice = await store.readContent(id, start, CONTENT_SLICE_CHARS);
+  }
+  res.end(carry, "utf8");
+}
+
+export function textsRouter(store: Store): Router {
+  const router = Router();
+
+  // ?limit=&order=newest|oldest&cursor=<next from the previous page>
+  router.get("/", async (req, res) => {
+    try {
+      const limit =
+        req.query.limit === undefined ? DEFAULT_PAGE_SIZE : Number(req.query.limit);
+      const order = (req.query.order ?? "newest") as TextOrder;
+      const cursor = req.query.cursor === undefined ? undefined : parseId(req.query.cursor);
+      if (
+        !Number.isInteger(limit) ||
+        limit < 1 ||
+        limit > MAX_PAGE_SIZE ||
+        !ORDERS.includes(order) ||
+        cursor === null
+      ) {
+        res.status(400).json({ error: "Invalid page" });
+        return;
+      }
+
+      // One extra row tells whether there is a next page
+      const texts = await store.listTexts({ limit: limit + 1, order, cursor });
+      const next = texts.length > limit ? texts[limit - 1].id : null;
+      res.json({ texts: texts.slice(0, limit), next });
+    } catch (error) {
+      console.error("Error fetching texts:", error);
+      res.status(500).json({ error: "Failed to fetch text data" });
+    }
+  });
+
+  router.get("/:id/content", async (req, res) => {
+    try {
+      const id = parseId(req.params.id);
+      if (id === null) {
+        res.status(400).json({ error: "Invalid text ID" });
+        return;
+      }
+      const first = await store.readContent(id, 0, CONTENT_SLICE_CHARS);
+      if (first === null) {
+        res.status(404).json({ error: "Text not found" });
+        return;
+      }
+      res.set("Content-Type", "text/plain; charset=utf-8");
+      await streamContent(res, store, id, first);
+    } catch (error) {
+      console.error("Error streaming text:", error);
+      if (res.headersSent) {
+        res.destroy();
+      } else {
+        res.status(500).json({ error: "Failed to fetch text content" });
+      }
+    }
+  });
+
+  return router;
+}
@@ -0,0 +1,7 @@
+"""
+Benchmarks for the Weaver collector.
+
+Run from the ``cli/weaver-python`` directory, e.g.::
+
+    python -m benchmarks.bench_matcher
+"""
@@ -0,0 +1,105 @@
+"""
+Benchmark: end-to-end wall time of a headless collection with the sync
+engine (default and --stream) and the async engine (--engine async).
+
+Each run scans, reads and uploads a synthetic repository to a local stub
+server that adds ``--latency`` to every request, so the numbers include
+the network wait the engines try to overlap. Uploads of every run are
+checked to be the same collection as the first run's.
+
+With ``--cold`` the page cache is dropped before each run (needs root on
+Linux), so file reads hit the disk as on a first collection.
+
+    python -m benchmarks.bench_async --files 20000 --latency 0.02 --concurrency 1 4
+"""
+import argparse
+import contextlib
+import os
+import re
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+from weaver.async_collector import AsyncCodeCollector
+from weaver.collector import CodeCollector
+from weaver.config import CollectorConfig
+from .stub_server import StubServer
+from .synthetic import generate_paths, generate_sizes, write_repo
+
+
+def drop_page_cache() -> None:
+    os.sync()
+    with open("/proc/sys/vm/drop_caches", "w") as caches:
+        caches.write("3\n")
+
+
+def run(engine: str, config: CollectorConfig, latency: float, cold: bool) -> Tuple[float, str]:
+    """One headless collection: wall seconds and the uploaded text (without its timestamp)."""
+    collector_class = AsyncCodeCollector if engine == "async" else CodeCollector
+    with StubServer(latency) as server:
+        if cold:
+            drop_page_cache()
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            collector = collector_class(config.model_copy(update={"api_endpoint": server.url}))
+            start = time.perf_counter()
+            collector.collect_and_send()
+            elapsed = time.perf_counter() - start
+        if collector.status != "complete":
+            raise RuntimeError(f"collection {collector.status}")
+        # Batched uploads arrive as one joined payload without a seq
+        payloads = sorted(server.received, key=lambda payload: payload.get("seq", 0))
+    text = "".join(payload["content"] for payload in payloads)
+    return elapsed, re.sub(r"timestamp: .*", "", text, count=1)
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=20_000)
+    parser.add_argument("--median-size", type=int, default=4096, help="median file size in bytes")
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds per request")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4],
+                        help="upload concurrency values to compare")
+    parser.add_argument("--read-threads", type=int, default=8)
+    parser.add_argument("--cold", action="store_true", help="drop the page cache before each run")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = Path(tmp)
+        paths = generate_paths(args.files)
+        written = write_repo(repo, paths, generate_sizes(args.files, median=args.median_size))
+        base = CollectorConfig(
+            search_dir=repo, use_cache=False, headless=True, read_threads=args.read_threads
+        )
+        print(
+            f"{args.files:,} files, {written / 1024 / 1024:.1f} MB, "
+            f"{args.latency * 1000:.0f}ms per request, {os.cpu_count()} CPUs"
+            f"{', cold cache' if args.cold else ''}"
+        )
+
+        reference = None
+        baseline = None
+        for concurrency in args.concurrency:
+            for name, engine, update in (
+                ("sync", "sync", {}),
+                ("sync --stream", "sync", {"stream": True}),
+                ("async", "async", {}),
+            ):
+                config = base.model_copy(update={"upload_concurrency": concurrency, **update})
+                best = float("inf")
+                for _ in range(args.repeat):
+                    seconds, text = run(engine, config, args.latency, args.cold)
+                    best = min(best, seconds)
+                    reference = reference or text
+                    if text != reference:
+                        raise RuntimeError(f"{name} uploaded a different collection")
+                baseline = baseline or best
+                print(
+                    f"{name:<14} x{concurrency:<2} {best:8.3f}s "
+                    f"{args.files / best:10,.0f} files/s  speedup {baseline / best:4.2f}x"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark: listing files by walking the directory vs reading .git/index
+(--git).
+
+Generates a monorepo-shaped checkout, commits it to a fresh git repository
+(git is run only to build the fixture) and times file enumeration both
+ways. Next to the sources sits an untracked build output directory that
+.gitignore covers but the default exclusions do not: the walk lists (and
+would collect) it, the index never looks at it.
+
+    python -m benchmarks.bench_git --files 50000 --ignored-files 100000
+"""
+import argparse
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+from weaver.config import CollectorConfig
+from weaver.utils.file_utils import collect_files
+from weaver.utils.git_index import list_tracked_files
+from weaver.utils.patterns import PatternMatcher
+from .synthetic import generate_paths, write_tree
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=50_000, help="tracked files")
+    parser.add_argument("--ignored-files", type=int, default=100_000,
+                        help="untracked files under an ignored out/ directory")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    config = CollectorConfig()
+    extensions = config.extensions
+    patterns = config.get_effective_patterns()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        write_tree(root, generate_paths(args.files))
+        (root / ".gitignore").write_text("out/\n")
+        subprocess.run(["git", "-C", str(root), "init", "-q"], check=True)
+        subprocess.run(["git", "-C", str(root), "add", "-A"], check=True)
+        write_tree(root, [
+            f"out/chunk{i // 500}/bundle_{i}.js" for i in range(args.ignored_files)
+        ])
+
+        walk_best = index_best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            walked = list(collect_files(root, extensions, patterns, set()))
+            walk_best = min(walk_best, time.perf_counter() - start)
+
+            start = time.perf_counter()
+            listed = list_tracked_files(root, extensions, PatternMatcher(patterns)).files
+            index_best = min(index_best, time.perf_counter() - start)
+
+        tracked = [file for file in walked if not file.relative_to(root).parts[0] == "out"]
+        assert tracked == listed, "listings disagree on tracked files"
+        print(f"repo: {args.files:,} tracked files, {args.ignored_files:,} ignored in out/")
+        print(f"directory walk: {walk_best:.3f}s ({len(walked):,} files)")
+        print(f"git index:      {index_best:.3f}s ({len(listed):,} files)")
+        print(f"speedup:        {walk_best / index_best:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Micro-benchmark: compiled PatternMatcher vs. the per-pattern regex matcher.
+
+    python -m benchmarks.bench_matcher --sizes 10000 100000 1000000
+"""
+import argparse
+import re
+import time
+from typing import Iterable, List, Set
+
+from weaver.utils.patterns import DEFAULT_EXCLUDE_PATTERNS, PatternMatcher
+from .synthetic import generate_paths
+
+
+def legacy_excluded(relative_path: str, exclude_patterns: Set[str]) -> bool:
+    """The matcher `_should_include` used before PatternMatcher."""
+    for pattern in exclude_patterns:
+        if "*" in pattern:
+            regex_pattern = pattern.replace(".", "\\.").replace("*", ".*")
+            if re.match(f"^{regex_pattern}$", relative_path):
+                return True
+        elif pattern in relative_path:
+            return True
+    return False
+
+
+def time_legacy(paths: Iterable[str], patterns: Set[str]) -> float:
+    start = time.perf_counter()
+    for path in paths:
+        legacy_excluded(path, patterns)
+    return time.perf_counter() - start
+
+
+def time_compiled(paths: Iterable[str], patterns: Set[str]) -> float:
+    start = time.perf_counter()
+    matcher = PatternMatcher(patterns)
+    for path in paths:
+        matcher.matches(path)
+    return time.perf_counter() - start
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    patterns = set(DEFAULT_EXCLUDE_PATTERNS)
+    print(f"{'paths':>10} {'legacy (s)':>12} {'compiled (s)':>13} {'speedup':>8}")
+    for size in args.sizes:
+        paths = generate_paths(size, seed=args.seed)
+        legacy = time_legacy(paths, patterns)
+        compiled = time_compiled(paths, patterns)
+        print(f"{size:>10,} {legacy:>12.3f} {compiled:>13.3f} {legacy / compiled:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
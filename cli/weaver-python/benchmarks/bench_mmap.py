@@ -0,0 +1,88 @@
+"""
+Benchmark: peak RSS and time of writing one large file's record, read into
+memory versus streamed from a memory map (--mmap-threshold).
+
+Each measurement runs in a fresh interpreter so ru_maxrss is the peak of
+that run alone. Chunks are discarded after they are built.
+
+    python -m benchmarks.bench_mmap --sizes 8 32 128
+"""
+import argparse
+import json
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+from weaver.collector import CodeCollector
+from weaver.config import CollectorConfig
+from weaver.utils.chunking import RecordChunker
+
+
+def write_source(path: Path, size: int, seed: int = 0) -> None:
+    """A source-like file of ``size`` bytes: lines of varying length."""
+    rng = random.Random(seed)
+    lines = [("x" * rng.randint(0, 120) + "\n").encode() for _ in range(1000)]
+    with open(path, "wb") as f:
+        written = 0
+        while written < size:
+            line = rng.choice(lines)
+            f.write(line)
+            written += len(line)
+
+
+def measure(path: Path, threshold: int) -> dict:
+    """Write the file's record once in this process and report time and peak RSS."""
+    config = CollectorConfig(search_dir=path.parent, use_cache=False, mmap_threshold=threshold)
+    collector = CodeCollector(config)
+    chunker = RecordChunker(lambda chunk: None, config.chunk_size)
+    start = time.perf_counter()
+    collector._process_file(path, chunker)
+    chunker.close()
+    return {
+        "seconds": time.perf_counter() - start,
+        # Linux reports ru_maxrss in KiB
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def run(path: Path, threshold: int) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_mmap", "--measure", str(path), str(threshold)],
+        capture_output=True, text=True, check=True, cwd=Path(__file__).parent.parent
+    ).stdout
+    return json.loads(output)
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[8, 32, 128],
+                        help="file sizes in MB")
+    parser.add_argument("--measure", nargs=2, metavar=("PATH", "THRESHOLD"),
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.measure:
+        print(json.dumps(measure(Path(args.measure[0]), int(args.measure[1]))))
+        return
+
+    print(f"{'size':>8} {'read rss':>10} {'read s':>8} {'mmap rss':>10} {'mmap s':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size_mb in args.sizes:
+            path = Path(tmp) / "bundle.js"
+            write_source(path, size_mb * 1024 * 1024)
+            read = run(path, 0)
+            mapped = run(path, 1)
+            print(
+                f"{size_mb:>6}MB {read['peak_rss_mb']:>8.0f}MB {read['seconds']:>8.3f}"
+                f" {mapped['peak_rss_mb']:>8.0f}MB {mapped['seconds']:>8.3f}"
+            )
+            path.unlink()
+
+
+if __name__ == "__main__":
+    main()
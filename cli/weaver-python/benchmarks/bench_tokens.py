@@ -0,0 +1,95 @@
+"""
+Benchmark: token counting throughput, and the estimator's accuracy against
+an exact tokenizer.
+
+Counts every collectable file under ``--dir``. With ``--tokenizer`` (a
+tokenizer.json path or tiktoken[:encoding]), the exact counts are also
+timed and used as the reference for the relative error of the estimator
+and of the bytes/4 rule the budget uses, overall and per extension.
+
+    python -m benchmarks.bench_tokens --dir ../.. --tokenizer tokenizer.json
+"""
+import argparse
+import statistics
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from weaver.budget import estimate_tokens as estimate_from_size
+from weaver.config import CollectorConfig
+from weaver.utils.file_utils import collect_files, read_source
+from weaver.utils.tokens import TokenCounter, estimate_tokens
+
+
+def throughput(count: Callable[[bytes], int], texts: List[bytes], repeat: int) -> float:
+    """Best of ``repeat`` passes over texts, in MB/s."""
+    total = sum(len(text) for text in texts)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            count(text)
+        best = min(best, time.perf_counter() - start)
+    return total / best / 1024 / 1024
+
+
+def errors(estimates: List[int], exact: List[int]) -> Dict[str, float]:
+    relative = sorted(abs(e - x) / x for e, x in zip(estimates, exact) if x)
+    return {
+        "mean": statistics.fmean(relative),
+        "median": statistics.median(relative),
+        "p90": relative[int(len(relative) * 0.9)],
+        "total": abs(sum(estimates) - sum(exact)) / sum(exact),
+    }
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--dir", type=Path, default=Path("."), help="directory to sample")
+    parser.add_argument("--tokenizer", help="exact tokenizer to compare against")
+    parser.add_argument("--min-size", type=int, default=64, help="skip smaller files")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    config = CollectorConfig(search_dir=args.dir, use_cache=False)
+    files, texts = [], []
+    for file in collect_files(args.dir, config.extensions, config.get_effective_patterns(), set()):
+        source = read_source(file)
+        if source.data is not None and len(source.data) >= args.min_size:
+            files.append(file)
+            texts.append(source.data)
+    total = sum(len(text) for text in texts)
+    print(f"{len(texts):,} files, {total / 1024 / 1024:.1f} MB")
+    print(f"{'estimate':>12}: {throughput(estimate_tokens, texts, args.repeat):8.1f} MB/s")
+    if not args.tokenizer:
+        return
+
+    counter = TokenCounter(args.tokenizer)
+    # Load the tokenizer before timing it
+    counter.count(b"")
+    print(f"{'exact':>12}: {throughput(counter.count, texts, 1):8.1f} MB/s")
+    exact = [counter.count(text) for text in texts]
+    estimated = [estimate_tokens(text) for text in texts]
+    from_size = [estimate_from_size(len(text)) for text in texts]
+
+    print(f"\n{'':>12} {'files':>6} {'mean':>7} {'median':>7} {'p90':>7} {'total':>7}"
+          f" {'bytes/4':>8}")
+    by_extension = defaultdict(list)
+    for index, file in enumerate(files):
+        by_extension[file.suffix].append(index)
+    rows = [("all", list(range(len(files))))] + sorted(
+        by_extension.items(), key=lambda item: -len(item[1])
+    )
+    for name, indexes in rows:
+        exact_counts = [exact[i] for i in indexes]
+        error = errors([estimated[i] for i in indexes], exact_counts)
+        size_error = errors([from_size[i] for i in indexes], exact_counts)
+        print(
+            f"{name:>12} {len(indexes):>6} {error['mean']:>7.1%} {error['median']:>7.1%}"
+            f" {error['p90']:>7.1%} {error['total']:>7.1%} {size_error['mean']:>8.1%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
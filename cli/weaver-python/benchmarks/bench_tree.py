@@ -0,0 +1,94 @@
+"""
+Benchmark: memory per file and render time of the array-backed FileTree vs.
+a rich Tree node per file (the previous implementation).
+
+    python -m benchmarks.bench_tree --paths 1000000 --legacy-paths 100000
+"""
+import argparse
+import gc
+import os
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+from rich.console import Console
+from rich.tree import Tree
+
+from weaver.ui.components import FileTree
+from .synthetic import generate_paths
+
+
+class LegacyFileTree:
+    """One rich Tree node per file, folders cached by path string."""
+
+    def __init__(self):
+        self.tree = Tree("Project Files")
+        self.folder_cache = {}
+
+    def add_file(self, path: Path, size: int = 0) -> None:
+        parts = list(path.parts)
+        current = self.tree
+        current_path = ""
+        for part in parts[:-1]:
+            current_path = str(Path(current_path) / part)
+            if current_path in self.folder_cache:
+                current = self.folder_cache[current_path]
+            else:
+                current = self.folder_cache[current_path] = current.add(f"[blue]📁 {part}[/blue]")
+        current.add(f"[white]📄 {parts[-1]}[/white]")
+
+
+def build(factory: Callable[[], object], paths: List[str]) -> object:
+    tree = factory()
+    for path in paths:
+        tree.add_file(Path(path), 100)
+    return tree
+
+
+def measure(factory: Callable[[], object], paths: List[str]) -> Tuple[object, float, float]:
+    """Build a tree from ``paths``; returns (tree, bytes retained per file, build seconds)."""
+    start = time.perf_counter()
+    build(factory, paths)
+    elapsed = time.perf_counter() - start
+
+    # Separate traced build: tracemalloc slows allocation down several times
+    gc.collect()
+    tracemalloc.start()
+    tree = build(factory, paths)
+    gc.collect()
+    used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return tree, used / len(paths), elapsed
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--paths", type=int, default=1_000_000)
+    parser.add_argument("--legacy-paths", type=int, default=100_000,
+                        help="the rich-node tree needs several GB at 1M paths")
+    args = parser.parse_args(argv)
+
+    console = Console(file=open(os.devnull, "w"), force_terminal=True, width=160)
+    paths = generate_paths(args.paths, excluded_ratio=0.0)
+
+    legacy, legacy_bytes, legacy_build = measure(LegacyFileTree, paths[:args.legacy_paths])
+    start = time.perf_counter()
+    console.print(legacy.tree)
+    legacy_render = time.perf_counter() - start
+    del legacy
+
+    compact, compact_bytes, compact_build = measure(FileTree, paths)
+    start = time.perf_counter()
+    console.print(compact.generate_tree(max_lines=60, max_depth=4))
+    view_render = time.perf_counter() - start
+
+    print(f"rich node per file ({args.legacy_paths:,} paths): "
+          f"{legacy_bytes:>6.0f} B/file, build {legacy_build:.2f}s, full render {legacy_render:.2f}s")
+    print(f"array-backed trie  ({args.paths:,} paths): "
+          f"{compact_bytes:>6.0f} B/file, build {compact_build:.2f}s, "
+          f"live view render {view_render * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
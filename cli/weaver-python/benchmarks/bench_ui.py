@@ -0,0 +1,86 @@
+"""
+Benchmark: file processing throughput with the live UI off, on the render
+tick, and redrawn after every file (the pre-tick behaviour).
+
+Renders to a fake terminal backed by /dev/null, so terminal speed does not
+count; what is measured is the cost of building frames.
+
+    python -m benchmarks.bench_ui --files 20000
+"""
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+from rich.console import Console
+from rich.live import Live
+
+from weaver.collector import CodeCollector
+from weaver.config import CollectorConfig
+from weaver.utils.file_utils import collect_files
+from .synthetic import generate_paths, write_tree
+
+
+class PerFileRedrawCollector(CodeCollector):
+    """Rebuild every panel and refresh after each file, as before the render tick."""
+
+    live: Live
+
+    def _process_file(self, file, output_file) -> None:
+        super()._process_file(file, output_file)
+        layout = self._layout
+        layout["header"].update(self._create_header())
+        layout["left"].update(self._create_progress_panel())
+        layout["right"].update(self.file_tree.generate_tree())
+        self.live.refresh()
+
+
+def run(collector: CodeCollector, files: List[Path], ui: bool) -> float:
+    collector._start_time = time.time()
+    collector.config.use_cache = False
+    start = time.perf_counter()
+    try:
+        if ui:
+            with collector._create_live() as live:
+                collector.live = live
+                collector._process_files_with_ui(files)
+        else:
+            collector._process_files_with_ui(files)
+    finally:
+        Path(collector.temp_file).unlink()
+    return time.perf_counter() - start
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=20_000)
+    parser.add_argument("--skip-per-file", action="store_true",
+                        help="skip the per-file redraw run, which is slow on large trees")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp, open(os.devnull, "w") as devnull:
+        root = Path(tmp)
+        write_tree(root, generate_paths(args.files, excluded_ratio=0.0))
+        config = CollectorConfig(search_dir=root)
+        files = list(collect_files(root, config.extensions, config.get_effective_patterns(), set()))
+
+        def console() -> Console:
+            return Console(file=devnull, force_terminal=True, width=160, height=50)
+
+        runs = [
+            ("UI off", CodeCollector(config, console()), False),
+            ("UI on, render tick", CodeCollector(config, console()), True),
+        ]
+        if not args.skip_per_file:
+            runs.append(("UI on, per-file redraw", PerFileRedrawCollector(config, console()), True))
+
+        print(f"{len(files):,} files")
+        for name, collector, ui in runs:
+            elapsed = run(collector, files, ui)
+            print(f"{name:<24} {elapsed:>7.2f}s {len(files) / elapsed:>9.0f} files/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark: ChunkSender vs. the one-connection-per-chunk send_chunk, and
+batched uploads (chunks posted ``--batch-kb`` at a time to the collections
+route, then joined by the server) vs. one request per chunk.
+
+Runs against a local stub server that adds latency and random 503s.
+
+    python -m benchmarks.bench_upload --chunks 100 --latency 0.02 --failure-rate 0.05
+"""
+import argparse
+import time
+from typing import List
+
+from weaver.utils.compression import resolve_encoding
+from weaver.utils.http_utils import ChunkSender, send_chunk
+from .stub_server import StubServer
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chunks", type=int, default=100)
+    parser.add_argument("--chunk-kb", type=int, default=256)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--failure-rate", type=float, default=0.05)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--batch-kb", type=int, default=8192)
+    parser.add_argument("--compression", default="none", help="auto, gzip, zstd or none")
+    args = parser.parse_args(argv)
+
+    encoding = resolve_encoding(args.compression)
+    chunks = [f"{i:08d}" + "x" * (args.chunk_kb * 1024 - 8) for i in range(args.chunks)]
+    total_mb = args.chunks * args.chunk_kb / 1024
+
+    def report(name: str, elapsed: float, server: StubServer, ok: bool) -> None:
+        print(
+            f"{name:<24} {elapsed:>7.2f}s {total_mb / elapsed:>8.1f} MB/s "
+            f"{server.requests:>6} reqs "
+            f"{server.connections:>6} conns {server.failures:>4} 503s "
+            f"{total_mb / (server.wire_bytes / 1024 / 1024):>6.1f}x "
+            f"{'complete' if ok else 'ABORTED'}"
+        )
+
+    with StubServer(args.latency, args.failure_rate) as server:
+        start = time.perf_counter()
+        ok = all(send_chunk(chunk, server.url) for chunk in chunks)
+        report("send_chunk", time.perf_counter() - start, server, ok)
+
+    for concurrency in args.concurrency:
+        with StubServer(args.latency, args.failure_rate) as server:
+            start = time.perf_counter()
+            with ChunkSender(
+                server.url, concurrency=concurrency, backoff=0.05, encoding=encoding
+            ) as sender:
+                ok = sender.send_all(chunks)
+            elapsed = time.perf_counter() - start
+            received = sorted(payload["seq"] for payload in server.received)
+            ok = ok and received == list(range(args.chunks))
+            report(f"ChunkSender x{concurrency}", elapsed, server, ok)
+
+    for concurrency in args.concurrency:
+        with StubServer(args.latency, args.failure_rate) as server:
+            start = time.perf_counter()
+            with ChunkSender(
+                server.url, concurrency=concurrency, backoff=0.05, encoding=encoding,
+                collection_id="bench", collections_url=server.collections_url,
+                batch_bytes=args.batch_kb * 1024
+            ) as sender:
+                ok = sender.send_all(chunks) and sender.complete(len(chunks))
+            elapsed = time.perf_counter() - start
+            ok = ok and server.collections.get("bench") == "".join(chunks)
+            report(f"batched x{concurrency}", elapsed, server, ok)
+
+
+if __name__ == "__main__":
+    main()
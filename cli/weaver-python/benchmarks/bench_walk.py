@@ -0,0 +1,72 @@
+"""
+Benchmark: pruning os.scandir walk (serial and threaded) vs. rglob-then-filter.
+
+Generates a checkout whose node_modules dwarfs the source tree and times
+file enumeration both ways.
+
+    python -m benchmarks.bench_walk --source-files 2000 --dependency-files 100000
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Set
+
+from weaver.config import CollectorConfig
+from weaver.utils.file_utils import collect_files
+from weaver.utils.patterns import PatternMatcher
+from .synthetic import generate_node_modules_paths, write_tree
+
+
+def legacy_collect(directory: Path, extensions: Set[str], patterns: Set[str]) -> List[Path]:
+    """rglob every path, then filter one path at a time (pre-pruning walk)."""
+    matcher = PatternMatcher(patterns)
+    files = []
+    for path in directory.rglob("*"):
+        if not path.is_file() or path.suffix not in extensions:
+            continue
+        if not matcher.matches(str(path.relative_to(directory))):
+            files.append(path)
+    return files
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--source-files", type=int, default=2_000)
+    parser.add_argument("--dependency-files", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--scan-workers", type=int, default=8)
+    args = parser.parse_args(argv)
+
+    config = CollectorConfig()
+    extensions = config.extensions
+    patterns = config.get_effective_patterns()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        write_tree(root, generate_node_modules_paths(args.source_files, args.dependency_files))
+
+        legacy_best = pruned_best = parallel_best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            legacy = legacy_collect(root, extensions, patterns)
+            legacy_best = min(legacy_best, time.perf_counter() - start)
+
+            start = time.perf_counter()
+            pruned = list(collect_files(root, extensions, patterns, set()))
+            pruned_best = min(pruned_best, time.perf_counter() - start)
+
+            start = time.perf_counter()
+            parallel = list(collect_files(root, extensions, patterns, set(), args.scan_workers))
+            parallel_best = min(parallel_best, time.perf_counter() - start)
+
+        assert sorted(legacy) == pruned == parallel, "walkers disagree"
+        print(f"tree: {args.source_files:,} source + {args.dependency_files:,} node_modules files")
+        print(f"rglob + filter: {legacy_best:.3f}s ({len(legacy):,} files)")
+        print(f"pruned scandir: {pruned_best:.3f}s ({len(pruned):,} files)")
+        print(f"pruned, {args.scan_workers} threads: {parallel_best:.3f}s")
+        print(f"speedup:        {legacy_best / pruned_best:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
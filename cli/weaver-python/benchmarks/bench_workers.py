@@ -0,0 +1,68 @@
+"""
+Benchmark: record writing (_write_files) in the main process and on a
+process pool of 2, 4 and 8 workers.
+
+Records go to a RecordChunker that discards its chunks, so only reading,
+normalization, line counting and record encoding are measured. Speedup is
+bounded by the number of CPUs; on a single CPU the pool only adds overhead.
+
+    python -m benchmarks.bench_workers --files 20000
+"""
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+from weaver.collector import CodeCollector
+from weaver.config import CollectorConfig
+from weaver.utils.chunking import RecordChunker
+from weaver.utils.file_utils import collect_files
+from .synthetic import generate_paths, generate_sizes, write_repo
+
+
+def run(config: CollectorConfig, files: List[Path], repeat: int) -> float:
+    """Best of ``repeat`` runs of _write_files, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        collector = CodeCollector(config)
+        chunker = RecordChunker(lambda chunk: None, config.chunk_size)
+        start = time.perf_counter()
+        collector._write_files(files, chunker)
+        chunker.close()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=20_000)
+    parser.add_argument("--median-size", type=int, default=4096, help="median file size in bytes")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = Path(tmp)
+        paths = generate_paths(args.files)
+        written = write_repo(repo, paths, generate_sizes(args.files, median=args.median_size))
+        base = CollectorConfig(search_dir=repo, use_cache=False)
+        files = list(collect_files(
+            repo, base.extensions, base.get_effective_patterns(), set()
+        ))
+        print(f"{len(files):,} files, {written / 1024 / 1024:.1f} MB, {os.cpu_count()} CPUs")
+
+        baseline = None
+        for workers in args.workers:
+            config = base.model_copy(update={"workers": workers})
+            seconds = run(config, files, args.repeat)
+            baseline = baseline or seconds
+            print(
+                f"workers={workers:<2} {seconds:8.3f}s {len(files) / seconds:10,.0f} files/s"
+                f"  speedup {baseline / seconds:4.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+"""
+Local stand-in for the Weaver API, with injectable latency and failures.
+"""
+import gzip
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+class StubServer:
+    """
+    Threaded HTTP server accepting ``POST /api/text``, the ``/api/delta``
+    routes and the batched ``/api/collections`` routes, with an in-memory
+    blob store.
+
+    Each request sleeps ``latency`` seconds and fails with a 503 with
+    probability ``failure_rate``. Compressed text bodies are accepted for the
+    ``encodings`` given, like the real backend; anything else gets a 415.
+    Like the backend, every upload answer lists them in Accept-Encoding.
+    Accepted payloads are kept in ``received``; a chunk whose (collection,
+    seq) is already stored is answered 200 and not kept again. Batched
+    chunks are staged until their collection is completed; the joined text
+    is kept in ``collections`` and added to ``received``.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        failure_rate: float = 0.0,
+        seed: int = 0,
+        encodings: Iterable[str] = ("gzip",)
+    ):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.encodings = set(encodings)
+        self.wire_bytes = 0
+        self.received: List[dict] = []
+        self.blobs: Dict[str, str] = {}
+        self.requests = 0
+        self.failures = 0
+        self.connections = 0
+        # (collection, seq) of the chunks stored, and how many were sent again
+        self.stored: Set[Tuple[str, int]] = set()
+        self.duplicates = 0
+        self.staged: Dict[str, Dict[int, str]] = {}
+        self.collections: Dict[str, str] = {}
+        self.batches = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/api/text"
+
+    @property
+    def collections_url(self) -> str:
+        return self.url.rsplit("/", 1)[0] + "/collections"
+
+    def __enter__(self) -> "StubServer":
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Buffer the response so headers and body leave in one segment;
+            # otherwise Nagle + delayed ACK stall every keep-alive request
+            wbufsize = -1
+
+            def setup(self):
+                super().setup()
+                with stub._lock:
+                    stub.connections += 1
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                status, headers, reply = stub._handle(self.path, self.headers, body)
+                if not self.path.startswith("/api/delta/"):
+                    headers.setdefault("Accept-Encoding", ", ".join(sorted(stub.encodings)))
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                data = json.dumps(reply).encode("utf-8")
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def stop(self) -> None:
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def _handle(self, path: str, headers, body: bytes) -> Tuple[int, Dict[str, str], dict]:
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.requests += 1
+            self.wire_bytes += len(body)
+            if self._rng.random() < self.failure_rate:
+                self.failures += 1
+                return 503, {}, {}
+
+        if path.startswith("/api/delta/"):
+            return self._handle_delta(path.rsplit("/", 1)[1], json.loads(body))
+
+        encoding = headers.get("Content-Encoding", "identity").lower()
+        if encoding != "identity" and encoding not in self.encodings:
+            return 415, {"Accept-Encoding": ", ".join(sorted(self.encodings))}, {}
+
+        if path.startswith("/api/collections/"):
+            if encoding != "identity":
+                body = gzip.decompress(body)
+            _, _, _, collection, route = path.split("/")
+            return self._handle_collection(collection, route, json.loads(body))
+
+        if encoding != "identity":
+            payload = {
+                "content": gzip.decompress(body).decode("utf-8"),
+                "seq": int(headers.get("X-Chunk-Seq", -1)),
+                "digest": headers.get("X-Chunk-Digest"),
+                "collection": headers.get("X-Collection-Id"),
+            }
+        else:
+            payload = json.loads(body)
+
+        # Chunks with a digest are kept as blobs; a bare digest reuses one
+        digest = payload.get("digest")
+        if "content" not in payload:
+            if digest not in self.blobs:
+                return 409, {}, {"error": "Unknown chunk digest", "missing": [digest]}
+            payload["content"] = self.blobs[digest]
+        elif digest:
+            if hashlib.sha256(payload["content"].encode("utf-8")).hexdigest() != digest:
+                return 400, {}, {"error": "Chunk digest mismatch"}
+
+        # Like the backend, a (collection, seq) already stored is not stored again
+        key = (payload.get("collection"), payload.get("seq"))
+        with self._lock:
+            if digest:
+                self.blobs.setdefault(digest, payload["content"])
+            if key[0] is not None and key in self.stored:
+                self.duplicates += 1
+                return 200, {}, {}
+            if key[0] is not None:
+                self.stored.add(key)
+            self.received.append(payload)
+        return 201, {}, {}
+
+    def _handle_collection(
+        self, collection: str, route: str, payload: dict
+    ) -> Tuple[int, Dict[str, str], dict]:
+        """Same contract as the backend's collections router."""
+        if route == "chunks":
+            references = {c["digest"] for c in payload["chunks"] if "content" not in c}
+            missing = references - self.blobs.keys()
+            if missing:
+                return 409, {}, {"error": "Unknown chunk digest", "missing": sorted(missing)}
+            with self._lock:
+                self.batches += 1
+                staged = self.staged.setdefault(collection, {})
+                created = 0
+                for chunk in payload["chunks"]:
+                    content = chunk.get("content", self.blobs.get(chunk["digest"]))
+                    self.blobs.setdefault(chunk["digest"], content)
+                    if chunk["seq"] in staged:
+                        self.duplicates += 1
+                        continue
+                    staged[chunk["seq"]] = content
+                    created += 1
+            return 201, {}, {"received": len(payload["chunks"]), "staged": created}
+
+        if route == "complete":
+            with self._lock:
+                if collection in self.collections:
+                    return 200, {}, {"collection_id": collection}
+                staged = self.staged.get(collection, {})
+                missing = [seq for seq in range(payload["chunks"]) if seq not in staged]
+                if missing:
+                    return 409, {}, {"error": "Missing chunks", "missing": missing}
+                content = "".join(staged[seq] for seq in range(payload["chunks"]))
+                self.collections[collection] = content
+                self.received.append({"content": content, "collection": collection})
+                del self.staged[collection]
+            return 201, {}, {"collection_id": collection, "chunks": payload["chunks"]}
+
+        return 404, {}, {}
+
+    def _handle_delta(self, route: str, payload: dict) -> Tuple[int, Dict[str, str], dict]:
+        """Same contract as the backend's delta router."""
+        if route == "manifest":
+            digests = {entry["digest"] for entry in payload["files"]}
+            return 200, {}, {"missing": sorted(digests - self.blobs.keys())}
+
+        if route == "chunks":
+            return 200, {}, {"missing": sorted(set(payload["digests"]) - self.blobs.keys())}
+
+        if route == "blobs":
+            for blob in payload["blobs"]:
+                digest = hashlib.sha256(blob["content"].encode("utf-8")).hexdigest()
+                if digest != blob["digest"]:
+                    return 400, {}, {"error": f"Digest mismatch for {blob['digest']}"}
+            with self._lock:
+                for blob in payload["blobs"]:
+                    self.blobs.setdefault(blob["digest"], blob["content"])
+            return 201, {}, {"stored": len(payload["blobs"])}
+
+        if route == "collections":
+            missing = {e["digest"] for e in payload["files"]} - self.blobs.keys()
+            if missing:
+                return 409, {}, {"error": "Missing file contents", "missing": sorted(missing)}
+            records = "".join(
+                f"File: {e['path']}\n{'=' * 80}\n{self.blobs[e['digest']]}\n\n"
+                for e in payload["files"]
+            )
+            with self._lock:
+                self.received.append({"content": payload["header"] + records})
+            return 201, {}, {}
+
+        return 404, {}, {}
@@ -0,0 +1,230 @@
+"""
+Benchmark suite for the collector, with JSON results for comparing commits.
+
+Generates a deterministic synthetic repository and times each stage of a
+collection: the directory walk (collect_files), the per-entry include
+check (_should_include), record writing (_process_file), reading the
+collection back in chunks (read_in_chunks), and full CodeCollector runs
+against a local stub API, cold and with a warm cache.
+
+    python -m benchmarks.suite --files 5000 --output results.json
+    python -m benchmarks.suite --files 5000 --compare results.json
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from weaver.collector import CodeCollector
+from weaver.config import CollectorConfig
+from weaver.utils.chunking import RecordChunker
+from weaver.utils.file_utils import _should_include, collect_files, read_in_chunks
+from weaver.utils.patterns import PatternMatcher
+from .stub_server import StubServer
+from .synthetic import generate_paths, generate_sizes, write_repo
+
+
+def timed(fn: Callable[[], int], repeat: int) -> Dict[str, float]:
+    """Run ``fn`` ``repeat`` times; it returns the number of items it handled."""
+    runs = []
+    items = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        items = fn()
+        runs.append(time.perf_counter() - start)
+    best = min(runs)
+    return {
+        "best_s": round(best, 6),
+        "mean_s": round(statistics.mean(runs), 6),
+        "median_s": round(statistics.median(runs), 6),
+        "runs": repeat,
+        "items": items,
+        "items_per_s": round(items / best, 1) if best else None,
+    }
+
+
+def walk_entries(root: Path) -> List[tuple]:
+    """Every file under ``root`` as (DirEntry, relative path), excluded dirs included."""
+    entries = []
+    stack = [(str(root), "")]
+    while stack:
+        directory, prefix = stack.pop()
+        with os.scandir(directory) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append((entry.path, f"{prefix}{entry.name}/"))
+                else:
+                    entries.append((entry, prefix + entry.name))
+    return entries
+
+
+def run_collector(config: CollectorConfig) -> int:
+    """One headless collection; its JSON events are discarded."""
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        collector = CodeCollector(config)
+        collector.collect_and_send()
+    if collector.status != "complete":
+        raise RuntimeError(f"collection {collector.status}")
+    return collector.stats.total_files
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+            cwd=Path(__file__).parent
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(args: argparse.Namespace, root: Path) -> Dict[str, dict]:
+    paths = generate_paths(
+        args.files, seed=args.seed, excluded_ratio=args.excluded_ratio, max_depth=args.depth
+    )
+    sizes = generate_sizes(
+        args.files, seed=args.seed, median=args.median_size, sigma=args.size_sigma
+    )
+    written = write_repo(root / "repo", paths, sizes, seed=args.seed)
+    repo = root / "repo"
+    print(f"repository: {len(paths):,} files, {written / 1024 / 1024:.1f} MB", file=sys.stderr)
+
+    config = CollectorConfig(search_dir=repo, use_cache=False, headless=True)
+    extensions = config.extensions
+    patterns = config.get_effective_patterns()
+    files = list(collect_files(repo, extensions, patterns, set()))
+    results: Dict[str, dict] = {}
+
+    results["collect_files"] = timed(
+        lambda: len(list(collect_files(repo, extensions, patterns, set()))), args.repeat
+    )
+
+    entries = walk_entries(repo)
+    matcher = PatternMatcher(patterns)
+
+    def check_entries() -> int:
+        for entry, rel in entries:
+            _should_include(entry, rel, extensions, matcher)
+        return len(entries)
+
+    results["should_include"] = timed(check_entries, args.repeat)
+
+    collection = root / "collection.txt"
+
+    def process_files() -> int:
+        collector = CodeCollector(config)
+        with open(collection, "wb") as output:
+            chunker = RecordChunker(output.write, config.chunk_size)
+            for file in files:
+                collector._process_file(file, chunker)
+            chunker.close()
+        return len(files)
+
+    results["process_file"] = timed(process_files, args.repeat)
+    results["process_file"]["bytes"] = collection.stat().st_size
+
+    results["read_in_chunks"] = timed(
+        lambda: sum(1 for _ in read_in_chunks(collection, config.chunk_size)), args.repeat
+    )
+
+    with StubServer(latency=args.latency) as server:
+        run_config = config.model_copy(update={"api_endpoint": server.url})
+
+        def cold_run() -> int:
+            # Forget uploaded chunks so every chunk is sent in full
+            server.blobs.clear()
+            return run_collector(run_config)
+
+        results["collector_run"] = timed(cold_run, args.repeat)
+
+        cached_config = run_config.model_copy(
+            update={"use_cache": True, "cache_dir": root / "cache"}
+        )
+        run_collector(cached_config)
+        results["collector_run_cached"] = timed(
+            lambda: run_collector(cached_config), args.repeat
+        )
+
+    return results
+
+
+def compare(results: Dict[str, dict], baseline_path: Path, threshold: float) -> bool:
+    """Print current vs. baseline best times. Returns False if anything regressed."""
+    baseline = json.loads(baseline_path.read_text())
+    ok = True
+    print(f"{'benchmark':<22} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name, current in results.items():
+        before = baseline["results"].get(name)
+        if not before:
+            print(f"{name:<22} {'-':>10} {current['best_s']:>9.4f}s")
+            continue
+        change = current["best_s"] / before["best_s"] - 1
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            ok = False
+        print(
+            f"{name:<22} {before['best_s']:>9.4f}s {current['best_s']:>9.4f}s "
+            f"{change:>+7.1%}{flag}"
+        )
+    return ok
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--files", type=int, default=5_000)
+    parser.add_argument("--depth", type=int, default=6, help="maximum directory depth")
+    parser.add_argument("--median-size", type=int, default=4096, help="median file size in bytes")
+    parser.add_argument("--size-sigma", type=float, default=1.2,
+                        help="spread of the log-normal file size distribution")
+    parser.add_argument("--excluded-ratio", type=float, default=0.3,
+                        help="share of directories under excluded names (node_modules, .git, ...)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="stub API latency per request in seconds")
+    parser.add_argument("--output", type=Path, help="write results as JSON to this file")
+    parser.add_argument("--compare", type=Path, help="baseline results JSON to compare with")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="slowdown of the best time that counts as a regression")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = run_suite(args, Path(tmp))
+
+    document = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "params": {
+                key: value for key, value in vars(args).items()
+                if key not in ("output", "compare", "threshold")
+            },
+        },
+        "results": results,
+    }
+
+    for name, result in results.items():
+        print(f"{name:<22} {result['best_s']:>9.4f}s {result['items_per_s'] or 0:>12,.0f}/s")
+    if args.output:
+        args.output.write_text(json.dumps(document, indent=2) + "\n")
+    if args.compare and not compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
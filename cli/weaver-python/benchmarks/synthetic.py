@@ -0,0 +1,151 @@
+"""
+Deterministic synthetic repository layouts for benchmarks.
+"""
+import random
+from pathlib import Path
+from typing import Iterable, List, Sequence
+
+SOURCE_EXTENSIONS = ['.py', '.js', '.ts', '.tsx', '.go', '.rs', '.java', '.c', '.h']
+OTHER_EXTENSIONS = ['.md', '.txt', '.json', '.png', '.pyc', '.log', '.svg']
+EXCLUDED_DIRS = ['node_modules', '.git', 'venv', 'build', 'dist', 'target', '__pycache__']
+WORDS = [
+    'api', 'core', 'utils', 'models', 'views', 'services', 'handlers', 'lib',
+    'common', 'config', 'db', 'auth', 'cache', 'client', 'server', 'internal',
+]
+
+
+def generate_dirs(
+    count: int, rng: random.Random, excluded_ratio: float, max_depth: int = 6
+) -> List[str]:
+    """Generate ``count`` relative directory paths, nested up to ``max_depth`` levels."""
+    dirs = [""]
+    for _ in range(count):
+        parent = rng.choice(dirs)
+        if parent.count("/") >= max_depth - 1:
+            parent = ""
+        if rng.random() < excluded_ratio / 4:
+            name = rng.choice(EXCLUDED_DIRS)
+        else:
+            name = rng.choice(WORDS) + str(rng.randint(0, 20))
+        dirs.append(f"{parent}/{name}" if parent else name)
+    return dirs
+
+
+def generate_paths(
+    count: int, seed: int = 0, excluded_ratio: float = 0.3, max_depth: int = 6
+) -> List[str]:
+    """
+    Generate ``count`` relative file paths shaped like a real monorepo.
+
+    Files are spread over roughly ``count / 20`` directories, some of which
+    sit under dependency, cache or VCS directories the defaults exclude.
+    """
+    rng = random.Random(seed)
+    dirs = generate_dirs(max(count // 20, 1), rng, excluded_ratio, max_depth)
+    paths = []
+    for i in range(count):
+        directory = rng.choice(dirs)
+        if rng.random() < 0.8:
+            ext = rng.choice(SOURCE_EXTENSIONS)
+        else:
+            ext = rng.choice(OTHER_EXTENSIONS)
+        name = f"file_{i}{ext}"
+        paths.append(f"{directory}/{name}" if directory else name)
+    return paths
+
+
+def generate_node_modules_paths(
+    source_files: int, dependency_files: int, seed: int = 0
+) -> List[str]:
+    """
+    Generate a small source tree next to a heavy ``node_modules`` tree.
+
+    This is the typical JavaScript checkout: most of the files on disk
+    belong to installed packages that collection is going to exclude.
+    """
+    rng = random.Random(seed)
+    paths = [
+        f"src/{rng.choice(WORDS)}/{rng.choice(WORDS)}/file_{i}{rng.choice(SOURCE_EXTENSIONS)}"
+        for i in range(source_files)
+    ]
+    packages = max(dependency_files // 40, 1)
+    for i in range(dependency_files):
+        package = f"pkg{rng.randrange(packages)}"
+        subdir = rng.choice(["lib", "dist", "src", "lib/internal", "esm"])
+        paths.append(f"node_modules/{package}/{subdir}/module_{i}.js")
+    return paths
+
+
+def write_tree(root: Path, paths: Iterable[str], content: bytes = b"x = 1\n") -> None:
+    """Materialize relative ``paths`` as files under ``root``."""
+    made = set()
+    for relative in paths:
+        path = root / relative
+        parent = path.parent
+        if parent not in made:
+            parent.mkdir(parents=True, exist_ok=True)
+            made.add(parent)
+        path.write_bytes(content)
+
+
+def generate_sizes(
+    count: int,
+    seed: int = 0,
+    median: int = 4096,
+    sigma: float = 1.2,
+    max_size: int = 1024 * 1024
+) -> List[int]:
+    """
+    Generate ``count`` file sizes in bytes from a log-normal distribution.
+
+    Source trees are mostly small files with a long tail of large ones;
+    ``sigma`` controls how long the tail is.
+    """
+    rng = random.Random(seed)
+    return [
+        max(1, min(max_size, int(rng.lognormvariate(0, sigma) * median)))
+        for _ in range(count)
+    ]
+
+
+def _source_text(rng: random.Random, size: int) -> bytes:
+    """Code-like ASCII text to slice file contents from."""
+    lines = []
+    total = 0
+    while total < size:
+        indent = "    " * rng.randint(0, 3)
+        word = rng.choice(WORDS)
+        line = f"{indent}{word}_{rng.randint(0, 999)} = {word}.call({rng.random():.6f})\n"
+        lines.append(line)
+        total += len(line)
+    return "".join(lines).encode("ascii")
+
+
+def write_repo(
+    root: Path, paths: Sequence[str], sizes: Sequence[int], seed: int = 0
+) -> int:
+    """
+    Materialize ``paths`` with code-like contents of the given ``sizes``.
+
+    Each file is a slice of a shared block of generated lines starting at a
+    random line, so contents are deterministic and differ between files.
+    Returns the total number of bytes written.
+    """
+    rng = random.Random(seed)
+    block = _source_text(rng, 256 * 1024)
+    line_starts = [0] + [i + 1 for i, byte in enumerate(block) if byte == 0x0A][:-1]
+    made = set()
+    total = 0
+    for relative, size in zip(paths, sizes):
+        path = root / relative
+        parent = path.parent
+        if parent not in made:
+            parent.mkdir(parents=True, exist_ok=True)
+            made.add(parent)
+        start = rng.choice(line_starts)
+        data = block[start:start + size]
+        while len(data) < size:
+            data += block[:size - len(data)]
+        path.write_bytes(data)
+        total += size
+    return total
@@ -0,0 +1,106 @@
+"""
+RecordChunker: content-defined chunks of whole records.
+"""
+import random
+
+from weaver.utils.chunking import RecordChunker, read_chunks
+
+
+def records(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    result = []
+    for index in range(count):
+        lines = "".join(
+            f"line {line} of file {index}: {rng.random()}\n" for line in range(rng.randint(1, 40))
+        )
+        result.append(f"File: src/file_{index}.py\n{'=' * 80}\n{lines}\n\n".encode("utf-8"))
+    return result
+
+
+def chunk(pieces, max_size: int = 8192, **kwargs):
+    chunks = []
+    chunker = RecordChunker(chunks.append, max_size, **kwargs)
+    for piece in pieces:
+        chunker.write(piece)
+    chunker.close()
+    assert chunker.chunks_emitted == len(chunks)
+    return chunks
+
+
+def test_chunks_join_back_into_whole_records():
+    data = records(300)
+    chunks = chunk(data)
+
+    assert b"".join(chunks) == b"".join(data)
+    assert all(len(c) <= 8192 for c in chunks)
+    # Every chunk ends where a record ends
+    ends = set()
+    offset = 0
+    for record in data:
+        offset += len(record)
+        ends.add(offset)
+    offset = 0
+    for c in chunks:
+        offset += len(c)
+        assert offset in ends
+
+
+def test_chunk_sizes_stay_between_the_minimum_and_maximum():
+    chunks = chunk(records(1000), max_size=8192, min_size=2048, target_size=4096)
+
+    assert all(len(c) <= 8192 for c in chunks)
+    assert all(len(c) >= 2048 for c in chunks[:-1])
+
+
+def test_editing_one_record_changes_only_the_chunks_around_it():
+    data = records(500)
+    before = chunk(data)
+    edited = list(data)
+    edited[250] = edited[250].replace(b"line 0", b"line zero")
+    after = chunk(edited)
+
+    unchanged = set(before) & set(after)
+    assert len(unchanged) >= len(before) - 3
+    assert len(after) - len(unchanged) <= 3
+
+
+def test_records_larger_than_a_chunk_are_cut_on_lines():
+    big = b"".join(f"{line:06d} {'y' * 90}\n".encode() for line in range(500))
+    data = [b"header\n", big, b"footer\n"]
+    chunks = chunk(data, max_size=4096)
+
+    assert b"".join(chunks) == b"".join(data)
+    assert all(len(c) <= 4096 for c in chunks)
+    assert all(c.endswith(b"\n") for c in chunks)
+
+
+def test_long_lines_are_cut_at_character_boundaries():
+    line = ("héllo wörld ✓ " * 2000 + "\n").encode("utf-8")
+    chunks = chunk([line], max_size=1000)
+
+    assert b"".join(chunks) == line
+    assert all(len(c) <= 1000 for c in chunks)
+    for c in chunks:
+        c.decode("utf-8")
+
+
+def test_write_lines_gives_the_same_chunks_as_write():
+    small = records(3, seed=1)
+    big = b"".join(f"{line:06d} {'z' * 70}\n".encode() for line in range(300))
+    data = small + [big] + records(3, seed=2)
+
+    lines_chunks = []
+    chunker = RecordChunker(lines_chunks.append, 4096)
+    for record in data:
+        chunker.write_lines(memoryview(line) for line in record.splitlines(keepends=True))
+    chunker.close()
+
+    assert lines_chunks == chunk(data, max_size=4096)
+
+
+def test_read_chunks_reads_back_spooled_chunks(tmp_path):
+    chunks = chunk(records(50), max_size=2048)
+    spool = tmp_path / "chunks"
+    spool.write_bytes(b"".join(chunks))
+
+    assert list(read_chunks(spool, [len(c) for c in chunks])) == chunks
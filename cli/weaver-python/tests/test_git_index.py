@@ -0,0 +1,110 @@
+"""
+Listing tracked files from .git/index, checked against ``git ls-files``.
+"""
+import shutil
+import subprocess
+
+import pytest
+
+from weaver.utils.git_index import find_repository, list_tracked_files, read_index
+from weaver.utils.patterns import PatternMatcher
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git is not installed")
+
+FILES = [
+    "a.py", "a-b.py", "a/b.py", "a/c/d.py", "b.md", "src/main.py", "src/util.py",
+    "src/ignored.py", "src/deep/nested/module.py", "docs/guide.md", "tests/test_main.py",
+    "ünïcode/naïve.py", "long/" + "/".join(["x" * 100] * 3) + ".py",
+]
+
+
+def git(root, *args):
+    return subprocess.run(
+        ["git", "-C", str(root), *args], check=True, capture_output=True
+    ).stdout.decode("utf-8")
+
+
+@pytest.fixture
+def repository(tmp_path):
+    git(tmp_path, "init", "-q")
+    for path in FILES:
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).write_text(f"# {path}\n")
+    (tmp_path / "untracked.py").write_text("")
+    git(tmp_path, "add", *FILES)
+    # Tracked, then ignored: left out like git's own ignore rules would
+    (tmp_path / "src" / ".gitignore").write_text("ignored.py\n")
+    git(tmp_path, "add", "src/.gitignore")
+    return tmp_path
+
+
+def ls_files(root):
+    return set(git(root, "-c", "core.quotepath=off", "ls-files").splitlines())
+
+
+@pytest.mark.parametrize("version", [2, 3, 4])
+def test_reads_every_index_version(repository, version):
+    if version > 2:
+        # Version 3 only differs from 2 in entries with extended flags
+        git(repository, "update-index", "--skip-worktree", "src/util.py")
+    git(repository, "update-index", "--index-version", str(version))
+    index = repository / ".git" / "index"
+    assert int.from_bytes(index.read_bytes()[4:8], "big") == version
+    entries = list(read_index(index))
+
+    skipped = {"src/util.py"} if version > 2 else set()
+    assert {entry.path for entry in entries} == ls_files(repository) - skipped
+    for entry in entries:
+        stat = (repository / entry.path).stat()
+        assert entry.size == stat.st_size
+        assert entry.mtime_ns // 1_000_000_000 == int(stat.st_mtime)
+
+
+def test_lists_tracked_files_in_walk_order(repository):
+    tracked = list_tracked_files(repository, {".py"}, PatternMatcher([]))
+
+    assert [path.relative_to(repository).as_posix() for path in tracked.files] == [
+        "a/b.py", "a/c/d.py", "a-b.py", "a.py", "long/" + "/".join(["x" * 100] * 3) + ".py",
+        "src/deep/nested/module.py", "src/main.py", "src/util.py",
+        "tests/test_main.py", "ünïcode/naïve.py",
+    ]
+    assert len(tracked.stats) == len(tracked.files)
+
+
+def test_filters_like_the_walk_relative_to_the_search_directory(repository):
+    tracked = list_tracked_files(repository / "src", {".py"}, PatternMatcher(["deep/"]))
+
+    assert [path.relative_to(repository / "src").as_posix() for path in tracked.files] == [
+        "main.py", "util.py",
+    ]
+
+
+def test_skips_files_not_checked_out(repository):
+    git(repository, "update-index", "--skip-worktree", "src/util.py")
+    entries = {entry.path for entry in read_index(repository / ".git" / "index")}
+
+    assert "src/util.py" not in entries
+    assert "src/main.py" in entries
+
+
+def test_follows_a_git_file_to_the_worktree_git_directory(repository, tmp_path_factory):
+    git(repository, "-c", "user.name=t", "-c", "user.email=t@example.com", "commit", "-qm", "files")
+    worktree = tmp_path_factory.mktemp("worktree") / "checkout"
+    git(repository, "worktree", "add", "-q", str(worktree))
+
+    root, git_dir = find_repository(worktree / "src")
+    assert root == worktree.resolve()
+    assert git_dir.parent.parent == (repository / ".git").resolve()
+    tracked = list_tracked_files(worktree, {".md"}, PatternMatcher([]))
+    assert [path.relative_to(worktree).as_posix() for path in tracked.files] == ["b.md", "docs/guide.md"]
+
+
+def test_outside_a_repository(tmp_path):
+    assert list_tracked_files(tmp_path, {".py"}, PatternMatcher([])) is None
+
+
+def test_rejects_a_file_that_is_not_an_index(tmp_path):
+    (tmp_path / "index").write_bytes(b"not an index at all")
+
+    with pytest.raises(ValueError):
+        list(read_index(tmp_path / "index"))
@@ -0,0 +1,100 @@
+"""
+GitIgnore, checked against what ``git check-ignore`` says for the same rules.
+"""
+import shutil
+import subprocess
+
+import pytest
+
+from weaver.utils.gitignore import GitIgnore
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git is not installed")
+
+ROOT_RULES = [
+    "# build output",
+    "*.log",
+    "!keep.log",
+    "/build/",
+    "dist",
+    "docs/**/*.tmp",
+    "**/cache/",
+    "vendor/*",
+    "!vendor/allowed",
+    "secret?.txt",
+    "[abc].py",
+    r"\#literal",
+    "trailing   ",
+    "escaped\\ ",
+    "logs/",
+    "!logs/important.txt",
+]
+NESTED_RULES = {
+    "src": ["*.gen.py", "!keep.gen.py", "/local.py"],
+    "src/pkg": ["!*.log", "data/"],
+}
+PATHS = [
+    "app.log", "keep.log", "src/debug.log", "src/pkg/debug.log", "src/pkg/keep.log",
+    "build/out.py", "src/build/out.py", "dist/app.py", "src/dist", "lib/dist/x.py",
+    "docs/a.tmp", "docs/x/a.tmp", "docs/x/y/a.tmp", "docs/a.py",
+    "cache/x.py", "src/cache/x.py", "src/pkg/cache",
+    "vendor/lib.py", "vendor/allowed", "vendor/sub/x.py",
+    "secret1.txt", "secret12.txt", "src/secretA.txt",
+    "a.py", "b.py", "d.py", "#literal", "trailing", "trailing   ", "escaped ", "escaped",
+    "logs/important.txt", "logs/other.txt",
+    "src/x.gen.py", "src/keep.gen.py", "src/pkg/y.gen.py", "src/local.py", "src/pkg/local.py",
+    "src/pkg/data/x.py", "src/data/x.py", "main.py",
+]
+
+
+@pytest.fixture
+def repository(tmp_path):
+    subprocess.run(["git", "init", "-q", str(tmp_path)], check=True)
+    (tmp_path / ".gitignore").write_text("\n".join(ROOT_RULES) + "\n")
+    for directory, rules in NESTED_RULES.items():
+        (tmp_path / directory).mkdir(parents=True, exist_ok=True)
+        (tmp_path / directory / ".gitignore").write_text("\n".join(rules) + "\n")
+    for path in PATHS:
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).write_text("")
+    return tmp_path
+
+
+def git_ignored(root, paths):
+    result = subprocess.run(
+        ["git", "-C", str(root), "check-ignore", "--no-index", "--stdin", "-z"],
+        input="\0".join(paths) + "\0", capture_output=True, text=True
+    )
+    assert result.returncode in (0, 1), result.stderr
+    return {path for path in result.stdout.split("\0") if path}
+
+
+def test_matches_git_check_ignore(repository):
+    ignore = GitIgnore({"": ROOT_RULES, **NESTED_RULES})
+    expected = git_ignored(repository, PATHS)
+
+    assert {path for path in PATHS if ignore.ignored(path)} == expected
+
+
+def test_directories_match_directory_only_rules(repository):
+    ignore = GitIgnore({"": ROOT_RULES, **NESTED_RULES})
+    directories = ["build", "src/build", "cache", "src/cache", "logs", "src/pkg/data", "src/data"]
+
+    ignored = {path for path in directories if ignore.ignored(path, is_dir=True)}
+    assert {path + "/" for path in ignored} == git_ignored(repository, [path + "/" for path in directories])
+    # A file of that name does not match a directory-only rule
+    assert not ignore.ignored("src/pkg/cache")
+
+
+def test_info_exclude_is_overridden_by_the_gitignore_files():
+    ignore = GitIgnore({"": ["*.py", "!main.py"], "src": ["!*.py"]})
+
+    assert ignore.ignored("app.py")
+    assert not ignore.ignored("main.py")
+    assert not ignore.ignored("src/app.py")
+
+
+def test_nothing_inside_an_ignored_directory_is_reincluded():
+    ignore = GitIgnore({"": ["build/", "!build/keep.py"]})
+
+    assert ignore.ignored("build/keep.py")
+    assert ignore.ignored("build/deep/keep.py")
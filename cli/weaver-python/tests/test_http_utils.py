@@ -0,0 +1,238 @@
+"""
+ChunkSender and AsyncChunkSender against the local stand-in server.
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from benchmarks.stub_server import StubServer
+from weaver.utils import http_utils
+from weaver.utils.http_utils import AsyncChunkSender, ChunkSender
+
+
+class FlakyServer(StubServer):
+    """Answers the first ``failures`` requests with ``status`` (a 503 by default)."""
+
+    def __init__(self, failures: int, status: int = 503, **kwargs):
+        super().__init__(**kwargs)
+        self.remaining_failures = failures
+        self.status = status
+
+    def _handle(self, path, headers, body):
+        with self._lock:
+            fail = self.remaining_failures > 0
+            self.remaining_failures -= fail
+        if fail:
+            with self._lock:
+                self.requests += 1
+                self.failures += 1
+            return self.status, {}, {}
+        return super()._handle(path, headers, body)
+
+
+class CountingServer(StubServer):
+    """Records the most requests handled at the same time."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def _handle(self, path, headers, body):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            return super()._handle(path, headers, body)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Backoff delays the senders asked for; nothing actually sleeps."""
+    delays = []
+
+    async def async_sleep(seconds):
+        delays.append(seconds)
+
+    monkeypatch.setattr(http_utils.time, "sleep", delays.append)
+    monkeypatch.setattr(http_utils.asyncio, "sleep", async_sleep)
+    return delays
+
+
+def chunks(count: int, size: int = 1000):
+    return [f"{seq:08d}" + "x" * (size - 8) for seq in range(count)]
+
+
+def test_retries_503_with_exponential_backoff(sleeps):
+    errors = []
+    with FlakyServer(failures=2) as server, ChunkSender(
+        server.url, max_retries=3, backoff=0.5, on_error=errors.append
+    ) as sender:
+        assert sender.send("chunk", 0)
+
+    assert sleeps == [0.5, 1.0]
+    assert sender.retries == 2
+    assert server.requests == 3
+    assert [payload["content"] for payload in server.received] == ["chunk"]
+    assert errors == []
+
+
+def test_fails_once_max_retries_are_used_up(sleeps):
+    errors = []
+    with StubServer(failure_rate=1.0) as server, ChunkSender(
+        server.url, max_retries=2, backoff=0.5, on_error=errors.append
+    ) as sender:
+        assert not sender.send("chunk", 0)
+
+    assert server.requests == 3
+    assert sleeps == [0.5, 1.0]
+    assert sender.chunks_sent == 0
+    assert len(errors) == 1
+    assert "after 3 attempts" in errors[0] and "503" in errors[0]
+
+
+def test_send_all_stops_after_a_chunk_fails_for_good(sleeps):
+    errors = []
+    with StubServer(failure_rate=1.0) as server, ChunkSender(
+        server.url, concurrency=2, max_retries=1, on_error=errors.append
+    ) as sender:
+        assert not sender.send_all(chunks(20))
+
+    # Only the chunks in flight when the first one failed were attempted
+    assert server.requests == 2 * 2
+    assert sender.chunks_sent == 0
+
+
+def test_times_out_a_request_the_server_does_not_answer():
+    errors = []
+    with StubServer(latency=1.0) as server, ChunkSender(
+        server.url, max_retries=0, timeout=(1, 0.2), on_error=errors.append
+    ) as sender:
+        start = time.perf_counter()
+        assert not sender.send("chunk", 0)
+        elapsed = time.perf_counter() - start
+
+    assert elapsed < 0.9
+    assert len(errors) == 1 and "timed out" in errors[0].lower()
+
+
+def test_async_sender_times_out_a_request_the_server_does_not_answer():
+    errors = []
+
+    async def send(url):
+        async with AsyncChunkSender(
+            url, max_retries=0, timeout=(1, 0.2), on_error=errors.append
+        ) as sender:
+            return await sender.send_async("chunk", 0)
+
+    with StubServer(latency=1.0) as server:
+        start = time.perf_counter()
+        assert not asyncio.run(send(server.url))
+        elapsed = time.perf_counter() - start
+
+    assert elapsed < 0.9
+    assert len(errors) == 1 and "timed out" in errors[0].lower()
+
+
+def test_concurrent_sends_acknowledge_every_chunk_once():
+    data = chunks(24)
+    acked = []
+    lock = threading.Lock()
+
+    def on_sent(seq):
+        with lock:
+            acked.append(seq)
+
+    with CountingServer(latency=0.02) as server, ChunkSender(
+        server.url, concurrency=4, collection_id="c1", on_sent=on_sent
+    ) as sender:
+        assert sender.send_all(data)
+
+    assert sorted(acked) == list(range(len(data)))
+    assert 1 < server.max_in_flight <= 4
+    received = sorted(server.received, key=lambda payload: payload["seq"])
+    assert [payload["seq"] for payload in received] == list(range(len(data)))
+    assert "".join(payload["content"] for payload in received) == "".join(data)
+
+
+def test_concurrent_retries_keep_chunks_in_order(sleeps):
+    data = chunks(16)
+    with FlakyServer(failures=5) as server, ChunkSender(
+        server.url, concurrency=4, max_retries=5, collection_id="c1"
+    ) as sender:
+        assert sender.send_all(data)
+
+    assert sender.retries == 5
+    assert server.duplicates == 0
+    received = sorted(server.received, key=lambda payload: payload["seq"])
+    assert "".join(payload["content"] for payload in received) == "".join(data)
+
+
+def test_async_sender_retries_503_with_exponential_backoff(sleeps):
+    async def send(url):
+        async with AsyncChunkSender(url, max_retries=3, backoff=0.5) as sender:
+            return await sender.send_async("chunk", 0), sender.retries
+
+    with FlakyServer(failures=2) as server:
+        assert asyncio.run(send(server.url)) == (True, 2)
+
+    assert sleeps == [0.5, 1.0]
+    assert server.requests == 3
+
+
+class LegacyServer(StubServer):
+    """A backend that predates compression: compressed chunks fail with a 500, without Accept-Encoding."""
+
+    def start(self):
+        super().start()
+        handler = self._server.RequestHandlerClass
+        send_header = handler.send_header
+
+        def send_header_except_accept_encoding(request, name, value):
+            if name != "Accept-Encoding":
+                send_header(request, name, value)
+
+        handler.send_header = send_header_except_accept_encoding
+
+    def _handle(self, path, headers, body):
+        if headers.get("Content-Encoding"):
+            with self._lock:
+                self.requests += 1
+            return 500, {}, {"error": "Failed to save text data"}
+        return super()._handle(path, headers, body)
+
+
+def test_switches_to_an_encoding_the_server_accepts_after_415():
+    with StubServer(encodings=()) as server, ChunkSender(server.url, encoding="gzip") as sender:
+        assert sender.send("x" * 1000, 0)
+
+    assert sender.encoding is None
+    assert sender.retries == 0
+    assert [payload["content"] for payload in server.received] == ["x" * 1000]
+
+
+def test_falls_back_to_plain_json_on_a_backend_without_compression(sleeps):
+    with LegacyServer() as server, ChunkSender(
+        server.url, concurrency=2, encoding="gzip"
+    ) as sender:
+        assert sender.send_all(["a" * 1000, "b" * 1000, "c"])
+
+    assert sender.encoding is None
+    assert sender.retries == 0
+    assert "".join(payload["content"] for payload in server.received) == "a" * 1000 + "b" * 1000 + "c"
+
+
+def test_keeps_compressing_after_a_transient_500(sleeps):
+    with FlakyServer(failures=1, status=500) as server, ChunkSender(
+        server.url, encoding="gzip"
+    ) as sender:
+        assert sender.send_all(["a" * 1000, "b" * 1000])
+
+    assert sender.encoding == "gzip"
+    assert sender.retries == 1
+    assert sleeps == [0.5]
@@ -0,0 +1,136 @@
+"""
+SendJournal: persisting acknowledgements and resuming an upload from them.
+"""
+import hashlib
+import json
+
+import pytest
+
+from benchmarks.stub_server import StubServer
+from weaver.journal import SendJournal, find_journals
+from weaver.utils.http_utils import ChunkSender
+
+CHUNKS = [f"{seq:04d}".encode() + bytes([65 + seq]) * 500 for seq in range(10)]
+
+
+def spool(directory, collection_id="c1", chunks=CHUNKS, **kwargs):
+    SendJournal.chunk_path_for(directory, collection_id).write_bytes(b"".join(chunks))
+    return SendJournal.create(
+        directory, collection_id, "http://localhost/api/text",
+        [len(chunk) for chunk in chunks],
+        [hashlib.sha256(chunk).hexdigest() for chunk in chunks],
+        **kwargs
+    )
+
+
+def test_acknowledgements_survive_a_reload(tmp_path):
+    journal = spool(tmp_path)
+    for seq in (0, 1, 4, 1):
+        journal.ack(seq)
+    journal.close()
+
+    loaded = SendJournal.load(journal.path)
+    assert loaded.acked == {0, 1, 4}
+    assert loaded.pending == [2, 3, 5, 6, 7, 8, 9]
+    assert not loaded.complete
+    assert loaded.total_bytes == sum(len(chunk) for chunk in CHUNKS)
+    assert loaded.sizes == journal.sizes and loaded.digests == journal.digests
+
+
+def test_a_half_written_last_line_is_not_an_acknowledgement(tmp_path):
+    journal = spool(tmp_path)
+    journal.ack(0)
+    journal.close()
+    with open(journal.path, "a") as f:
+        f.write("7")
+
+    assert SendJournal.load(journal.path).acked == {0}
+
+
+def test_rejects_files_that_are_not_journals(tmp_path):
+    (tmp_path / "garbage.journal").write_text("not json\n")
+    (tmp_path / "future.journal").write_text(json.dumps({"version": 99}) + "\n")
+
+    for name in ("garbage.journal", "future.journal"):
+        with pytest.raises(ValueError):
+            SendJournal.load(tmp_path / name)
+
+
+def test_reads_back_the_chunks_it_journaled(tmp_path):
+    journal = spool(tmp_path)
+
+    assert list(journal.read_chunks([3, 7])) == [(3, CHUNKS[3]), (7, CHUNKS[7])]
+
+
+def test_refuses_a_spool_file_that_changed(tmp_path):
+    journal = spool(tmp_path)
+    data = bytearray(journal.chunk_path.read_bytes())
+    data[len(CHUNKS[0]) + 10] ^= 1
+    journal.chunk_path.write_bytes(bytes(data))
+
+    assert list(journal.read_chunks([0])) == [(0, CHUNKS[0])]
+    with pytest.raises(ValueError):
+        list(journal.read_chunks([1]))
+
+
+def test_find_journals_lists_resumable_uploads_newest_first(tmp_path):
+    for collection_id, created in (("newer", "2024-05-02"), ("older", "2024-05-01")):
+        journal = spool(tmp_path, collection_id, batched=collection_id == "newer")
+        journal.close()
+        header, *acks = journal.path.read_text().splitlines(keepends=True)
+        header = json.dumps({**json.loads(header), "created": created}) + "\n"
+        journal.path.write_text("".join([header, *acks]))
+    orphan = spool(tmp_path, "orphan")
+    orphan.close()
+    orphan.chunk_path.unlink()
+    (tmp_path / "broken.journal").write_text("{")
+
+    found = find_journals(tmp_path)
+    assert [journal.collection_id for journal in found] == ["newer", "older"]
+    assert found[0].batched and not found[1].batched
+
+
+def test_remove_deletes_the_journal_and_its_chunks(tmp_path):
+    journal = spool(tmp_path)
+    journal.remove()
+
+    assert journal.removed
+    assert not journal.path.exists() and not journal.chunk_path.exists()
+    assert find_journals(tmp_path) == []
+
+
+class FailingAfter(StubServer):
+    """Accepts ``accepted`` chunks, then fails every request with a 503."""
+
+    def __init__(self, accepted: int, **kwargs):
+        super().__init__(**kwargs)
+        self.accepted = accepted
+
+    def _handle(self, path, headers, body):
+        with self._lock:
+            fail = len(self.stored) >= self.accepted
+        if fail:
+            return 503, {}, {}
+        return super()._handle(path, headers, body)
+
+
+def test_resume_sends_only_the_unacknowledged_chunks(tmp_path):
+    journal = spool(tmp_path)
+    with FailingAfter(accepted=4) as server:
+        with ChunkSender(
+            server.url, max_retries=0, collection_id="c1",
+            on_sent=journal.ack, on_error=lambda message: None
+        ) as sender:
+            assert not sender.send_numbered(journal.read_chunks(range(len(CHUNKS))))
+        journal.close()
+
+        resumed = find_journals(tmp_path)[0]
+        assert resumed.pending == list(range(4, len(CHUNKS)))
+        server.accepted = len(CHUNKS)
+        with ChunkSender(server.url, collection_id="c1", on_sent=resumed.ack) as sender:
+            assert sender.send_numbered(resumed.read_chunks(resumed.pending))
+
+    assert resumed.complete
+    assert server.duplicates == 0
+    received = sorted(server.received, key=lambda payload: payload["seq"])
+    assert [payload["content"].encode() for payload in received] == CHUNKS
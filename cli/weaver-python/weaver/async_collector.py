@@ -0,0 +1,325 @@
+"""
+Asyncio collection engine (``--engine async``).
+
+The sync engine runs its stages one after another: scan, read every file,
+then upload (with ``--stream``, uploading on a thread while reading). Here
+the stages are tasks on one event loop, joined by bounded queues:
+
+    scan thread -> read threads -> writer (chunking) -> uploaders
+
+Files are read on a pool of ``read_threads`` while the scan is still
+running, and chunks are uploaded as soon as they are cut, over the
+keep-alive connections of an AsyncHTTPClient. Every queue is bounded, so a
+slow stage holds back the ones before it, and at most about
+``read_threads * READ_AHEAD * READ_BATCH`` file contents and ``upload_queue_depth``
+chunks are held in memory.
+
+The metadata header lists every collected file and must come first, so
+records are written (and uploaded) only once the scan is done; until then
+reads run ahead of it by the read-ahead window.
+"""
+import asyncio
+import itertools
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from pathlib import Path
+from typing import Awaitable, Deque, List, NamedTuple, Optional, Tuple
+
+from .collector import CodeCollector
+from .utils.charset import skip_reason
+from .utils.chunking import RecordChunker
+from .utils.compression import resolve_encoding
+from .utils.file_utils import SourceFile, file_record, read_source
+from .utils.http_utils import AsyncChunkSender
+
+ENGINES = ("sync", "async")
+
+# Files are read in groups of READ_BATCH, one executor job each, so the
+# per-job overhead is paid once per group; READ_AHEAD groups per read
+# thread may be waiting for the writer
+READ_BATCH = 8
+READ_AHEAD = 2
+# Scanned paths are handed to the event loop in batches
+SCAN_BATCH = 256
+
+
+class _Loaded(NamedTuple):
+    """A file as read on a read thread, ready for the writer."""
+    rel_path: Optional[str]
+    source: Optional[SourceFile]
+    tokens: int = 0
+    record: Optional[bytes] = None
+    error: Optional[Exception] = None
+    # Large files are left to the writer, which streams them from a memory map
+    mapped: bool = False
+    seconds: float = 0.0
+
+
+class _Stopped(Exception):
+    """The pipeline is shutting down."""
+
+
+class AsyncCodeCollector(CodeCollector):
+    """
+    CodeCollector whose scan, reads and uploads overlap on an asyncio event
+    loop. The live UI and the headless reporter work as with the sync
+    engine; both only read the collector's counters.
+
+    Delta uploads and budgets need the complete file list before anything
+    is read (to build the manifest, or to rank files), so with either the
+    scan finishes first, as in the sync engine; budgeted collections still
+    read and upload through the pipeline.
+    """
+
+    def _collect_and_send(self) -> None:
+        if self.config.delta or self._create_budget().active:
+            super()._collect_and_send()
+            return
+
+        self._start_run()
+        self._open_cache()
+        self._run_with_ui(lambda: asyncio.run(self._pipeline()))
+
+    def _upload(self, files: List[Path]) -> None:
+        if self.config.delta:
+            super()._upload(files)
+        else:
+            asyncio.run(self._pipeline(files))
+
+    def _create_async_sender(self) -> AsyncChunkSender:
+        self._sender = AsyncChunkSender(
+            self.config.api_endpoint,
+            concurrency=self.config.upload_concurrency,
+            max_retries=self.config.max_retries,
+            timeout=self.config.request_timeout,
+            encoding=resolve_encoding(self.config.compression),
+            on_error=self._error,
+            collection_id=self.collection_id,
+            collections_url=self.config.get_api_url("collections"),
+            batch_bytes=self.config.batch_bytes
+        )
+        return self._sender
+
+    async def _pipeline(self, files: Optional[List[Path]] = None) -> None:
+        """Scan (unless ``files`` is given), read, chunk and upload concurrently."""
+        loop = asyncio.get_running_loop()
+        scanned: List[Path] = []
+        scan_done = asyncio.Event()
+        found: asyncio.Queue = asyncio.Queue()
+        to_read: asyncio.Queue = asyncio.Queue()
+        loads: asyncio.Queue = asyncio.Queue(self.config.read_threads * READ_AHEAD)
+        chunks: asyncio.Queue = asyncio.Queue(self.config.upload_queue_depth)
+        stopped = threading.Event()
+        readers = ThreadPoolExecutor(self.config.read_threads, thread_name_prefix="weaver-read")
+        # The scan and large files each get a thread of their own, so they
+        # never wait behind reads
+        helpers = ThreadPoolExecutor(2, thread_name_prefix="weaver-pipeline")
+        loop_thread = threading.current_thread()
+        seqs = itertools.count()
+        pending: Deque[Tuple[int, bytes]] = deque()
+        emitted = 0
+
+        def list_files() -> None:
+            batch = []
+            try:
+                for file in self._list_files():
+                    if stopped.is_set():
+                        return
+                    batch.append(file)
+                    if len(batch) >= SCAN_BATCH:
+                        loop.call_soon_threadsafe(found.put_nowait, batch)
+                        batch = []
+                loop.call_soon_threadsafe(found.put_nowait, batch)
+            finally:
+                loop.call_soon_threadsafe(found.put_nowait, None)
+
+        async def scan() -> None:
+            if files is None:
+                start = time.perf_counter()
+                scanning = loop.run_in_executor(helpers, list_files)
+                while True:
+                    batch = await found.get()
+                    if batch is None:
+                        break
+                    scanned.extend(batch)
+                    self._total_files = len(scanned)
+                    to_read.put_nowait(batch)
+                await scanning
+                self.phase_times["scan"] = time.perf_counter() - start
+            else:
+                scanned.extend(files)
+                to_read.put_nowait(files)
+            self._files_found = self._files_found or len(scanned)
+            self._total_files = len(scanned)
+            scan_done.set()
+            to_read.put_nowait(None)
+
+        async def read() -> None:
+            # Bounded by the loads queue: at most its size files are read ahead
+            while True:
+                batch = await to_read.get()
+                if batch is None:
+                    break
+                for i in range(0, len(batch), READ_BATCH):
+                    group = batch[i:i + READ_BATCH]
+                    await loads.put((group, loop.run_in_executor(readers, self._load_all, group)))
+            await loads.put(None)
+
+        def emit(chunk: bytes) -> None:
+            item = (next(seqs), chunk)
+            if threading.current_thread() is loop_thread:
+                pending.append(item)
+                return
+            # Large files are chunked on a helper thread, which waits for
+            # room; once the pipeline stops, chunks are dropped
+            if stopped.is_set():
+                return
+            future = asyncio.run_coroutine_threadsafe(chunks.put(item), loop)
+            while True:
+                try:
+                    return future.result(timeout=0.1)
+                except FutureTimeoutError:
+                    if stopped.is_set():
+                        future.cancel()
+                        return
+
+        async def drain() -> None:
+            while pending:
+                await chunks.put(pending.popleft())
+
+        async def write() -> None:
+            nonlocal emitted
+            # The header needs the complete list; reads continue meanwhile
+            await scan_done.wait()
+            if not scanned:
+                self._warn("No files found matching criteria")
+            else:
+                chunker = self._create_chunker(emit)
+                self._write_metadata(chunker, scanned)
+                # The header carries a timestamp; keep it out of the chunks that hold files
+                chunker.flush()
+                await drain()
+                while True:
+                    item = await loads.get()
+                    if item is None:
+                        break
+                    group, loading = item
+                    for file, loaded in zip(group, await loading):
+                        await self._write_loaded(file, loaded, chunker, helpers)
+                        await drain()
+                chunker.close()
+                await drain()
+                emitted = chunker.chunks_emitted
+
+                self._header_title = "Uploading Collection"
+                self._current_file = (
+                    f"Sending last {chunker.chunks_emitted - sender.chunks_sent} chunks"
+                )
+            for _ in uploaders:
+                await chunks.put(None)
+
+        async def upload() -> None:
+            while True:
+                item = await chunks.get()
+                if item is None:
+                    return
+                if not sender.batching:
+                    seq, chunk = item
+                    if not await sender.send_async(chunk, seq):
+                        raise _Stopped()
+                    continue
+                # Batch whatever else is already queued, up to batch_bytes
+                batch = [item]
+                size = len(item[1])
+                done = False
+                while size < sender.batch_bytes and not chunks.empty():
+                    item = chunks.get_nowait()
+                    if item is None:
+                        done = True
+                        break
+                    batch.append(item)
+                    size += len(item[1])
+                if not await sender.send_batch_async(batch):
+                    raise _Stopped()
+                if done:
+                    return
+
+        sender = self._create_async_sender()
+        uploaders = range(self.config.upload_concurrency)
+        try:
+            with self._phase("pipeline"):
+                await _run_all([scan(), read(), write(), *(upload() for _ in uploaders)])
+                if emitted and sender.batching:
+                    self._current_file = "Assembling collection"
+                    if not await sender.complete_async(emitted):
+                        raise _Stopped()
+        except _Stopped:
+            self._fail("Error sending chunk. Aborting.")
+        finally:
+            stopped.set()
+            readers.shutdown(wait=False, cancel_futures=True)
+            helpers.shutdown(wait=False, cancel_futures=True)
+            await sender.aclose()
+
+    async def _write_loaded(
+        self, file: Path, loaded: _Loaded, output: RecordChunker, helpers: ThreadPoolExecutor
+    ) -> None:
+        """Count a file read by _load and write its record (the writer's share of _process_file)."""
+        self._current_file = str(file)
+        if loaded.mapped:
+            await asyncio.get_running_loop().run_in_executor(
+                helpers, self._process_file, file, output
+            )
+        elif loaded.error is not None:
+            self._error(f"Error processing {file}: {loaded.error}")
+        else:
+            source = loaded.source
+            if self._count_file(file, source.size, source.lines, source.encoding, loaded.tokens):
+                output.write(loaded.record)
+            if self.profiler:
+                self.profiler.record_file(str(file), loaded.seconds, source.size)
+        self._processed_files += 1
+        if self.reporter and self.reporter.due():
+            self._report_progress()
+
+    def _load_all(self, files: List[Path]) -> List[_Loaded]:
+        return [self._load(file) for file in files]
+
+    def _load(self, file: Path) -> _Loaded:
+        """Read, analyse and encode a file on a read thread; statistics are left to the writer."""
+        start = time.perf_counter()
+        try:
+            rel_path = str(file.relative_to(self.config.search_dir))
+            threshold = self.config.mmap_threshold
+            if self.cache is None and not threshold:
+                source = read_source(file)
+            else:
+                stat = file.stat()
+                if threshold and stat.st_size >= threshold:
+                    return _Loaded(rel_path, None, mapped=True)
+                source = (
+                    self._read_cached(file, rel_path, stat) if self.cache else read_source(file)
+                )
+            if skip_reason(source.encoding):
+                return _Loaded(rel_path, source, seconds=time.perf_counter() - start)
+            tokens = self._count_tokens(file, source)
+            record = file_record(rel_path, source.data)
+        except Exception as e:
+            return _Loaded(None, None, error=e)
+        return _Loaded(rel_path, source, tokens, record, seconds=time.perf_counter() - start)
+
+
+async def _run_all(stages: List[Awaitable[None]]) -> None:
+    """Run stages concurrently; the first to fail cancels the others and its error is raised."""
+    tasks = [asyncio.ensure_future(stage) for stage in stages]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        for task in done:
+            if task.exception() is not None:
+                raise task.exception()
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,144 @@
+"""
+Size budgets for ``--max-bytes``/``--max-tokens``.
+
+Files are chosen from stat data alone, before any of them is read: files
+over the per-file cap are dropped, the rest are ranked by priority and
+taken while they fit the budget. Files that are not selected are never
+opened.
+"""
+from collections import Counter
+from pathlib import Path
+from typing import Iterable, List, Mapping, NamedTuple, Optional, Tuple
+
+from .utils.patterns import PatternMatcher
+
+# Rough size of a token in source code, for budgeting from file sizes
+BYTES_PER_TOKEN = 4
+
+# path: sorted path order (the default walk order); recent: most recently
+# modified first; smallest: smallest first, which fits the most files
+PRIORITIES = ("path", "recent", "smallest")
+
+
+def estimate_tokens(size: int) -> int:
+    """Estimated tokens in ``size`` bytes of source."""
+    return -(-size // BYTES_PER_TOKEN)
+
+
+def parse_weights(specs: Iterable[str]) -> List[Tuple[str, float]]:
+    """
+    Parse ``PATTERN=WEIGHT`` path weights. Patterns use the exclusion
+    pattern syntax; raises ValueError for a malformed spec.
+    """
+    weights = []
+    for spec in specs:
+        pattern, sep, weight = spec.rpartition("=")
+        try:
+            if not sep or not pattern:
+                raise ValueError
+            weights.append((pattern, float(weight)))
+        except ValueError:
+            raise ValueError(f"Invalid path weight {spec!r}: expected PATTERN=WEIGHT") from None
+    return weights
+
+
+class Selection(NamedTuple):
+    files: List[Path]
+    bytes: int
+    tokens: int
+    # Files left out, by reason: too_large, over_budget
+    skipped: Counter
+
+
+class Budget:
+    """
+    Pick files for a byte and/or token budget.
+
+    Files with a higher path weight (the largest weight of the patterns
+    matching them, 1 by default) come first; within a weight, the
+    ``priority`` order applies. Files are then taken in that order,
+    skipping any that would overflow the budget, and returned in it.
+    """
+
+    def __init__(
+        self,
+        search_dir: Path,
+        max_bytes: Optional[int] = None,
+        max_tokens: Optional[int] = None,
+        max_file_size: Optional[int] = None,
+        priority: str = "path",
+        weights: Iterable[Tuple[str, float]] = ()
+    ):
+        if priority not in PRIORITIES:
+            raise ValueError(
+                f"Unknown priority {priority!r}: expected one of {', '.join(PRIORITIES)}"
+            )
+        self.search_dir = search_dir
+        self.max_bytes = max_bytes
+        self.max_tokens = max_tokens
+        self.max_file_size = max_file_size
+        self.priority = priority
+        self.weights = [(PatternMatcher([pattern]), weight) for pattern, weight in weights]
+
+    @property
+    def active(self) -> bool:
+        """Whether selection changes anything, i.e. files need to be stat-ed."""
+        return bool(
+            self.max_bytes or self.max_tokens or self.max_file_size
+            or self.weights or self.priority != "path"
+        )
+
+    def select(
+        self, files: List[Path], known: Optional[Mapping[Path, Tuple[int, int]]] = None
+    ) -> Selection:
+        """
+        Select from ``files``. Files with a (size, mtime_ns) in ``known``,
+        e.g. from the git index, are not stat-ed.
+        """
+        skipped: Counter = Counter()
+        ranked = []
+        for index, file in enumerate(files):
+            if known and file in known:
+                size, mtime_ns = known[file]
+            else:
+                try:
+                    stat = file.stat()
+                except OSError:
+                    # Left in so that reading it reports the error
+                    ranked.append((self._rank(file, 0, 0, index), file, 0))
+                    continue
+                size, mtime_ns = stat.st_size, stat.st_mtime_ns
+            if self.max_file_size and size > self.max_file_size:
+                skipped["too_large"] += 1
+                continue
+            ranked.append((self._rank(file, size, mtime_ns, index), file, size))
+        ranked.sort()
+
+        selected = []
+        total_bytes = total_tokens = 0
+        for _, file, size in ranked:
+            tokens = estimate_tokens(size)
+            if (self.max_bytes and total_bytes + size > self.max_bytes) or \
+                    (self.max_tokens and total_tokens + tokens > self.max_tokens):
+                skipped["over_budget"] += 1
+                continue
+            selected.append(file)
+            total_bytes += size
+            total_tokens += tokens
+        return Selection(selected, total_bytes, total_tokens, skipped)
+
+    def _rank(self, file: Path, size: int, mtime_ns: int, index: int) -> tuple:
+        weight = 1.0
+        if self.weights:
+            relative_path = str(file.relative_to(self.search_dir))
+            matching = [w for matcher, w in self.weights if matcher.matches(relative_path)]
+            if matching:
+                weight = max(matching)
+        if self.priority == "recent":
+            order = -mtime_ns
+        elif self.priority == "smallest":
+            order = size
+        else:
+            order = 0
+        # Ties keep the walk's path order
+        return (-weight, order, index)
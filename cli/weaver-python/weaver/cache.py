@@ -0,0 +1,223 @@
+"""
+Persistent per-file cache, so unchanged files are not re-analysed on every run.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+CACHE_VERSION = 2
+CACHE_FILE_NAME = "files.db"
+
+
+def user_cache_dir(search_dir: Path) -> Path:
+    """
+    The default cache directory for ``search_dir``: one per directory under
+    the user's cache directory ($XDG_CACHE_HOME or ~/.cache, %LOCALAPPDATA%
+    on Windows), so nothing is written into the tree being collected.
+    """
+    base = os.environ.get("XDG_CACHE_HOME")
+    if not base and os.name == "nt":
+        base = os.environ.get("LOCALAPPDATA")
+    root = Path(base) if base else Path.home() / ".cache"
+    path = search_dir.resolve()
+    key = hashlib.sha256(str(path).encode("utf-8")).hexdigest()[:16]
+    return root / "weaver" / f"{path.name or 'root'}-{key}"
+
+
+class CachedFile(NamedTuple):
+    """What is known about a file as of its (mtime_ns, size)."""
+    mtime_ns: int
+    size: int
+    lines: int
+    encoding: Optional[str]
+    digest: Optional[str]
+
+
+class FileCache:
+    """
+    SQLite-backed cache of file metadata keyed on (path, st_mtime_ns, st_size).
+
+    The whole table is loaded once; lookups are dictionary hits. Changes are
+    written back in one transaction by `save`, which also evicts entries not
+    seen for ``max_age_runs`` runs and caps the table at ``max_entries``,
+    dropping the least recently seen first.
+
+    Token counts are kept per (content digest, tokenizer) and evicted with
+    the last file entry holding that digest.
+
+    Lookups and updates may come from several threads; `open`, `save` and
+    `close` may not.
+    """
+
+    def __init__(self, directory: Path, max_entries: int = 1_000_000, max_age_runs: int = 20):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_age_runs = max_age_runs
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[str, CachedFile] = {}
+        self._seen: List[str] = []
+        self._changed: Dict[str, CachedFile] = {}
+        self._tokens: Dict[Tuple[str, str], int] = {}
+        self._new_tokens: Dict[Tuple[str, str], int] = {}
+        self._db: Optional[sqlite3.Connection] = None
+        self._run = 0
+        self._lock = threading.Lock()
+
+    def open(self) -> "FileCache":
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.directory / CACHE_FILE_NAME))
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER);
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                mtime_ns INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                lines INTEGER NOT NULL,
+                encoding TEXT,
+                digest TEXT,
+                last_run INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS files_last_run ON files (last_run);
+            CREATE TABLE IF NOT EXISTS tokens (
+                digest TEXT NOT NULL,
+                tokenizer TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (digest, tokenizer)
+            );
+            """
+        )
+        meta = dict(self._db.execute("SELECT key, value FROM meta"))
+        if meta.get("version", CACHE_VERSION) != CACHE_VERSION:
+            self._db.execute("DELETE FROM files")
+            self._db.execute("DELETE FROM tokens")
+        self._run = meta.get("run", 0) + 1
+
+        rows = self._db.execute(
+            "SELECT path, mtime_ns, size, lines, encoding, digest FROM files"
+        )
+        self._entries = {row[0]: CachedFile(*row[1:]) for row in rows}
+        rows = self._db.execute("SELECT digest, tokenizer, count FROM tokens")
+        self._tokens = {(digest, tokenizer): count for digest, tokenizer, count in rows}
+        return self
+
+    def __enter__(self) -> "FileCache":
+        return self.open()
+
+    def __exit__(self, exc_type, *exc) -> None:
+        if exc_type is None:
+            self.save()
+        self.close()
+
+    def get(self, relative_path: str, stat: os.stat_result) -> Optional[CachedFile]:
+        """Return the cached entry if the file is unchanged since it was stored."""
+        with self._lock:
+            self._seen.append(relative_path)
+            entry = self._entries.get(relative_path)
+            if entry and entry.mtime_ns == stat.st_mtime_ns and entry.size == stat.st_size:
+                self.hits += 1
+                return entry
+            self.misses += 1
+            return None
+
+    def put(
+        self,
+        relative_path: str,
+        stat: os.stat_result,
+        lines: int,
+        encoding: Optional[str],
+        digest: Optional[str]
+    ) -> None:
+        entry = CachedFile(stat.st_mtime_ns, stat.st_size, lines, encoding, digest)
+        with self._lock:
+            self._entries[relative_path] = entry
+            self._changed[relative_path] = entry
+
+    def get_tokens(self, digest: str, tokenizer: str) -> Optional[int]:
+        return self._tokens.get((digest, tokenizer))
+
+    def put_tokens(self, digest: str, tokenizer: str, count: int) -> None:
+        with self._lock:
+            self._tokens[(digest, tokenizer)] = count
+            self._new_tokens[(digest, tokenizer)] = count
+
+    def save(self) -> None:
+        """Write new entries, mark seen ones and evict stale ones."""
+        if self._db is None:
+            return
+        with self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(path, *entry, self._run) for path, entry in self._changed.items()]
+            )
+            self._db.executemany(
+                "UPDATE files SET last_run = ? WHERE path = ?",
+                [(self._run, path) for path in self._seen if path not in self._changed]
+            )
+            self._db.execute(
+                "DELETE FROM files WHERE last_run <= ?", (self._run - self.max_age_runs,)
+            )
+            self._db.execute(
+                "DELETE FROM files WHERE path IN ("
+                " SELECT path FROM files ORDER BY last_run DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self._db.executemany(
+                "INSERT OR REPLACE INTO tokens VALUES (?, ?, ?)",
+                [(*key, count) for key, count in self._new_tokens.items()]
+            )
+            self._db.execute(
+                "DELETE FROM tokens WHERE digest NOT IN"
+                " (SELECT digest FROM files WHERE digest IS NOT NULL)"
+            )
+            self._db.executemany(
+                "INSERT OR REPLACE INTO meta VALUES (?, ?)",
+                [("version", CACHE_VERSION), ("run", self._run)]
+            )
+        self._changed.clear()
+        self._new_tokens.clear()
+        self._seen.clear()
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+class TokenCacheView:
+    """
+    Read-only view of the token counts a FileCache saved in ``directory``,
+    for processes other than the one owning the cache (``--workers``).
+
+    Counts come from earlier runs; new ones are stored by the owner, so
+    `put_tokens` does nothing. A missing or unreadable cache has no counts.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self._db: Optional[sqlite3.Connection] = None
+
+    def get_tokens(self, digest: str, tokenizer: str) -> Optional[int]:
+        try:
+            if self._db is None:
+                uri = (self.directory / CACHE_FILE_NAME).as_uri() + "?mode=ro"
+                self._db = sqlite3.connect(uri, uri=True)
+            row = self._db.execute(
+                "SELECT count FROM tokens WHERE digest = ? AND tokenizer = ?",
+                (digest, tokenizer)
+            ).fetchone()
+        except sqlite3.Error:
+            return None
+        return row[0] if row else None
+
+    def put_tokens(self, digest: str, tokenizer: str, count: int) -> None:
+        pass
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
@@ -3,16 +3,25 @@ from pathlib import Path
 from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
+from .async_collector import ENGINES, AsyncCodeCollector
 from .collector import CodeCollector
 from .config import CollectorConfig
 from typing import Optional, List
 from .utils.patterns import get_pattern_categories
+from .utils.async_http import proxy_for
+from .utils.compression import resolve_encoding
+from .budget import Budget, parse_weights
+from .utils.git_index import find_repository
+from .utils.tokens import check_tokenizer
+from .journal import find_journals
 
 app = typer.Typer(help="Weaver - A terminal app for the Weaver Platform")
 console = Console()
 
-@app.command()
+# Collecting is what `weaver` does without a subcommand
+@app.callback(invoke_without_command=True)
 def collect(
+    ctx: typer.Context,
     directory: Path = typer.Option(
         ".", "--directory", "-d",
         help="Directory to search for code files"
@@ -29,6 +38,108 @@ def collect(
         False, "--no-default-excludes", "-a",
         help="Disable default exclusions"
     ),
+    stream: bool = typer.Option(
+        False, "--stream",
+        help="Upload chunks while collecting, without a temporary file"
+    ),
+    delta: bool = typer.Option(
+        False, "--delta",
+        help="Upload only files whose contents the server does not have yet"
+    ),
+    compression: str = typer.Option(
+        "auto", "--compression",
+        help="Chunk compression: auto (zstd if installed, else gzip), gzip, zstd or none"
+    ),
+    upload_concurrency: int = typer.Option(
+        1, "--upload-concurrency",
+        min=1,
+        help="Number of chunks uploaded in parallel"
+    ),
+    batch_bytes: int = typer.Option(
+        8 * 1024 * 1024, "--batch-bytes",
+        min=0,
+        help="Upload chunks in batches of about this many bytes (0 sends each chunk "
+             "on its own, for servers without batched uploads)"
+    ),
+    engine: str = typer.Option(
+        "sync", "--engine",
+        help="sync: scan, read and upload one after another; async: overlap them on an "
+             "event loop with threaded reads and pooled async uploads (ignores "
+             "HTTP_PROXY/HTTPS_PROXY)"
+    ),
+    read_threads: int = typer.Option(
+        8, "--read-threads",
+        min=1,
+        help="With --engine async, number of threads reading files ahead"
+    ),
+    workers: int = typer.Option(
+        1, "--workers",
+        min=1,
+        help="Number of processes reading and encoding files"
+    ),
+    mmap_threshold: int = typer.Option(
+        8 * 1024 * 1024, "--mmap-threshold",
+        min=0,
+        help="Stream files of at least this many bytes from a memory map (0 disables)"
+    ),
+    max_bytes: Optional[int] = typer.Option(
+        None, "--max-bytes",
+        min=1,
+        help="Stop adding files once their total size would exceed this many bytes"
+    ),
+    max_tokens: Optional[int] = typer.Option(
+        None, "--max-tokens",
+        min=1,
+        help="Stop adding files once their estimated tokens would exceed this many"
+    ),
+    max_file_size: Optional[int] = typer.Option(
+        None, "--max-file-size",
+        min=1,
+        help="Skip files larger than this many bytes"
+    ),
+    priority: str = typer.Option(
+        "path", "--priority",
+        help="Which files to take first: path (sorted), recent (modified last) or smallest"
+    ),
+    weight: Optional[List[str]] = typer.Option(
+        None, "--weight",
+        help="Path weight as PATTERN=WEIGHT; higher weights are collected first (repeatable)"
+    ),
+    tokenizer: str = typer.Option(
+        "estimate", "--tokenizer",
+        help="Count tokens with: estimate (fast, no dependencies), tiktoken[:encoding] "
+             "or a tokenizer.json file (needs the tokenizers package)"
+    ),
+    no_cache: bool = typer.Option(
+        False, "--no-cache",
+        help="Do not read or write the incremental cache in ~/.cache/weaver"
+    ),
+    no_journal: bool = typer.Option(
+        False, "--no-journal",
+        help="Do not keep a send journal; a failed upload cannot be resumed"
+    ),
+    git: bool = typer.Option(
+        False, "--git",
+        help="List tracked files from .git/index instead of walking the directory, "
+             "leaving out files matched by .gitignore"
+    ),
+    scan_workers: int = typer.Option(
+        1, "--scan-workers",
+        min=1,
+        help="Number of threads scanning directories in parallel"
+    ),
+    headless: bool = typer.Option(
+        False, "--headless",
+        help="No interactive UI: print JSON progress events and a final JSON stats line"
+    ),
+    profile: Optional[Path] = typer.Option(
+        None, "--profile",
+        help="Write a JSON report of phase timings, I/O and per-file/upload latency to this path"
+    ),
+    profile_pstats: Optional[Path] = typer.Option(
+        None, "--profile-pstats",
+        help="With --profile, also dump a cProfile pstats file to this path"
+    ),
     verbose: bool = typer.Option(
         False, "--verbose", "-v",
         help="Show detailed configuration information"
@@ -49,6 +160,9 @@ def collect(
     """
     Collect and transmit code files with a beautiful interface
     """
+    if ctx.invoked_subcommand is not None:
+        return
+
     # If any help flag is set, show the requested information and return
     if show_patterns or show_extensions or show_help:
         if show_extensions or show_help:
@@ -114,23 +228,160 @@ def collect(
                 "4. Disable default exclusions:\n"
                 "   [cyan]weaver --no-default-excludes[/cyan]\n\n"
                 "5. Show verbose output:\n"
-                "   [cyan]weaver --verbose[/cyan]",
+                "   [cyan]weaver --verbose[/cyan]\n\n"
+                "6. Scan a network filesystem with 8 threads:\n"
+                "   [cyan]weaver --scan-workers 8[/cyan]\n\n"
+                "7. Run in CI with JSON output:\n"
+                "   [cyan]weaver --headless > collection.ndjson[/cyan]\n\n"
+                "8. Fit a context window, recently changed files first:\n"
+                "   [cyan]weaver --max-tokens 200000 --priority recent --weight 'src/=2'[/cyan]\n\n"
+                "9. Count tokens exactly with tiktoken:\n"
+                "   [cyan]weaver --tokenizer tiktoken:o200k_base[/cyan]\n\n"
+                "10. Collect only files tracked by git:\n"
+                "   [cyan]weaver --git[/cyan]\n\n"
+                "11. Overlap reading and uploading with 4 connections:\n"
+                "   [cyan]weaver --engine async --upload-concurrency 4[/cyan]\n\n"
+                "12. Finish an upload that failed or was interrupted:\n"
+                "   [cyan]weaver resume[/cyan]\n\n"
+                "Per-file analysis and the send journal of the current upload are kept\n"
+                "under ~/.cache/weaver ($XDG_CACHE_HOME/weaver), one directory per\n"
+                "collected directory; --no-cache and --no-journal turn them off.",
                 title="Help Information",
                 border_style="blue"
             ))
         return
 
+    try:
+        resolve_encoding(compression)
+    except ValueError as e:
+        console.print(f"[red]{e}[/red]")
+        raise typer.Exit(1)
+
+    try:
+        weights = parse_weights(weight or [])
+        Budget(directory, priority=priority, weights=weights)
+        check_tokenizer(tokenizer)
+    except ValueError as e:
+        console.print(f"[red]{e}[/red]")
+        raise typer.Exit(1)
+
+    if engine not in ENGINES:
+        console.print(f"[red]Unknown engine: {engine} (choose from {', '.join(ENGINES)})[/red]")
+        raise typer.Exit(1)
+
+    if engine == "async" and workers > 1:
+        console.print("[red]--engine async reads files on threads; it cannot be "
+                      "combined with --workers[/red]")
+        raise typer.Exit(1)
+
+    if git and find_repository(directory) is None:
+        console.print(f"[red]--git: {directory} is not in a git checkout[/red]")
+        raise typer.Exit(1)
+
+    if profile_pstats and not profile:
+        console.print("[red]--profile-pstats requires --profile[/red]")
+        raise typer.Exit(1)
+
     # Normal collection process
     config = CollectorConfig(
         search_dir=directory,
         extensions=set(extensions) if extensions else CollectorConfig.DEFAULT_EXTENSIONS,
         exclude_patterns=set(exclude) if exclude else set(),
         use_default_excludes=not no_default_excludes,
+        stream=stream,
+        delta=delta,
+        compression=compression,
+        upload_concurrency=upload_concurrency,
+        batch_bytes=batch_bytes,
+        engine=engine,
+        read_threads=read_threads,
+        git=git,
+        scan_workers=scan_workers,
+        workers=workers,
+        mmap_threshold=mmap_threshold,
+        max_bytes=max_bytes,
+        max_tokens=max_tokens,
+        max_file_size=max_file_size,
+        priority=priority,
+        path_weights=weights,
+        tokenizer=tokenizer,
+        use_cache=not no_cache,
+        journal=not no_journal,
         verbose=verbose,
+        headless=headless,
+        profile_path=profile,
+        profile_pstats=profile_pstats,
     )
 
-    collector = CodeCollector(config, console)
+    proxy = proxy_for(config.api_endpoint) if engine == "async" else None
+    if proxy:
+        # On stderr, so --headless output stays JSON
+        Console(stderr=True).print(
+            f"[yellow]--engine async does not use proxies; connecting directly "
+            f"instead of through {proxy}[/yellow]"
+        )
+
+    collector_class = AsyncCodeCollector if engine == "async" else CodeCollector
+    collector = collector_class(config, console)
     collector.collect_and_send()
+    if headless and collector.status != "complete":
+        raise typer.Exit(1)
+
+@app.command()
+def resume(
+    directory: Path = typer.Option(
+        ".", "--directory", "-d",
+        help="Directory the unfinished collection was run in"
+    ),
+    collection_id: Optional[str] = typer.Option(
+        None, "--id",
+        help="Collection ID of the upload to resume (default: the most recent)"
+    ),
+    compression: str = typer.Option(
+        "auto", "--compression",
+        help="Chunk compression: auto (zstd if installed, else gzip), gzip, zstd or none"
+    ),
+    upload_concurrency: int = typer.Option(
+        1, "--upload-concurrency",
+        min=1,
+        help="Number of chunks uploaded in parallel"
+    ),
+    headless: bool = typer.Option(
+        False, "--headless",
+        help="No interactive UI: print JSON progress events and a final JSON stats line"
+    ),
+) -> None:
+    """
+    Send the chunks of a failed or interrupted upload that the server did not receive
+    """
+    try:
+        resolve_encoding(compression)
+    except ValueError as e:
+        console.print(f"[red]{e}[/red]")
+        raise typer.Exit(1)
+
+    journal_dir = CollectorConfig(search_dir=directory).get_journal_dir()
+    journals = find_journals(journal_dir)
+    if collection_id:
+        journals = [journal for journal in journals if journal.collection_id == collection_id]
+    if not journals:
+        console.print(f"[yellow]No unfinished uploads to resume in {journal_dir}[/yellow]")
+        raise typer.Exit(1)
+
+    journal = journals[0]
+    config = CollectorConfig(
+        search_dir=directory,
+        api_endpoint=journal.endpoint,
+        compression=compression,
+        upload_concurrency=upload_concurrency,
+        # Chunks acknowledged one by one are already stored; keep sending them that way
+        batch_bytes=CollectorConfig.model_fields["batch_bytes"].default if journal.batched else 0,
+        headless=headless,
+    )
+    collector = CodeCollector(config, console)
+    collector.resume_upload(journal)
+    if collector.status != "complete":
+        raise typer.Exit(1)
 
 if __name__ == "__main__":
     app()
\ No newline at end of file
@@ -8,30 +8,87 @@ from rich.align import Align
 from rich.table import Table
 from rich.style import Style
 from rich.columns import Columns
+from contextlib import contextmanager, nullcontext
+from collections import Counter
 from datetime import datetime
+import hashlib
+import os
 import tempfile
 import time
-from typing import List, Generator, Optional, TextIO, Dict
+import uuid
+import requests
+from typing import IO, Callable, Iterable, Iterator, List, Generator, Optional, Dict, Set, Tuple
 
-from cli.weaver.ui.progress import ProgressManager
+from .budget import Budget, Selection
+from .cache import FileCache
 from .config import CollectorConfig
-from .utils.file_utils import collect_files, count_lines, read_in_chunks
-from .utils.http_utils import send_chunk
+from .journal import SendJournal
+from .profiling import Profiler
+from .utils.file_utils import (
+    SourceFile, collect_files, file_record, read_normalized, read_source, stream_source
+)
+from .utils.charset import UTF8_ENCODINGS, skip_reason
+from .utils.chunking import RecordChunker, read_chunks
+from .utils.compression import resolve_encoding
+from .utils.delta import DeltaClient, ManifestEntry
+from .utils.git_index import list_tracked_files
+from .utils.http_utils import ChunkSender
+from .utils.patterns import PatternMatcher
+from .utils.process_pool import RecordPool
+from .utils.streaming import ChunkUploader
+from .utils.tokens import TokenCounter
 from .ui.components import FileTree, Statistics
+from .ui.headless import JsonReporter
+
+# The live UI is redrawn on Live's own refresh thread at this rate; the
+# tree panel shows at most TREE_VIEW_LINES entries per frame
+UI_REFRESH_PER_SECOND = 4
+TREE_VIEW_LINES = 60
+TREE_VIEW_DEPTH = 4
+# The summary tree lists the largest entries of each folder
+SUMMARY_TREE_LINES = 200
+SUMMARY_TREE_TOP_N = 25
 
 class CodeCollector:
     def __init__(self, config: CollectorConfig, console: Optional[Console] = None):
         self.config = config
         self.console = console or Console()
         self.stats = Statistics()
-        self.file_tree = FileTree()
+        # Headless runs report JSON events and build no tree or rich UI
+        self.reporter = JsonReporter() if config.headless else None
+        self.file_tree = None if self.reporter else FileTree()
+        self.status = "complete"
+        self.phase_times: Dict[str, float] = {}
+        self.profiler: Optional[Profiler] = None
+        if config.profile_path:
+            self.profiler = Profiler(config.profile_path, config.profile_pstats)
+            # Per-file timing wraps the method itself so unprofiled runs pay nothing
+            self._analyse_file = self.profiler.wrap_file_analysis(self._analyse_file)
+        self._phase_name = ""
         self.temp_file = None
+        self._chunk_sizes: List[int] = []
+        self._chunk_digests: List[str] = []
         self._start_time = None
         self._processed_files = 0
         self._total_files = 0
         self._total_size = 0
         self._current_file = ""
-        self.progress_manager = ProgressManager()
+        self._header_title: Optional[str] = None
+        self._layout: Optional[Layout] = None
+        self._sender: Optional[ChunkSender] = None
+        self.cache: Optional[FileCache] = None
+        self._delta_stats: Optional[Tuple[int, int, int]] = None
+        # Files skipped by reason (binary, undecodable) and converted by source encoding
+        self.skipped: Counter = Counter()
+        self.converted: Counter = Counter()
+        self._files_found = 0
+        self._selection: Optional[Selection] = None
+        self.tokens = TokenCounter(config.tokenizer)
+        # (size, mtime_ns) of each scanned file when listed from the git index
+        self._index_stats: List[Tuple[int, int]] = []
+        # Every chunk names its collection, so the server stores each seq once
+        self.collection_id = uuid.uuid4().hex
+        self.journal: Optional[SendJournal] = None
 
     def _create_header(self) -> Panel:
         """Create the main header panel."""
@@ -102,134 +159,818 @@ class CodeCollector:
         
         return layout
 
-    def collect_and_send(self) -> None:
-        """Main method to collect and send files with enhanced UI."""
-        self._start_time = time.time()
-        
-        # Create main layout
-        layout = self._create_layout()
+    def _render_frame(self) -> Layout:
+        """
+        Build one UI frame from the current counters.
+
+        Called by Live on its refresh thread, so the processing loop only
+        updates counters and never waits for rendering.
+        """
+        layout = self._layout
+        if self._header_title:
+            layout["header"].update(Panel(
+                f"[bold blue]{self._header_title}[/bold blue]",
+                border_style="blue"
+            ))
+        else:
+            layout["header"].update(self._create_header())
+        layout["left"].update(self._create_progress_panel())
+        layout["right"].update(self.file_tree.generate_tree(
+            max_lines=TREE_VIEW_LINES, max_depth=TREE_VIEW_DEPTH
+        ))
+        return layout
+
+    def _create_live(self) -> Live:
+        self._layout = self._create_layout()
+        return Live(
+            get_renderable=self._render_frame,
+            refresh_per_second=UI_REFRESH_PER_SECOND,
+            screen=True,
+            console=self.console
+        )
+
+    @contextmanager
+    def _phase(self, name: str) -> Iterator[None]:
+        """Time a phase of the run into ``phase_times``; headless runs report it too."""
+        self._phase_name = name
+        if self.reporter:
+            self.reporter.event("phase", phase=name, status="start")
+        start = time.perf_counter()
+        try:
+            with self.profiler.phase(name) if self.profiler else nullcontext():
+                yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.phase_times[name] = self.phase_times.get(name, 0.0) + elapsed
+            if self.reporter:
+                self.reporter.event("phase", phase=name, status="end", seconds=round(elapsed, 3))
+
+    def _report_progress(self) -> None:
+        self.reporter.event(
+            "progress",
+            phase=self._phase_name,
+            files_processed=self._processed_files,
+            files_total=self._total_files,
+            bytes=self._total_size,
+            current=self._current_file
+        )
+
+    def _warn(self, message: str) -> None:
+        if self.reporter:
+            self.reporter.event("warning", message=message)
+        else:
+            self.console.print(f"[yellow]{message}[/yellow]")
+
+    def _error(self, message: str) -> None:
+        if self.reporter:
+            self.reporter.event("error", message=message)
+        else:
+            self.console.print(f"[red]{message}[/red]")
+
+    def _fail(self, message: str) -> None:
+        """Report an error that ends the upload."""
+        self.status = "failed"
+        self._error(message)
+
+    def _scan(self) -> List[Path]:
+        files = self._list_files()
+        if self.reporter:
+            return list(files)
         
-        # Initial scan for files
         with Progress(
             SpinnerColumn(),
             TextColumn("[progress.description]{task.description}"),
             transient=True
         ) as progress:
             progress.add_task("[cyan]Scanning files...", total=None)
-            files = list(collect_files(
-                self.config.search_dir,
-                self.config.extensions,
-                self.config.get_effective_patterns(),
-                set()
-            ))
+            return list(files)
+
+    def _list_files(self) -> Iterable[Path]:
+        """Files to collect, from the git index with ``git`` or else a directory walk."""
+        if self.config.git:
+            try:
+                files = self._scan_git()
+            except (OSError, ValueError) as e:
+                self._warn(f"Cannot read the git index ({e}); walking the directory instead")
+            else:
+                if files is not None:
+                    return files
+                self._warn(f"{self.config.search_dir} is not in a git checkout; walking it instead")
+        
+        return collect_files(
+            self.config.search_dir,
+            self.config.extensions,
+            self.config.get_effective_patterns(),
+            set(),
+            workers=self.config.scan_workers
+        )
+
+    def _scan_git(self) -> Optional[List[Path]]:
+        """Tracked files from the git index; their index stat data is kept for selection."""
+        tracked = list_tracked_files(
+            self.config.search_dir,
+            self.config.extensions,
+            PatternMatcher(self.config.get_effective_patterns())
+        )
+        if tracked is None:
+            return None
+        self._index_stats = tracked.stats
+        return tracked.files
+
+    def collect_and_send(self) -> None:
+        """Main method to collect and send files with enhanced UI."""
+        if self.profiler is None:
+            self._collect_and_send()
+            return
+        
+        self.profiler.start()
+        try:
+            self._collect_and_send()
+        finally:
+            self.profiler.stop()
+            self._write_profile()
+
+    def _collect_and_send(self) -> None:
+        self._start_run()
+        
+        # Initial scan for files
+        with self._phase("scan"):
+            files = self._scan()
+        self._files_found = len(files)
+        
+        budget = self._create_budget()
+        if files and budget.active:
+            with self._phase("select"):
+                files = self._select(budget, files)
             
         if not files:
-            self.console.print("[yellow]No files found matching criteria[/yellow]")
+            self._warn("No files found matching criteria")
+            if self.reporter:
+                self._display_summary()
             return
 
         self._total_files = len(files)
-        
-        # Process files with live UI updates
-        with Live(layout, refresh_per_second=4, screen=True) as live:
+        self._open_cache()
+        self._run_with_ui(lambda: self._upload(files))
+
+    def _start_run(self) -> None:
+        self._start_time = time.time()
+        if self.reporter:
+            self.reporter.event(
+                "start", source_directory=str(self.config.search_dir.absolute())
+            )
+
+    def _create_budget(self) -> Budget:
+        return Budget(
+            self.config.search_dir,
+            max_bytes=self.config.max_bytes,
+            max_tokens=self.config.max_tokens,
+            max_file_size=self.config.max_file_size,
+            priority=self.config.priority,
+            weights=self.config.path_weights
+        )
+
+    def _open_cache(self) -> None:
+        if self.config.use_cache:
+            self.cache = FileCache(
+                self.config.get_cache_dir(),
+                max_entries=self.config.cache_max_entries
+            ).open()
+            self.tokens.cache = self.cache
+
+    def _run_with_ui(self, run: Callable[[], None]) -> None:
+        """Run the collection under the live UI (or headless), then show the summary."""
+        with nullcontext() if self.reporter else self._create_live():
             try:
-                self._process_files_with_ui(files, layout, live)
-                self._send_chunks_with_ui(layout, live)
+                run()
             except KeyboardInterrupt:
                 self._cleanup_on_interrupt()
                 return
+            finally:
+                # Analysis of every file read so far is valid even if the upload failed
+                if self.cache:
+                    self.cache.save()
+                    self.cache.close()
 
         # Show final summary
         self._display_summary()
 
-    def _process_files_with_ui(self, files: List[Path], layout: Layout, live: Live) -> None:
-        """Process files while updating the UI."""
-        with tempfile.NamedTemporaryFile(mode='w', delete=False) as temp_file:
+    def _upload(self, files: List[Path]) -> None:
+        """Collect and upload ``files`` in the configured mode."""
+        if self.config.delta:
+            self._send_delta_with_ui(files)
+        elif self.config.stream:
+            self._stream_files_with_ui(files)
+        else:
+            self._process_files_with_ui(files)
+            self._send_chunks_with_ui()
+
+    def _select(self, budget: Budget, files: List[Path]) -> List[Path]:
+        """Narrow files down to the budget, in priority order, from stat data only."""
+        known = dict(zip(files, self._index_stats)) if self._index_stats else None
+        selection = budget.select(files, known)
+        self.skipped.update(selection.skipped)
+        self._selection = selection
+        if selection.skipped["over_budget"]:
+            self._warn(
+                f"Budget reached: {len(selection.files):,} of {len(files):,} files selected, "
+                f"{selection.skipped['over_budget']:,} left out"
+            )
+        return selection.files
+
+    def _process_files_with_ui(self, files: List[Path]) -> None:
+        """Process files while updating the UI, chunking them into a spool file."""
+        with self._phase("collect"), self._open_spool() as temp_file:
             self.temp_file = temp_file.name
-            self._write_metadata(temp_file, files)
             
-            for file in files:
+            def store(chunk: bytes) -> None:
+                temp_file.write(chunk)
+                self._chunk_sizes.append(len(chunk))
+                self._chunk_digests.append(hashlib.sha256(chunk).hexdigest())
+            
+            chunker = self._create_chunker(store)
+            self._write_files(files, chunker)
+            chunker.close()
+
+    def _open_spool(self) -> IO[bytes]:
+        """The file chunks are written to before upload: kept for resuming with a journal."""
+        if not self.config.journal:
+            return tempfile.NamedTemporaryFile(mode='wb', delete=False)
+        directory = self.config.get_journal_dir()
+        directory.mkdir(parents=True, exist_ok=True)
+        return open(SendJournal.chunk_path_for(directory, self.collection_id), 'wb')
+
+    def _write_files(
+        self,
+        files: List[Path],
+        output: RecordChunker,
+        should_stop: Callable[[], bool] = lambda: False
+    ) -> bool:
+        """Write metadata and every file record to output. Returns False if stopped early."""
+        self._write_metadata(output, files)
+        # The header carries a timestamp; keep it out of the chunks that hold files
+        output.flush()
+        
+        if self.config.workers > 1:
+            return self._write_files_pooled(files, output, should_stop)
+        
+        for file in files:
+            if should_stop():
+                return False
+            self._current_file = str(file)
+            self._process_file(file, output)
+            self._processed_files += 1
+            if self.reporter and self.reporter.due():
+                self._report_progress()
+        
+        return True
+
+    def _write_files_pooled(
+        self,
+        files: List[Path],
+        output: RecordChunker,
+        should_stop: Callable[[], bool]
+    ) -> bool:
+        """
+        The file loop of _write_files with reading and encoding done by
+        worker processes; records are written here in file order.
+
+        Workers always read files in full, so the file cache is refreshed but
+        not consulted; exact token counts of unchanged contents are still
+        taken from it. Files over the mmap threshold are left to this process.
+        """
+        with RecordPool(
+            self.config.workers,
+            self.config.search_dir,
+            digest=self.cache is not None,
+            with_stat=self.cache is not None,
+            mmap_threshold=self.config.mmap_threshold,
+            tokenizer=self.tokens.name,
+            # Estimating is cheaper than a lookup in another process
+            token_cache=self.cache.directory if self.cache is not None and self.tokens.exact else None
+        ) as pool:
+            for file, result in zip(files, pool.results(files)):
+                if should_stop():
+                    return False
                 self._current_file = str(file)
-                self._process_file(file, temp_file)
+                if result.mapped:
+                    # Large files are streamed from a memory map here, not pickled back
+                    self._process_file(file, output)
+                elif result.error is not None:
+                    self._error(f"Error processing {file}: {result.error}")
+                else:
+                    if self.cache is not None:
+                        self.cache.put(
+                            result.rel_path, result.stat, result.lines,
+                            result.encoding, result.digest
+                        )
+                    if result.digest and result.record is not None:
+                        self.tokens.remember(result.digest, result.tokens)
+                    if self._count_file(
+                        file, result.size, result.lines, result.encoding, result.tokens
+                    ):
+                        output.write(result.record)
+                if self.profiler and not result.mapped:
+                    self.profiler.record_file(str(file), result.seconds, result.size)
                 self._processed_files += 1
-                
-                # Update UI
-                layout["header"].update(self._create_header())
-                layout["left"].update(self._create_progress_panel())
-                layout["right"].update(self.file_tree.generate_tree())
-                live.refresh()
+                if self.reporter and self.reporter.due():
+                    self._report_progress()
+        
+        return True
+
+    def _stream_files_with_ui(self, files: List[Path]) -> None:
+        """Process files and upload finished chunks at the same time, without a temp file."""
+        with self._create_sender() as sender:
+            uploader = ChunkUploader(sender.send_all, max_pending=self.config.upload_queue_depth)
+            writer = self._create_chunker(uploader.put)
+            uploader.start()
+            
+            try:
+                with self._phase("collect"):
+                    completed = self._write_files(
+                        files, writer, should_stop=lambda: uploader.failed
+                    )
+                    if completed:
+                        writer.close()
+            except BaseException:
+                uploader.abort()
+                raise
+            
+            self._header_title = "Uploading Collection"
+            self._current_file = f"Sending last {writer.chunks_emitted - sender.chunks_sent} chunks"
+            
+            with self._phase("upload"):
+                sent = uploader.close()
+                if sent and completed:
+                    sent = self._complete_collection(sender, writer.chunks_emitted)
+            if not sent or not completed:
+                self._fail("Error sending chunk. Aborting.")
 
-    def _send_chunks_with_ui(self, layout: Layout, live: Live) -> None:
+    def _send_chunks_with_ui(self) -> None:
         """Send chunks while updating the UI."""
-        with open(self.temp_file, 'r') as f:
-            chunks = list(read_in_chunks(Path(self.temp_file), self.config.chunk_size))
+        total = len(self._chunk_sizes)
         
-        layout["header"].update(Panel(
-            "[bold blue]Uploading Collection[/bold blue]",
-            border_style="blue"
-        ))
+        self._header_title = "Uploading Collection"
         
-        for i, chunk in enumerate(chunks, 1):
-            self._current_file = f"Sending chunk {i}/{len(chunks)}"
-            layout["left"].update(self._create_progress_panel())
-            live.refresh()
+        def tracked() -> Generator[bytes, None, None]:
+            chunks = read_chunks(Path(self.temp_file), self._chunk_sizes)
+            for i, chunk in enumerate(chunks, 1):
+                self._current_file = f"Sending chunk {i}/{total}"
+                if self.reporter and self.reporter.due():
+                    self._report_progress()
+                yield chunk
+        
+        with self._phase("upload"), self._create_sender() as sender:
+            sender.known = self._stored_chunks(self._chunk_digests)
+            if self.config.journal:
+                self.journal = SendJournal.create(
+                    Path(self.temp_file).parent, self.collection_id,
+                    self.config.api_endpoint, self._chunk_sizes, self._chunk_digests,
+                    batched=sender.batching
+                )
+                sender.on_sent = self.journal.ack
+            ok = sender.send_all(tracked()) and self._complete_collection(sender, total)
+        self._finish_upload(ok)
+
+    def _finish_upload(self, ok: bool) -> None:
+        """Drop the spooled chunks of a complete upload; keep a failed one's journal to resume."""
+        if ok or self.journal is None:
+            if self.journal:
+                self.journal.remove()
+            elif self.temp_file:
+                Path(self.temp_file).unlink(missing_ok=True)
+            if not ok:
+                self._fail("Error sending chunk. Aborting.")
+            return
+        
+        self.journal.close()
+        if self.journal.complete:
+            self._fail(
+                "Every chunk was sent but the server did not join the collection. "
+                "Run `weaver resume` to retry."
+            )
+            return
+        self._fail(
+            f"Error sending chunk. Aborting; {len(self.journal.pending):,} of "
+            f"{len(self.journal.sizes):,} chunks are unsent. Run `weaver resume` to send them."
+        )
+
+    def resume_upload(self, journal: SendJournal) -> None:
+        """
+        Send the chunks of an earlier upload that the server did not
+        acknowledge, read back from its spool file.
+        """
+        self._start_run()
+        self.collection_id = journal.collection_id
+        self.journal = journal
+        pending = journal.pending
+        progress = None if self.reporter else Progress(
+            SpinnerColumn(),
+            TextColumn("[progress.description]{task.description}"),
+            BarColumn(),
+            TextColumn("{task.completed}/{task.total} chunks"),
+            console=self.console,
+            transient=True
+        )
+        
+        with progress or nullcontext():
+            task = progress.add_task("[cyan]Resuming upload...", total=len(pending)) \
+                if progress else None
+            
+            def on_sent(seq: int) -> None:
+                journal.ack(seq)
+                if progress:
+                    progress.advance(task)
+                elif self.reporter.due():
+                    self.reporter.event(
+                        "progress", phase="upload", chunks_sent=len(journal.acked),
+                        chunks_total=len(journal.sizes)
+                    )
             
-            if not send_chunk(chunk, self.config.api_endpoint):
-                self.console.print("[red]Error sending chunk. Aborting.[/red]")
+            try:
+                with self._phase("upload"), self._create_sender() as sender:
+                    sender.known = self._stored_chunks([journal.digests[seq] for seq in pending])
+                    sender.on_sent = on_sent
+                    ok = sender.send_numbered(journal.read_chunks(pending)) and \
+                        self._complete_collection(sender, len(journal.sizes))
+            except KeyboardInterrupt:
+                self._cleanup_on_interrupt()
                 return
+            except (OSError, ValueError) as e:
+                self._error(f"Cannot read the spooled chunks: {e}")
+                ok = False
+        
+        self._finish_upload(ok)
+        self._display_resume_summary()
 
-    def _process_file(self, file: Path, output_file: TextIO) -> None:
-        """Process a single file and update statistics."""
+    def _send_delta_with_ui(self, files: List[Path]) -> None:
+        """
+        Upload only the file contents the server does not have yet.
+
+        Files are hashed first (unchanged files take their digest from the
+        cache without being read), the server answers with the digests it
+        is missing, and only those files are read again and uploaded before
+        the manifest is committed.
+        """
+        manifest: List[ManifestEntry] = []
+        sources: Dict[str, Tuple[Path, str]] = {}
+        
+        with self._phase("collect"):
+            for file in files:
+                self._current_file = str(file)
+                analysed = self._analyse_file(file, with_data=False)
+                self._processed_files += 1
+                if analysed:
+                    rel_path, source = analysed
+                    manifest.append(ManifestEntry(rel_path, source.digest))
+                    sources.setdefault(source.digest, (file, source.encoding))
+                if self.reporter and self.reporter.due():
+                    self._report_progress()
+        
+        self._header_title = "Uploading Changes"
+        
+        with self._phase("upload"), DeltaClient(
+            self.config.get_api_url("delta"),
+            max_retries=self.config.max_retries,
+            timeout=self.config.request_timeout
+        ) as client:
+            try:
+                missing = client.missing(manifest) & sources.keys()
+                batch: List[Tuple[str, str]] = []
+                batch_size = 0
+                
+                for i, digest in enumerate(sorted(missing), 1):
+                    self._current_file = f"Uploading changed file {i}/{len(missing)}"
+                    if self.reporter and self.reporter.due():
+                        self._report_progress()
+                    content = read_normalized(*sources[digest]).decode('utf-8')
+                    batch.append((digest, content))
+                    batch_size += len(content)
+                    if batch_size >= self.config.chunk_size:
+                        client.upload_blobs(batch)
+                        batch, batch_size = [], 0
+                if batch:
+                    client.upload_blobs(batch)
+                
+                client.commit(self._metadata_text(files), manifest)
+            except requests.RequestException as e:
+                self._fail(f"Error uploading changes: {e}. Aborting.")
+                return
+        
+        self._delta_stats = (len(manifest), client.blobs_sent, client.bytes_sent)
+
+    def _stored_chunks(self, digests: List[str]) -> Set[str]:
+        """Digests among ``digests`` the server already stores, or none if it cannot say."""
         try:
-            # Update statistics
-            size = file.stat().st_size
-            self._total_size += size
-            line_count = count_lines(file)
-            self.stats.update(file, line_count)
-            self.file_tree.add_file(file)
-
-            # Write file header and contents
-            rel_path = file.relative_to(self.config.search_dir)
-            output_file.write(f"File: {rel_path}\n")
-            output_file.write("=" * 80 + "\n")
-
-            with open(file, 'r', encoding='utf-8') as f:
-                output_file.write(f.read())
-            
-            output_file.write("\n\n")
+            with DeltaClient(
+                self.config.get_api_url("delta"),
+                max_retries=0,
+                timeout=self.config.request_timeout
+            ) as client:
+                return set(digests) - client.missing_chunks(digests)
+        except (requests.RequestException, ValueError, KeyError):
+            # Older backends have no chunk index: send everything in full
+            return set()
+
+    def _create_chunker(self, emit: Callable[[bytes], None]) -> RecordChunker:
+        return RecordChunker(emit, self.config.chunk_size)
+
+    def _create_sender(self) -> ChunkSender:
+        self._sender = ChunkSender(
+            self.config.api_endpoint,
+            concurrency=self.config.upload_concurrency,
+            max_retries=self.config.max_retries,
+            timeout=self.config.request_timeout,
+            encoding=resolve_encoding(self.config.compression),
+            on_error=self._error,
+            collection_id=self.collection_id,
+            collections_url=self.config.get_api_url("collections"),
+            batch_bytes=self.config.batch_bytes
+        )
+        return self._sender
+
+    def _complete_collection(self, sender: ChunkSender, chunks: int) -> bool:
+        """Have the server join the chunks of a batched upload into one collection."""
+        if not chunks or not sender.batching:
+            return True
+        self._current_file = "Assembling collection"
+        return sender.complete(chunks)
 
+    def _process_file(self, file: Path, output_file: RecordChunker) -> None:
+        """Process a single file and update statistics."""
+        analysed = self._analyse_file(file, output=output_file)
+        if analysed is None:
+            return
+        
+        rel_path, source = analysed
+        if source.data is not None:
+            # Header and contents go out as one record so no chunk splits them
+            output_file.write(file_record(rel_path, source.data))
+
+    def _analyse_file(
+        self,
+        file: Path,
+        with_data: bool = True,
+        output: Optional[RecordChunker] = None
+    ) -> Optional[Tuple[str, SourceFile]]:
+        """
+        Read a file and update statistics. Returns None if it cannot be
+        collected: unreadable, binary or undecodable.
+
+        With ``output``, a large file's record is written to it directly
+        and the returned source has no data.
+        """
+        try:
+            rel_path = str(file.relative_to(self.config.search_dir))
+            source = self._read_source(file, rel_path, with_data, output)
         except Exception as e:
-            self.console.print(f"[red]Error processing {file}: {e}[/red]")
+            self._error(f"Error processing {file}: {e}")
+            return None
+
+        tokens = 0 if skip_reason(source.encoding) else self._count_tokens(file, source)
+        if not self._count_file(file, source.size, source.lines, source.encoding, tokens):
+            return None
+        return rel_path, source
+
+    def _count_tokens(self, file: Path, source: SourceFile) -> int:
+        """
+        Tokens in a collected file: counted while streaming, known for its
+        digest, or counted from its data (read for this if necessary).
+        """
+        if source.tokens is not None:
+            return source.tokens
+        data = source.data
+        if data is None:
+            count = self.tokens.cached(source.digest) if source.digest else None
+            if count is not None:
+                return count
+            data = read_normalized(file, source.encoding)
+        return self.tokens.count_file(data, source.digest)
+
+    def _count_file(
+        self, file: Path, size: int, lines: int, encoding: Optional[str], tokens: int = 0
+    ) -> bool:
+        """Add a file to the statistics. Returns False if it is skipped for its encoding."""
+        reason = skip_reason(encoding)
+        if reason:
+            self.skipped[reason] += 1
+            return False
+        if encoding not in UTF8_ENCODINGS:
+            self.converted[encoding] += 1
+        self._total_size += size
+        self.stats.update(file, lines, tokens)
+        if self.file_tree is not None:
+            self.file_tree.add_file(file, size)
+        return True
+
+    def _read_source(
+        self,
+        file: Path,
+        rel_path: str,
+        with_data: bool = True,
+        output: Optional[RecordChunker] = None
+    ) -> SourceFile:
+        """
+        Read a file, reusing cached line count, encoding and digest when its
+        (mtime, size) is unchanged since the last run.
+
+        With ``with_data=False`` an unchanged file is not read at all. With
+        ``output``, files of at least ``mmap_threshold`` bytes are streamed
+        into it from a memory map instead.
+        """
+        mapped = output is not None and self.config.mmap_threshold > 0
+        if self.cache is None and not mapped:
+            # Single read: size, line count and encoding come from the same bytes
+            return read_source(file, digest=self.config.delta)
+        
+        stat = file.stat()
+        if mapped and stat.st_size >= self.config.mmap_threshold:
+            return self._stream_source(file, rel_path, stat, output)
+        if self.cache is None:
+            return read_source(file, digest=self.config.delta)
+        return self._read_cached(file, rel_path, stat, with_data)
 
-    def _write_metadata(self, file: TextIO, files: List[Path]) -> None:
+    def _read_cached(
+        self, file: Path, rel_path: str, stat: os.stat_result, with_data: bool = True
+    ) -> SourceFile:
+        """_read_source for a file already stat'ed, with the cache open."""
+        cached = self.cache.get(rel_path, stat)
+        if cached is None:
+            source = read_source(file, digest=True)
+            self.cache.put(rel_path, stat, source.lines, source.encoding, source.digest)
+            return source
+        
+        # Known binary and undecodable files are not read again
+        data = None
+        if with_data and not skip_reason(cached.encoding):
+            data = read_normalized(file, cached.encoding)
+        return SourceFile(data, cached.size, cached.lines, cached.encoding, cached.digest)
+
+    def _stream_source(
+        self, file: Path, rel_path: str, stat: os.stat_result, output: RecordChunker
+    ) -> SourceFile:
+        """Write a large file's record to output straight from a memory map."""
+        cached = self.cache.get(rel_path, stat) if self.cache else None
+        if cached is not None and skip_reason(cached.encoding):
+            return SourceFile(None, cached.size, cached.lines, cached.encoding, cached.digest)
+        
+        # Tokens are counted on the way through unless known for the cached digest
+        tokens = self.tokens.cached(cached.digest) if cached and cached.digest else None
+        source = stream_source(
+            file, output.write_lines, rel_path,
+            digest=self.cache is not None or self.config.delta,
+            count_tokens=self.tokens.count if tokens is None else None
+        )
+        if self.cache is not None and cached is None:
+            self.cache.put(rel_path, stat, source.lines, source.encoding, source.digest)
+        if tokens is not None:
+            return source._replace(tokens=tokens)
+        if source.digest and source.tokens is not None:
+            self.tokens.remember(source.digest, source.tokens)
+        return source
+
+    def _write_metadata(self, file: RecordChunker, files: List[Path]) -> None:
         """Write collection metadata to the output file."""
+        file.write(self._metadata_text(files).encode('utf-8'))
+
+    def _metadata_text(self, files: List[Path]) -> str:
+        """Build the collection metadata header that precedes the file records."""
         abs_path = self.config.search_dir.absolute()
         structure = [str(f.relative_to(self.config.search_dir)) for f in sorted(files)]
         
-        file.write("=== Code Collection Metadata ===\n")
-        file.write(f"timestamp: {datetime.now().isoformat()}\n")
-        file.write(f"source_directory: {abs_path}\n")
+        lines = [
+            "=== Code Collection Metadata ===",
+            f"timestamp: {datetime.now().isoformat()}",
+            f"source_directory: {abs_path}",
+        ]
         
         if self.config.verbose:
-            file.write(f"included_extensions: {sorted(list(self.config.extensions))}\n")
-            file.write(f"exclude_patterns: {sorted(list(self.config.get_effective_patterns()))}\n")
+            lines.append(f"included_extensions: {sorted(list(self.config.extensions))}")
+            lines.append(f"exclude_patterns: {sorted(list(self.config.get_effective_patterns()))}")
         
-        file.write("\n=== Directory Structure ===\n")
-        for path in structure:
-            file.write(f"{path}\n")
+        lines.append("\n=== Directory Structure ===")
+        lines.extend(structure)
+        lines.append("\n=== Files ===\n\n")
         
-        file.write("\n=== Files ===\n\n")
+        return "\n".join(lines)
 
     def _cleanup_on_interrupt(self) -> None:
-        """Clean up resources on keyboard interrupt."""
-        self.console.print("\n[yellow]Collection interrupted by user[/yellow]")
-        if self.temp_file:
+        """Clean up resources on keyboard interrupt; an upload with a journal is kept to resume."""
+        self.status = "interrupted"
+        if self.reporter:
+            self._warn("Collection interrupted by user")
+            self._display_summary()
+        else:
+            self.console.print("\n[yellow]Collection interrupted by user[/yellow]")
+        if self.journal is not None:
+            self.journal.close()
+            self._warn(
+                f"{len(self.journal.pending):,} chunks are unsent. "
+                "Run `weaver resume` to send them."
+            )
+        elif self.temp_file:
             try:
                 Path(self.temp_file).unlink()
             except Exception:
                 pass
 
+    def _write_profile(self) -> None:
+        sender = self._sender
+        report = self.profiler.report(
+            sender.chunk_stats if sender else (), sender.retries if sender else 0
+        )
+        self.profiler.write_report(report)
+        
+        if self.reporter:
+            self.reporter.event("profile", path=str(self.profiler.report_path), **report)
+            return
+        
+        table = Table(show_header=True, header_style="bold blue", border_style="bright_black")
+        for column in ("Phase", "Wall", "CPU", "Read syscalls", "Bytes read"):
+            table.add_column(column, justify="right" if column != "Phase" else "left")
+        for name, stats in report["phases"].items():
+            table.add_row(
+                name,
+                f"{stats['seconds']:.3f}s",
+                f"{stats['cpu_seconds']:.3f}s",
+                f"{stats['syscr']:,}" if "syscr" in stats else "-",
+                f"{stats['rchar']:,}" if "rchar" in stats else "-",
+            )
+        latency = report["files"]["latency_ms"]
+        if latency:
+            table.caption = (
+                f"per file: p50 {latency['p50']:.2f}ms, p95 {latency['p95']:.2f}ms, "
+                f"p99 {latency['p99']:.2f}ms"
+            )
+        self.console.print(Panel(
+            table,
+            title=f"[bold blue]Profile[/bold blue] [white]{self.profiler.report_path}[/white]",
+            border_style="blue"
+        ))
+
+    def summary_stats(self) -> dict:
+        """Machine-readable statistics of the run, as reported in headless mode."""
+        stats = {
+            "status": self.status,
+            "source_directory": str(self.config.search_dir.absolute()),
+            "files": self.stats.total_files,
+            "files_found": self._files_found,
+            "lines": self.stats.total_lines,
+            "bytes": self._total_size,
+            "tokens": self.stats.total_tokens,
+            "tokenizer": self.tokens.name,
+            "extensions": {
+                ext: {"files": data['count'], "lines": data['lines'], "tokens": data['tokens']}
+                for ext, data in sorted(self.stats.extensions.items())
+            },
+            "phases": {name: round(seconds, 3) for name, seconds in self.phase_times.items()},
+            "elapsed_seconds": round(time.time() - self._start_time, 3),
+        }
+        if self._selection:
+            stats["budget"] = {
+                "files": len(self._selection.files),
+                "bytes": self._selection.bytes,
+                "estimated_tokens": self._selection.tokens,
+                "max_bytes": self.config.max_bytes,
+                "max_tokens": self.config.max_tokens,
+            }
+        if self.skipped:
+            stats["skipped"] = dict(self.skipped)
+        if self.converted:
+            stats["converted"] = dict(self.converted)
+        if self.cache:
+            stats["cache"] = {"hits": self.cache.hits, "misses": self.cache.misses}
+        if self._delta_stats:
+            files_total, files_sent, bytes_sent = self._delta_stats
+            stats["delta"] = {
+                "files": files_total, "files_sent": files_sent, "bytes_sent": bytes_sent
+            }
+        if self._sender:
+            sender = self._sender
+            stats["upload"] = {
+                "collection_id": self.collection_id,
+                "chunks": sender.chunks_sent,
+                "chunks_reused": sender.chunks_reused,
+                "batches": sender.batches_sent,
+                "bytes": sender.bytes_sent,
+                "wire_bytes": sender.wire_bytes_sent,
+                "encoding": sender.encoding,
+                "retries": sender.retries,
+            }
+        if self.journal is not None and not self.journal.removed:
+            stats["resume"] = {
+                "journal": str(self.journal.path),
+                "chunks_pending": len(self.journal.pending),
+                "chunks_total": len(self.journal.sizes),
+            }
+        return stats
+
     def _display_summary(self) -> None:
         """Display the final collection summary."""
+        if self.reporter:
+            self.reporter.event("summary", **self.summary_stats())
+            return
+        
         elapsed = time.time() - self._start_time
         
         summary = Table.grid(padding=1)
@@ -248,6 +989,59 @@ class CodeCollector:
             "Total Size:",
             f"{self._total_size / 1024 / 1024:.1f} MB"
         )
+        summary.add_row(
+            "Total Tokens:",
+            f"{'' if self.tokens.exact else '~'}{self.stats.total_tokens:,} ({self.tokens.name})"
+        )
+        if self._selection:
+            summary.add_row(
+                "Budget:",
+                f"{len(self._selection.files):,} files, "
+                f"{self._selection.bytes / 1024 / 1024:.1f} MB, "
+                f"~{self._selection.tokens:,} tokens"
+            )
+        if self.skipped:
+            summary.add_row(
+                "Skipped:",
+                ", ".join(f"{count:,} {reason}" for reason, count in sorted(self.skipped.items()))
+            )
+        if self.converted:
+            summary.add_row(
+                "Converted to UTF-8:",
+                ", ".join(f"{count:,} {name}" for name, count in sorted(self.converted.items()))
+            )
+        if self.cache and (self.cache.hits or self.cache.misses):
+            summary.add_row(
+                "Cache:",
+                f"{self.cache.hits:,} unchanged, {self.cache.misses:,} analysed"
+            )
+        if self._delta_stats:
+            files_total, files_sent, bytes_sent = self._delta_stats
+            summary.add_row(
+                "Delta Upload:",
+                f"{files_sent:,} of {files_total:,} files sent "
+                f"({bytes_sent / 1024 / 1024:.1f} MB)"
+            )
+        if self._sender and self._sender.chunks_sent:
+            sender = self._sender
+            cpu = sum(stats.cpu_seconds for stats in sender.chunk_stats)
+            summary.add_row(
+                "Uploaded:",
+                f"{sender.wire_bytes_sent / 1024 / 1024:.1f} MB in {sender.chunks_sent} chunks "
+                f"({sender.encoding or 'uncompressed'}, {sender.compression_ratio:.1f}x, "
+                f"{cpu:.2f}s CPU)"
+            )
+            if sender.chunks_reused:
+                summary.add_row(
+                    "Reused Chunks:",
+                    f"{sender.chunks_reused} of {sender.chunks_sent} already on the server"
+                )
+        if self.journal is not None and not self.journal.removed:
+            summary.add_row(
+                "Unsent:",
+                f"{len(self.journal.pending):,} of {len(self.journal.sizes):,} chunks; "
+                "run `weaver resume` to send them"
+            )
         
         self.console.print("\n[bold green]Collection Complete![/bold green]")
         self.console.print(Panel(
@@ -256,4 +1050,35 @@ class CodeCollector:
             border_style="blue"
         ))
         self.console.print(self.stats.generate_panel())
-        self.console.print(self.file_tree.generate_tree())
\ No newline at end of file
+        self.console.print(self.file_tree.generate_tree(
+            max_lines=SUMMARY_TREE_LINES, top_n=SUMMARY_TREE_TOP_N
+        ))
+
+    def _display_resume_summary(self) -> None:
+        journal = self.journal
+        sender = self._sender
+        if self.reporter:
+            self.reporter.event(
+                "summary",
+                status=self.status,
+                collection_id=journal.collection_id,
+                chunks_total=len(journal.sizes),
+                chunks_sent=sender.chunks_sent if sender else 0,
+                chunks_pending=len(journal.pending),
+                wire_bytes=sender.wire_bytes_sent if sender else 0,
+                retries=sender.retries if sender else 0,
+                elapsed_seconds=round(time.time() - self._start_time, 3)
+            )
+            return
+        
+        if self.status == "complete":
+            self.console.print(
+                f"[bold green]Upload complete![/bold green] Sent the remaining "
+                f"{sender.chunks_sent:,} of {len(journal.sizes):,} chunks of collection "
+                f"{journal.collection_id}."
+            )
+        else:
+            self.console.print(
+                f"[yellow]{len(journal.pending):,} of {len(journal.sizes):,} chunks are still "
+                "unsent; run `weaver resume` again to retry.[/yellow]"
+            )
@@ -1,6 +1,8 @@
 from pathlib import Path
-from typing import Set, ClassVar
+from typing import List, Optional, Set, ClassVar, Tuple
 from pydantic import BaseModel, Field
+from .cache import user_cache_dir
+from .journal import JOURNAL_DIR_NAME
 from .utils.patterns import DEFAULT_EXCLUDE_PATTERNS, get_pattern_categories
 
 class CollectorConfig(BaseModel):
@@ -50,13 +52,166 @@ class CollectorConfig(BaseModel):
     
     chunk_size: int = Field(
         default=1024 * 1024,  # 1MB
-        description="Size of chunks for sending data"
+        description="Maximum size in bytes of chunks for sending data"
+    )
+    
+    mmap_threshold: int = Field(
+        default=8 * 1024 * 1024,
+        ge=0,
+        description="Files of at least this many bytes are streamed from a memory map "
+                    "instead of read into memory; 0 disables"
+    )
+    
+    upload_concurrency: int = Field(
+        default=1,
+        ge=1,
+        description="Maximum number of chunks uploaded at the same time; "
+                    "above 1 chunks may arrive out of order (each carries its seq)"
+    )
+    
+    batch_bytes: int = Field(
+        default=8 * 1024 * 1024,
+        ge=0,
+        description="Chunks are uploaded in batches of about this many bytes and joined into "
+                    "one collection by the server; 0 uploads each chunk on its own"
+    )
+    
+    max_retries: int = Field(
+        default=3,
+        ge=0,
+        description="Retries for a chunk that failed with a transient error"
+    )
+    
+    request_timeout: float = Field(
+        default=120.0,
+        gt=0,
+        description="Timeout in seconds for each upload request"
+    )
+    
+    compression: str = Field(
+        default="auto",
+        description="Chunk compression: auto, gzip, zstd or none"
+    )
+    
+    delta: bool = Field(
+        default=False,
+        description="Upload only file contents the server does not already have"
+    )
+    
+    stream: bool = Field(
+        default=False,
+        description="Upload chunks while files are still being collected"
+    )
+    
+    upload_queue_depth: int = Field(
+        default=4,
+        ge=1,
+        description="Maximum number of chunks waiting to be uploaded when streaming"
+    )
+    
+    engine: str = Field(
+        default="sync",
+        description="Collection engine: sync (one stage after another) or async "
+                    "(scan, reads and uploads overlapped on an event loop)"
+    )
+    
+    read_threads: int = Field(
+        default=8,
+        ge=1,
+        description="Threads reading files ahead of the writer with the async engine"
+    )
+    
+    workers: int = Field(
+        default=1,
+        ge=1,
+        description="Processes reading and encoding files; 1 processes them in the main process"
+    )
+    
+    git: bool = Field(
+        default=False,
+        description="List tracked files from the git index, honouring .gitignore, instead of walking"
+    )
+    
+    scan_workers: int = Field(
+        default=1,
+        ge=1,
+        description="Number of threads used to scan directories"
+    )
+    
+    journal: bool = Field(
+        default=True,
+        description="Spool chunks next to a send journal in the cache directory, so a failed "
+                    "upload can be finished with `weaver resume`"
+    )
+    
+    use_cache: bool = Field(
+        default=True,
+        description="Reuse per-file analysis from previous runs for unchanged files"
+    )
+    
+    cache_dir: Optional[Path] = Field(
+        default=None,
+        description="Cache directory (defaults to one per search directory under ~/.cache/weaver)"
+    )
+    
+    cache_max_entries: int = Field(
+        default=1_000_000,
+        ge=1,
+        description="Maximum number of files kept in the cache"
+    )
+    
+    max_bytes: Optional[int] = Field(
+        default=None,
+        ge=1,
+        description="Collect files by priority until their total size reaches this many bytes"
+    )
+    
+    max_tokens: Optional[int] = Field(
+        default=None,
+        ge=1,
+        description="Collect files by priority until their estimated tokens reach this many"
+    )
+    
+    max_file_size: Optional[int] = Field(
+        default=None,
+        ge=1,
+        description="Skip files larger than this many bytes"
+    )
+    
+    priority: str = Field(
+        default="path",
+        description="Order in which files are taken into the budget: path, recent or smallest"
+    )
+    
+    tokenizer: str = Field(
+        default="estimate",
+        description="Token counter: estimate, tiktoken[:encoding] or a tokenizer.json path"
+    )
+    
+    path_weights: List[Tuple[str, float]] = Field(
+        default_factory=list,
+        description="(pattern, weight) pairs; files matching higher weights are collected first"
     )
     
     verbose: bool = Field(
         default=False,
         description="Whether to show detailed configuration information"
     )
+    
+    headless: bool = Field(
+        default=False,
+        description="Emit newline-delimited JSON events instead of the interactive UI"
+    )
+    
+    profile_path: Optional[Path] = Field(
+        default=None,
+        description="Write a JSON profile of phases, per-file and upload latency here"
+    )
+    
+    profile_pstats: Optional[Path] = Field(
+        default=None,
+        description="Also profile the run with cProfile and dump pstats here"
+    )
 
     def get_effective_patterns(self) -> Set[str]:
         """Get the complete set of exclusion patterns to use."""
@@ -68,6 +223,18 @@ class CollectorConfig(BaseModel):
         patterns.update(self.custom_excludes)
         return patterns
 
+    def get_api_url(self, route: str) -> str:
+        """Get the URL of another API route next to the text upload endpoint."""
+        return f"{self.api_endpoint.rstrip('/').rsplit('/', 1)[0]}/{route}"
+
+    def get_cache_dir(self) -> Path:
+        """Get the directory holding the incremental collection cache."""
+        return self.cache_dir or user_cache_dir(self.search_dir)
+
+    def get_journal_dir(self) -> Path:
+        """Get the directory holding send journals and spooled chunks of unfinished uploads."""
+        return self.get_cache_dir() / JOURNAL_DIR_NAME
+
     def get_pattern_summary(self) -> dict:
         """Get a summary of all exclusion patterns by category."""
         if not self.use_default_excludes:
@@ -0,0 +1,181 @@
+"""
+Send journals, so a failed or interrupted upload can be finished later with
+``weaver resume`` instead of collecting and sending everything again.
+
+An upload's chunks are spooled to ``<collection id>.chunks`` next to its
+journal ``<collection id>.journal``, a JSON-lines file: the first line
+describes the upload (collection ID, endpoint, size and SHA-256 of every
+chunk), each following line holds the seq of a chunk the server
+acknowledged. Acknowledgements are appended and flushed as they arrive,
+so a crash loses at most those in flight; such chunks are sent again and
+the server, idempotent on (collection ID, seq), does not store them twice.
+Batched uploads (``batched`` in the header) stage their chunks on the
+server, which joins them once the upload is completed; a resumed batched
+upload is completed again even if every chunk was acknowledged.
+"""
+import hashlib
+import json
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import IO, Iterable, Iterator, List, Optional, Set, Tuple
+
+JOURNAL_DIR_NAME = "uploads"
+JOURNAL_VERSION = 1
+
+
+class SendJournal:
+    """The journal of one chunked upload; `ack` may be called from several threads."""
+
+    def __init__(
+        self,
+        path: Path,
+        collection_id: str,
+        endpoint: str,
+        sizes: List[int],
+        digests: List[str],
+        created: str,
+        acked: Optional[Set[int]] = None,
+        batched: bool = False
+    ):
+        self.path = path
+        self.collection_id = collection_id
+        self.endpoint = endpoint
+        self.sizes = sizes
+        self.digests = digests
+        self.created = created
+        self.acked: Set[int] = acked or set()
+        self.batched = batched
+        # Set once the upload is complete and its files are deleted
+        self.removed = False
+        self._file: Optional[IO[str]] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def chunk_path_for(directory: Path, collection_id: str) -> Path:
+        return directory / f"{collection_id}.chunks"
+
+    @property
+    def chunk_path(self) -> Path:
+        return self.chunk_path_for(self.path.parent, self.collection_id)
+
+    @classmethod
+    def create(
+        cls,
+        directory: Path,
+        collection_id: str,
+        endpoint: str,
+        sizes: List[int],
+        digests: List[str],
+        batched: bool = False
+    ) -> "SendJournal":
+        """Start the journal of an upload whose chunks are already spooled."""
+        journal = cls(
+            directory / f"{collection_id}.journal", collection_id, endpoint,
+            list(sizes), list(digests), datetime.now().isoformat(), batched=batched
+        )
+        header = {
+            "version": JOURNAL_VERSION,
+            "collection_id": collection_id,
+            "endpoint": endpoint,
+            "created": journal.created,
+            "sizes": journal.sizes,
+            "digests": journal.digests,
+            "batched": batched,
+        }
+        journal._file = open(journal.path, "w", encoding="utf-8")
+        journal._file.write(json.dumps(header) + "\n")
+        journal._file.flush()
+        return journal
+
+    @classmethod
+    def load(cls, path: Path) -> "SendJournal":
+        """
+        Read a journal back. Raises ValueError if it is not a journal this
+        version can resume.
+        """
+        with open(path, encoding="utf-8") as f:
+            try:
+                header = json.loads(f.readline())
+            except json.JSONDecodeError:
+                raise ValueError(f"{path} is not a send journal") from None
+            if header.get("version") != JOURNAL_VERSION:
+                raise ValueError(f"{path}: unsupported journal version {header.get('version')}")
+            acked = set()
+            for line in f:
+                # A crash can leave the last line half written
+                if line.endswith("\n"):
+                    acked.add(int(line))
+        return cls(
+            path, header["collection_id"], header["endpoint"],
+            header["sizes"], header["digests"], header["created"], acked,
+            header.get("batched", False)
+        )
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(self.sizes)
+
+    @property
+    def pending(self) -> List[int]:
+        """Seqs of the chunks not acknowledged yet, in order."""
+        return [seq for seq in range(len(self.sizes)) if seq not in self.acked]
+
+    @property
+    def complete(self) -> bool:
+        return len(self.acked) >= len(self.sizes)
+
+    def ack(self, seq: int) -> None:
+        with self._lock:
+            if seq in self.acked:
+                return
+            self.acked.add(seq)
+            if self._file is None:
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(f"{seq}\n")
+            self._file.flush()
+
+    def read_chunks(self, seqs: Iterable[int]) -> Iterator[Tuple[int, bytes]]:
+        """
+        Read spooled chunks back, checking each against its recorded digest.
+        Raises ValueError if the spool file was changed or truncated.
+        """
+        offsets = [0]
+        for size in self.sizes:
+            offsets.append(offsets[-1] + size)
+        with open(self.chunk_path, "rb") as f:
+            for seq in seqs:
+                f.seek(offsets[seq])
+                chunk = f.read(self.sizes[seq])
+                if hashlib.sha256(chunk).hexdigest() != self.digests[seq]:
+                    raise ValueError(f"Chunk {seq} in {self.chunk_path} does not match the journal")
+                yield seq, chunk
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def remove(self) -> None:
+        """Delete the journal and its spooled chunks, e.g. once the upload is complete."""
+        self.close()
+        self.removed = True
+        for path in (self.path, self.chunk_path):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def find_journals(directory: Path) -> List[SendJournal]:
+    """The resumable uploads journaled in ``directory``, most recent first."""
+    journals = []
+    for path in directory.glob("*.journal"):
+        try:
+            journal = SendJournal.load(path)
+        except (OSError, ValueError, KeyError):
+            continue
+        if journal.chunk_path.exists():
+            journals.append(journal)
+    return sorted(journals, key=lambda journal: journal.created, reverse=True)
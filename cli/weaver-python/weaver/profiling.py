@@ -0,0 +1,168 @@
+"""
+Opt-in instrumentation for ``weaver collect --profile``.
+
+The collector only touches a Profiler when one is configured: per-file
+timing is installed by wrapping the file analysis method, so a run without
+``--profile`` executes exactly the same code as before.
+"""
+import cProfile
+import json
+import time
+from array import array
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .utils.charset import BINARY, SNIFF_SIZE
+
+# Latency percentiles included in the report
+PERCENTILES = (50, 95, 99)
+SLOWEST_FILES = 10
+
+
+def read_proc_io() -> Optional[Dict[str, int]]:
+    """This process's I/O counters (syscalls, bytes) from /proc, or None if unavailable."""
+    try:
+        with open("/proc/self/io") as f:
+            return {
+                key: int(value)
+                for key, value in (line.split(":", 1) for line in f if ":" in line)
+            }
+    except (OSError, ValueError):
+        return None
+
+
+def latency_summary(seconds: Sequence[float]) -> Dict[str, float]:
+    """Mean, max and nearest-rank percentiles of ``seconds``, in milliseconds."""
+    if not seconds:
+        return {}
+    ordered = sorted(seconds)
+    summary = {
+        f"p{p}": round(ordered[min(len(ordered) - 1, len(ordered) * p // 100)] * 1000, 3)
+        for p in PERCENTILES
+    }
+    summary["max"] = round(ordered[-1] * 1000, 3)
+    summary["mean"] = round(sum(ordered) / len(ordered) * 1000, 3)
+    return summary
+
+
+def _bytes_read(source) -> int:
+    if source.encoding == BINARY:
+        # Only the sniffed head of a binary file is read
+        return min(source.size, SNIFF_SIZE)
+    # Streamed sources carry no data but were read in full
+    return source.size if source.data is None else len(source.data)
+
+
+class PhaseStats:
+    __slots__ = ("seconds", "cpu_seconds", "io")
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.io: Dict[str, int] = {}
+
+    def as_dict(self) -> dict:
+        return {
+            "seconds": round(self.seconds, 4),
+            "cpu_seconds": round(self.cpu_seconds, 4),
+            **self.io,
+        }
+
+
+class Profiler:
+    """
+    Timers and counters for one collection run.
+
+    Records wall and CPU time and /proc I/O counters (read/write syscalls
+    and bytes, on Linux) per phase, and the latency and bytes read of every
+    file. Upload latencies and retries come from the ChunkSender's chunk
+    statistics. With ``pstats_path`` the whole run is also profiled with
+    cProfile and dumped there for ``python -m pstats``.
+    """
+
+    def __init__(self, report_path: Path, pstats_path: Optional[Path] = None):
+        self.report_path = report_path
+        self.pstats_path = pstats_path
+        self.phases: Dict[str, PhaseStats] = {}
+        self.file_seconds = array("d")
+        self.files_bytes_read = 0
+        self._slowest: List[Tuple[float, str]] = []
+        self._cprofile: Optional[cProfile.Profile] = None
+
+    def start(self) -> None:
+        if self.pstats_path:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+
+    def stop(self) -> None:
+        if self._cprofile:
+            self._cprofile.disable()
+            self._cprofile.dump_stats(str(self.pstats_path))
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        stats = self.phases.setdefault(name, PhaseStats())
+        io_before = read_proc_io()
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            stats.seconds += time.perf_counter() - wall
+            stats.cpu_seconds += time.process_time() - cpu
+            io_after = read_proc_io()
+            if io_before and io_after:
+                for key in ("syscr", "syscw", "rchar", "wchar"):
+                    stats.io[key] = stats.io.get(key, 0) + io_after[key] - io_before[key]
+
+    def wrap_file_analysis(self, analyse: Callable) -> Callable:
+        """Time every call of the collector's per-file analysis."""
+        def timed(file: Path, *args, **kwargs):
+            start = time.perf_counter()
+            result = analyse(file, *args, **kwargs)
+            elapsed = time.perf_counter() - start
+            self.record_file(str(file), elapsed, _bytes_read(result[1]) if result else 0)
+            return result
+        return timed
+
+    def record_file(self, path: str, seconds: float, bytes_read: int) -> None:
+        """Record one file's processing time, e.g. as measured in a worker process."""
+        self.file_seconds.append(seconds)
+        self.files_bytes_read += bytes_read
+        self._track_slowest(seconds, path)
+
+    def _track_slowest(self, elapsed: float, path: str) -> None:
+        if len(self._slowest) < SLOWEST_FILES:
+            self._slowest.append((elapsed, path))
+            self._slowest.sort(reverse=True)
+        elif elapsed > self._slowest[-1][0]:
+            self._slowest[-1] = (elapsed, path)
+            self._slowest.sort(reverse=True)
+
+    def report(self, chunk_stats: Iterable = (), retries: int = 0) -> dict:
+        chunks = list(chunk_stats)
+        return {
+            "phases": {name: stats.as_dict() for name, stats in self.phases.items()},
+            "files": {
+                "count": len(self.file_seconds),
+                "bytes_read": self.files_bytes_read,
+                "latency_ms": latency_summary(self.file_seconds),
+                "slowest": [
+                    {"path": path, "ms": round(seconds * 1000, 3)}
+                    for seconds, path in self._slowest
+                ],
+            },
+            "uploads": {
+                "chunks": len(chunks),
+                "retries": retries,
+                "attempts": sum(stats.attempts for stats in chunks),
+                "raw_bytes": sum(stats.raw_bytes for stats in chunks),
+                "wire_bytes": sum(stats.wire_bytes for stats in chunks),
+                "encode_cpu_seconds": round(sum(stats.cpu_seconds for stats in chunks), 4),
+                "latency_ms": latency_summary([stats.seconds for stats in chunks]),
+            },
+            "pstats": str(self.pstats_path) if self.pstats_path else None,
+        }
+
+    def write_report(self, report: dict) -> None:
+        self.report_path.write_text(json.dumps(report, indent=2) + "\n")
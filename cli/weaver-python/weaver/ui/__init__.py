@@ -3,7 +3,8 @@ UI components for the Code Collector application.
 """
 
 from .components import FileTree, Statistics
-from .progress import ProgressManager
+from .headless import JsonReporter
+from .progress import create_progress_bar
 from .styles import THEME
 
-__all__ = ['FileTree', 'Statistics', 'create_progress_bar', 'THEME']
\ No newline at end of file
+__all__ = ['FileTree', 'JsonReporter', 'Statistics', 'create_progress_bar', 'THEME']
\ No newline at end of file
@@ -6,48 +6,110 @@ from rich.console import Console
 from rich.align import Align
 from rich.columns import Columns
 from rich.layout import Layout
+from array import array
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, Iterator, List, Optional
+
+# Node ids in FileTree's arrays
+ROOT = 0
+NO_NODE = -1
 
 class FileTree:
-    """Enhanced FileTree with better organization and visual hierarchy."""
+    """
+    File tree kept as a compact trie and turned into rich renderables only
+    when displayed.
+
+    Path components are interned, and nodes are integer ids into parallel
+    arrays (name, parent, first/last child, next sibling, size, file
+    count), so each file costs a few dozen bytes rather than a rich Tree
+    node. Only directories are indexed for lookup, by (parent, name id).
+    """
+
+    __slots__ = (
+        "_cwd", "_names", "_name_ids", "_name", "_parent", "_first_child",
+        "_last_child", "_next_sibling", "_child_count", "_size", "_files",
+        "_is_dir", "_dirs", "_file_count", "_folder_count",
+    )
     
     def __init__(self):
-        self.tree = Tree(
-            "[bold blue]📁 Project Files[/bold blue]",
-            guide_style="bright_black"
-        )
+        self._cwd = Path.cwd()
+        self._names: List[str] = [""]
+        self._name_ids: Dict[str, int] = {"": 0}
+        self._name = array("i", [0])
+        self._parent = array("i", [NO_NODE])
+        self._first_child = array("i", [NO_NODE])
+        self._last_child = array("i", [NO_NODE])
+        self._next_sibling = array("i", [NO_NODE])
+        self._child_count = array("i", [0])
+        self._size = array("q", [0])
+        self._files = array("i", [0])
+        self._is_dir = bytearray(b"\x01")
+        self._dirs: Dict[int, int] = {}
         self._file_count = 0
         self._folder_count = 0
-        self.folder_cache = {}
         
-    def add_file(self, path: Path) -> None:
+    def add_file(self, path: Path, size: int = 0) -> None:
         try:
-            parts = list(path.relative_to(Path.cwd()).parts)
+            parts = path.relative_to(self._cwd).parts
         except ValueError:
-            parts = list(path.parts)
+            parts = path.parts
             
-        current = self.tree
-        current_path = ""
+        node = ROOT
         
         # Process all parts except the last (file) part
         for part in parts[:-1]:
-            current_path = str(Path(current_path) / part)
-            if current_path in self.folder_cache:
-                current = self.folder_cache[current_path]
-            else:
-                # Create new folder node with custom styling
-                folder_label = f"[blue]📁 {part}[/blue]"
-                new_node = current.add(folder_label, guide_style="bright_black")
-                self.folder_cache[current_path] = new_node
-                current = new_node
+            name_id = self._intern(part)
+            key = node << 32 | name_id
+            child = self._dirs.get(key)
+            if child is None:
+                child = self._add_node(node, name_id, is_dir=True)
+                self._dirs[key] = child
                 self._folder_count += 1
+            node = child
         
-        # Add the file with an appropriate icon based on extension
-        file_name = parts[-1]
-        icon = self._get_file_icon(file_name)
-        current.add(f"[white]{icon} {file_name}[/white]", guide_style="bright_black")
+        self._add_node(node, self._intern(parts[-1]), is_dir=False, size=size)
         self._file_count += 1
+        
+        # Folder totals drive top-N ordering and collapsed summaries
+        while node != NO_NODE:
+            self._size[node] += size
+            self._files[node] += 1
+            node = self._parent[node]
+
+    def _intern(self, name: str) -> int:
+        name_id = self._name_ids.get(name)
+        if name_id is None:
+            name_id = self._name_ids[name] = len(self._names)
+            self._names.append(name)
+        return name_id
+
+    def _add_node(self, parent: int, name_id: int, is_dir: bool, size: int = 0) -> int:
+        node = len(self._name)
+        self._name.append(name_id)
+        self._parent.append(parent)
+        self._first_child.append(NO_NODE)
+        self._last_child.append(NO_NODE)
+        self._next_sibling.append(NO_NODE)
+        self._child_count.append(0)
+        self._size.append(size)
+        self._files.append(0 if is_dir else 1)
+        self._is_dir.append(is_dir)
+        
+        # Link last so children keep insertion order
+        last = self._last_child[parent]
+        if last == NO_NODE:
+            self._first_child[parent] = node
+        else:
+            self._next_sibling[last] = node
+        self._last_child[parent] = node
+        self._child_count[parent] += 1
+        return node
+
+    def _children(self, node: int) -> Iterator[int]:
+        child = self._first_child[node]
+        while child != NO_NODE:
+            yield child
+            child = self._next_sibling[child]
 
     def _get_file_icon(self, file_name: str) -> str:
         """Return appropriate icon based on file extension."""
@@ -76,17 +138,37 @@ class FileTree:
         }
         return icons.get(ext, '📄')
 
-    def generate_tree(self) -> Panel:
-        """Generate a panel containing the file tree with statistics."""
+    def generate_tree(
+        self,
+        max_lines: Optional[int] = None,
+        max_depth: Optional[int] = None,
+        top_n: Optional[int] = None
+    ) -> Panel:
+        """
+        Generate a panel containing the file tree with statistics.
+
+        The view can be bounded: ``max_lines`` caps the number of entries,
+        ``max_depth`` collapses folders below that depth into a file count,
+        and ``top_n`` shows only the largest entries of each folder. Hidden
+        entries are summarized on a "more" line, so the cost of rendering
+        depends on the view, not on the number of files.
+        """
         stats_text = (
             f"[bold cyan]Total Files:[/bold cyan] {self._file_count}  "
             f"[bold cyan]Total Folders:[/bold cyan] {self._folder_count}"
         )
         
+        tree = Tree(
+            "[bold blue]📁 Project Files[/bold blue]",
+            guide_style="bright_black"
+        )
+        budget = max_lines if max_lines is not None else float("inf")
+        self._render(ROOT, tree, 1, budget, max_depth, top_n)
+        
         return Panel(
             Align.left(
                 Columns([
-                    self.tree,
+                    tree,
                     Align.right(stats_text)
                 ], expand=True)
             ),
@@ -95,28 +177,77 @@ class FileTree:
             padding=(1, 2)
         )
 
+    def _render(
+        self,
+        node: int,
+        target: Tree,
+        depth: int,
+        budget: float,
+        max_depth: Optional[int],
+        top_n: Optional[int]
+    ) -> float:
+        """Add up to ``budget`` entries under ``node`` to ``target``; returns the budget left."""
+        children: Iterable[int] = self._children(node)
+        if top_n is not None:
+            children = sorted(children, key=self._size.__getitem__, reverse=True)[:top_n]
+        
+        shown = shown_files = 0
+        for child in children:
+            if budget <= 0:
+                break
+            budget -= 1
+            shown += 1
+            shown_files += self._files[child]
+            name = self._names[self._name[child]]
+            
+            if not self._is_dir[child]:
+                icon = self._get_file_icon(name)
+                target.add(f"[white]{icon} {name}[/white]", guide_style="bright_black")
+            elif max_depth is not None and depth >= max_depth:
+                target.add(
+                    f"[blue]📁 {name}[/blue] "
+                    f"[bright_black]({self._files[child]:,} files)[/bright_black]",
+                    guide_style="bright_black"
+                )
+            else:
+                branch = target.add(f"[blue]📁 {name}[/blue]", guide_style="bright_black")
+                budget = self._render(child, branch, depth + 1, budget, max_depth, top_n)
+        
+        hidden = self._child_count[node] - shown
+        if hidden > 0:
+            target.add(
+                f"[bright_black]… {hidden:,} more "
+                f"({self._files[node] - shown_files:,} files)[/bright_black]",
+                guide_style="bright_black"
+            )
+        return budget
+
 class Statistics:
     """Enhanced Statistics with better visual organization."""
     
     def __init__(self):
         self.total_files: int = 0
         self.total_lines: int = 0
+        self.total_tokens: int = 0
         self.extensions: Dict[str, Dict[str, Any]] = {}
         
-    def update(self, file: Path, lines: int) -> None:
+    def update(self, file: Path, lines: int, tokens: int = 0) -> None:
         self.total_files += 1
         self.total_lines += lines
+        self.total_tokens += tokens
         ext = file.suffix
         
         if ext not in self.extensions:
             self.extensions[ext] = {
                 'count': 0,
                 'lines': 0,
+                'tokens': 0,
                 'icon': self._get_file_icon(ext)
             }
             
         self.extensions[ext]['count'] += 1
         self.extensions[ext]['lines'] += lines
+        self.extensions[ext]['tokens'] += tokens
 
     def _get_file_icon(self, ext: str) -> str:
         """Return appropriate icon based on file extension."""
@@ -156,6 +287,10 @@ class Statistics:
             "[bold]Total Lines[/bold]",
             f"{self.total_lines:,}"
         )
+        table.add_row(
+            "[bold]Total Tokens[/bold]",
+            f"{self.total_tokens:,}"
+        )
         
         # Add separator
         table.add_row("", "")
@@ -178,7 +313,8 @@ class Statistics:
                 icon = data['icon']
                 table.add_row(
                     f"{icon} {ext}",
-                    f"{data['count']:,} files ({data['lines']:,} lines)"
+                    f"{data['count']:,} files ({data['lines']:,} lines, "
+                    f"{data['tokens']:,} tokens)"
                 )
         
         return Panel(
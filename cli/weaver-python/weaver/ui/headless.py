@@ -0,0 +1,35 @@
+"""
+Machine-readable output for headless (CI) runs.
+"""
+import json
+import sys
+import time
+from typing import Any, Optional, TextIO
+
+
+class JsonReporter:
+    """
+    Write newline-delimited JSON events, one object per line.
+
+    Every event has an ``event`` name and a ``time`` (Unix seconds).
+    Progress events are rate-limited: ``due()`` is True at most once per
+    ``interval`` seconds, so callers can check it on every file and only
+    build the event when it is time.
+    """
+
+    def __init__(self, stream: Optional[TextIO] = None, interval: float = 1.0):
+        self.stream = stream or sys.stdout
+        self.interval = interval
+        self._next_progress = 0.0
+
+    def event(self, name: str, **fields: Any) -> None:
+        record = {"event": name, "time": round(time.time(), 3), **fields}
+        self.stream.write(json.dumps(record, default=str) + "\n")
+        self.stream.flush()
+
+    def due(self) -> bool:
+        now = time.monotonic()
+        if now < self._next_progress:
+            return False
+        self._next_progress = now + self.interval
+        return True
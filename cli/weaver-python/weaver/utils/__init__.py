@@ -2,13 +2,15 @@
 Utility functions for the Code Collector application.
 """
 
-from .file_utils import collect_files, count_lines, read_in_chunks
+from .file_utils import collect_files, count_lines, read_in_chunks, read_source
 from .http_utils import send_chunk
-from .patterns import DEFAULT_EXCLUDE_PATTERNS, get_pattern_categories, should_exclude
+from .patterns import DEFAULT_EXCLUDE_PATTERNS, PatternMatcher, get_pattern_categories, should_exclude
 
 __all__ = [
     'collect_files',
     'count_lines',
     'read_in_chunks',
-    'send_chunk'
+    'read_source',
+    'send_chunk',
+    'PatternMatcher'
 ]
\ No newline at end of file
@@ -0,0 +1,257 @@
+"""
+Minimal asyncio HTTP/1.1 client for the async upload pipeline.
+
+Only what chunk uploads need: POST requests with a complete body over a
+pool of keep-alive connections (plain or TLS), with a connect timeout and
+a read timeout that also bounds each wait while sending a request. Responses may be
+sized by Content-Length, chunked, or delimited by the server closing the
+connection. Proxies are not supported: HTTP_PROXY and HTTPS_PROXY are
+ignored (see `proxy_for`), unlike with requests.
+"""
+import asyncio
+import ssl
+import urllib.request
+from typing import Deque, Dict, NamedTuple, Optional, Tuple, Union
+from collections import deque
+from urllib.parse import urlsplit
+
+# Longest status line or header block accepted from a server
+MAX_HEADER_BYTES = 64 * 1024
+
+# Largest response body accepted; upload answers are small JSON documents
+MAX_BODY_BYTES = 16 * 1024 * 1024
+
+# Requests are written in pieces of this size, the read timeout bounding
+# each, so a slow upload that keeps moving does not time out
+WRITE_BYTES = 64 * 1024
+
+
+class TransportError(Exception):
+    """The connection failed or timed out; the request may be retried."""
+
+
+class HTTPResponse(NamedTuple):
+    status: int
+    # Header names are lower-cased
+    headers: Dict[str, str]
+    body: bytes
+
+
+class _Connection(NamedTuple):
+    reader: asyncio.StreamReader
+    writer: asyncio.StreamWriter
+
+
+class AsyncHTTPClient:
+    """
+    POST to HTTP/1.1 servers over at most ``max_connections`` keep-alive
+    connections per host.
+
+    Idle connections are reused in LIFO order. A request that fails on a
+    reused connection before any response arrives (the server closed it
+    while idle) is sent again once on a fresh connection.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 1,
+        timeout: Union[float, Tuple[float, float]] = (10, 120)
+    ):
+        self.connect_timeout, self.read_timeout = (
+            timeout if isinstance(timeout, tuple) else (timeout, timeout)
+        )
+        self.max_connections = max(1, max_connections)
+        self.connections_opened = 0
+        self._idle: Dict[Tuple[str, str, int], Deque[_Connection]] = {}
+        self._slots: Dict[Tuple[str, str, int], asyncio.Semaphore] = {}
+        self._ssl: Optional[ssl.SSLContext] = None
+
+    async def __aenter__(self) -> "AsyncHTTPClient":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        for idle in self._idle.values():
+            while idle:
+                await _close(idle.pop(), self.connect_timeout)
+
+    async def post(self, url: str, body: bytes, headers: Dict[str, str]) -> HTTPResponse:
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"Unsupported URL scheme: {url}")
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        key = (parts.scheme, parts.hostname, port)
+        target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        host = parts.hostname if parts.port is None else f"{parts.hostname}:{parts.port}"
+        request = _request_head(target, host, len(body), headers) + body
+
+        slots = self._slots.setdefault(key, asyncio.Semaphore(self.max_connections))
+        async with slots:
+            idle = self._idle.setdefault(key, deque())
+            while True:
+                reused = bool(idle)
+                connection = idle.pop() if reused else await self._connect(key)
+                try:
+                    response, keep_alive = await self._exchange(connection, request)
+                except _StaleConnection:
+                    _abort(connection)
+                    if reused:
+                        continue
+                    raise TransportError("Connection closed by the server") from None
+                except BaseException:
+                    # Unsent request bytes would make a graceful close wait
+                    _abort(connection)
+                    raise
+                if keep_alive:
+                    idle.append(connection)
+                else:
+                    await _close(connection, self.connect_timeout)
+                return response
+
+    async def _connect(self, key: Tuple[str, str, int]) -> _Connection:
+        scheme, host, port = key
+        if scheme == "https" and self._ssl is None:
+            self._ssl = ssl.create_default_context()
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(
+                    host, port, ssl=self._ssl if scheme == "https" else None,
+                    limit=MAX_HEADER_BYTES
+                ),
+                self.connect_timeout
+            )
+        except (OSError, asyncio.TimeoutError) as e:
+            raise TransportError(f"Cannot connect to {host}:{port}: {e or 'timed out'}") from e
+        self.connections_opened += 1
+        return _Connection(reader, writer)
+
+    async def _exchange(self, connection: _Connection, request: bytes) -> Tuple[HTTPResponse, bool]:
+        reader, writer = connection
+        try:
+            view = memoryview(request)
+            for start in range(0, len(request), WRITE_BYTES):
+                writer.write(view[start:start + WRITE_BYTES])
+                await asyncio.wait_for(writer.drain(), self.read_timeout)
+        # Before OSError, which TimeoutError is a subclass of since Python 3.11
+        except asyncio.TimeoutError as e:
+            raise TransportError("Timed out sending the request") from e
+        except (ConnectionError, OSError) as e:
+            raise _StaleConnection() from e
+        try:
+            head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), self.read_timeout)
+        except asyncio.TimeoutError as e:
+            raise TransportError("Timed out waiting for the response") from e
+        except asyncio.IncompleteReadError as e:
+            if not e.partial:
+                raise _StaleConnection() from e
+            raise TransportError("Connection closed mid-response") from e
+        except (ConnectionError, OSError) as e:
+            raise _StaleConnection() from e
+        except asyncio.LimitOverrunError as e:
+            raise TransportError("Response headers too long") from e
+
+        status_line, *header_lines = head[:-4].decode("latin-1").split("\r\n")
+        version, status = _parse_status(status_line)
+        headers = {}
+        for line in header_lines:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        connection_header = headers.get("connection", "").lower()
+        keep_alive = (
+            connection_header == "keep-alive"
+            if version == "HTTP/1.0" else connection_header != "close"
+        )
+        try:
+            if headers.get("transfer-encoding", "").lower() == "chunked":
+                body = await asyncio.wait_for(_read_chunked(reader), self.read_timeout)
+            elif "content-length" in headers:
+                length = int(headers["content-length"])
+                if length > MAX_BODY_BYTES:
+                    raise ValueError(f"body of {length} bytes is too large")
+                body = await asyncio.wait_for(reader.readexactly(length), self.read_timeout)
+            elif status in (204, 304) or 100 <= status < 200:
+                body = b""
+            else:
+                body = await asyncio.wait_for(_read_to_close(reader), self.read_timeout)
+                keep_alive = False
+        except asyncio.TimeoutError as e:
+            raise TransportError("Timed out reading the response") from e
+        except (asyncio.IncompleteReadError, ConnectionError, OSError, ValueError) as e:
+            raise TransportError(f"Invalid or incomplete response body: {e}") from e
+        return HTTPResponse(status, headers, body), keep_alive
+
+
+class _StaleConnection(Exception):
+    """The connection was closed before any of the response arrived."""
+
+
+def _request_head(target: str, host: str, length: int, headers: Dict[str, str]) -> bytes:
+    lines = [f"POST {target} HTTP/1.1", f"Host: {host}", f"Content-Length: {length}"]
+    lines.extend(f"{name}: {value}" for name, value in headers.items())
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+def _parse_status(line: str) -> Tuple[str, int]:
+    version, _, rest = line.partition(" ")
+    try:
+        return version, int(rest[:3])
+    except ValueError:
+        raise TransportError(f"Invalid status line: {line!r}") from None
+
+
+async def _read_chunked(reader: asyncio.StreamReader) -> bytes:
+    parts = []
+    total = 0
+    while True:
+        size = int((await reader.readuntil(b"\r\n")).split(b";", 1)[0], 16)
+        if size == 0:
+            # Trailers end with an empty line
+            while await reader.readuntil(b"\r\n") != b"\r\n":
+                pass
+            return b"".join(parts)
+        total += size
+        if total > MAX_BODY_BYTES:
+            raise ValueError("chunked body is too large")
+        parts.append(await reader.readexactly(size))
+        await reader.readexactly(2)
+
+
+async def _read_to_close(reader: asyncio.StreamReader) -> bytes:
+    body = b""
+    while len(body) <= MAX_BODY_BYTES:
+        more = await reader.read(MAX_BODY_BYTES + 1 - len(body))
+        if not more:
+            return body
+        body += more
+    raise ValueError("body is too large")
+
+
+async def _close(connection: _Connection, timeout: float) -> None:
+    """Close gracefully, aborting if that takes longer than ``timeout``."""
+    connection.writer.close()
+    try:
+        await asyncio.wait_for(connection.writer.wait_closed(), timeout)
+    except asyncio.TimeoutError:
+        _abort(connection)
+    except (ConnectionError, OSError, ssl.SSLError):
+        pass
+
+
+def _abort(connection: _Connection) -> None:
+    """Drop the connection at once, discarding anything not yet sent."""
+    connection.writer.transport.abort()
+
+
+def proxy_for(url: str) -> Optional[str]:
+    """
+    The proxy HTTP_PROXY, HTTPS_PROXY and NO_PROXY pick for ``url``, which
+    requests would use and this client does not; None if there is none.
+    """
+    parts = urlsplit(url)
+    proxy = urllib.request.getproxies().get(parts.scheme)
+    if proxy and parts.hostname and urllib.request.proxy_bypass(parts.hostname):
+        return None
+    return proxy
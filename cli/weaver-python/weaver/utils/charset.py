@@ -0,0 +1,91 @@
+"""
+Classify source files by their first bytes and convert them to UTF-8.
+
+Only the first SNIFF_SIZE bytes are looked at to tell binaries (a NUL
+byte, as git does) and byte-order-marked UTF-8/16/32 apart from plain
+text, so binaries are skipped without being read in full. Text that
+turns out not to be UTF-8 is converted from a legacy single-byte encoding.
+"""
+import codecs
+from typing import Optional, Tuple
+
+# Bytes inspected per file; git looks at the same amount for NUL bytes
+SNIFF_SIZE = 8000
+
+BINARY = 'binary'
+UTF8_ENCODINGS = ('ascii', 'utf-8')
+# Tried in order for text that is not UTF-8; latin-1 decodes any byte
+LEGACY_ENCODINGS = ('cp1252', 'latin-1')
+
+# UTF-32 LE first: its BOM starts with the UTF-16 LE one
+_BOMS = (
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+
+def sniff(head: bytes) -> str:
+    """
+    Classify a file by its first bytes: 'binary', a BOM encoding
+    ('utf-8-sig', 'utf-16', 'utf-32'), 'ascii', 'utf-8', or the first
+    legacy encoding when the bytes are not UTF-8.
+    """
+    for bom, encoding in _BOMS:
+        if head.startswith(bom):
+            return encoding
+    if b"\0" in head:
+        return BINARY
+    if head.isascii():
+        return 'ascii'
+    try:
+        # Not final: the head may end inside a multi-byte character
+        codecs.getincrementaldecoder('utf-8')().decode(head)
+    except UnicodeDecodeError:
+        return LEGACY_ENCODINGS[0]
+    return 'utf-8'
+
+
+def to_utf8(data: bytes, encoding: str) -> Tuple[Optional[bytes], Optional[str]]:
+    """
+    Convert a whole file to UTF-8, given its sniffed or cached encoding.
+
+    Returns the UTF-8 bytes and the encoding the file turned out to be in
+    (e.g. 'ascii' content past a UTF-8 head, or a legacy encoding when
+    UTF-8 fails further in), or (None, None) if it cannot be decoded.
+    """
+    if encoding in UTF8_ENCODINGS:
+        if data.isascii():
+            return data, 'ascii'
+        try:
+            data.decode('utf-8')
+            return data, 'utf-8'
+        except UnicodeDecodeError:
+            encoding = LEGACY_ENCODINGS[0]
+
+    if encoding == 'utf-8-sig':
+        data = data[len(codecs.BOM_UTF8):] if data.startswith(codecs.BOM_UTF8) else data
+        try:
+            data.decode('utf-8')
+        except UnicodeDecodeError:
+            return None, None
+        return data, encoding
+
+    candidates = LEGACY_ENCODINGS if encoding in LEGACY_ENCODINGS else (encoding,)
+    for candidate in candidates[candidates.index(encoding):]:
+        try:
+            return data.decode(candidate).encode('utf-8'), candidate
+        except UnicodeDecodeError:
+            continue
+    return None, None
+
+
+def skip_reason(encoding: Optional[str]) -> Optional[str]:
+    """Why a file of this encoding is not collected, or None if it is."""
+    if encoding == BINARY:
+        return BINARY
+    if encoding is None:
+        return 'undecodable'
+    return None
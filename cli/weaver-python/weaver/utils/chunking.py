@@ -0,0 +1,139 @@
+"""
+Content-defined chunking of the collection stream.
+
+Chunks are made of whole records (the metadata header or one ``File:``
+record), so a file or its header is never split across chunks unless the
+file alone exceeds the maximum chunk size. Where a chunk ends depends only
+on the content of the records in it, so editing one file changes only the
+chunk holding that file and the chunks of unchanged regions stay byte-for-
+byte identical between runs.
+"""
+import zlib
+from itertools import chain
+from pathlib import Path
+from typing import Callable, Generator, Iterable, List, Union
+
+_HASH_SPACE = 1 << 32
+
+
+class RecordChunker:
+    """
+    Pack records into chunks between ``min_size`` and ``max_size`` bytes.
+
+    Every ``write`` call is one record. After each record that brings the
+    chunk to at least ``min_size``, the chunk ends if the record's CRC-32
+    falls under a threshold proportional to the record's length, which
+    gives chunks of about ``target_size`` on average. A record that would
+    overflow ``max_size`` starts a new chunk.
+
+    Records larger than ``max_size`` are cut the same way on line
+    boundaries, with each line's CRC-32 as the rolling fingerprint. Finished
+    chunks (UTF-8 bytes) go to ``emit``.
+    """
+
+    def __init__(
+        self,
+        emit: Callable[[bytes], None],
+        max_size: int,
+        min_size: int = 0,
+        target_size: int = 0
+    ):
+        self.max_size = max_size
+        self.min_size = min_size or max_size // 4
+        self.target_size = target_size or max_size // 2
+        self.chunks_emitted = 0
+        self._emit = emit
+        self._pending: List[bytes] = []
+        self._pending_size = 0
+
+    def write(self, record: bytes) -> int:
+        if len(record) > self.max_size:
+            self.flush()
+            self._write_pieces(_split_lines(record), self.max_size)
+            return len(record)
+
+        if self._pending_size + len(record) > self.max_size:
+            self.flush()
+        self._append(record)
+        return len(record)
+
+    def write_lines(self, lines: Iterable[Union[bytes, memoryview]]) -> int:
+        """
+        Write one record given as its lines, e.g. views into a memory-mapped
+        file. The chunks are the same as for ``write`` of the joined record,
+        but at most ``max_size`` bytes of it are held at a time.
+        """
+        lines = iter(lines)
+        head = []
+        size = 0
+        for line in lines:
+            head.append(line)
+            size += len(line)
+            if size > self.max_size:
+                break
+        else:
+            return self.write(b"".join(head))
+
+        self.flush()
+        return self._write_pieces(chain(head, lines), self.max_size)
+
+    def flush(self) -> None:
+        """End the current chunk here."""
+        if self._pending:
+            self._emit(b"".join(self._pending))
+            self.chunks_emitted += 1
+            self._pending = []
+            self._pending_size = 0
+
+    def close(self) -> None:
+        self.flush()
+
+    def _append(self, piece: bytes) -> None:
+        self._pending.append(piece)
+        self._pending_size += len(piece)
+        if self._pending_size >= self.min_size and self._is_boundary(piece):
+            self.flush()
+
+    def _is_boundary(self, piece: bytes) -> bool:
+        threshold = _HASH_SPACE * len(piece) // self.target_size
+        return zlib.crc32(piece) < threshold
+
+    def _write_pieces(self, pieces: Iterable[bytes], limit: int) -> int:
+        written = 0
+        for piece in pieces:
+            written += len(piece)
+            if len(piece) > limit:
+                # A single line longer than a chunk: cut it at character boundaries
+                self.flush()
+                for part in _split_fixed(piece, limit):
+                    self._append(part)
+                    self.flush()
+                continue
+            if self._pending_size + len(piece) > limit:
+                self.flush()
+            self._append(piece)
+        self.flush()
+        return written
+
+
+def _split_lines(data: bytes) -> List[bytes]:
+    return data.splitlines(keepends=True)
+
+
+def _split_fixed(data: bytes, size: int) -> Generator[bytes, None, None]:
+    start = 0
+    while start < len(data):
+        end = min(start + size, len(data))
+        while end < len(data) and end > start and (data[end] & 0xC0) == 0x80:
+            end -= 1
+        if end == start:
+            end = start + size
+        yield data[start:end]
+        start = end
+
+
+def read_chunks(file_path: Path, sizes: Iterable[int]) -> Generator[bytes, None, None]:
+    """Read back chunks written consecutively to ``file_path``."""
+    with open(file_path, 'rb') as f:
+        for size in sizes:
+            yield f.read(size)
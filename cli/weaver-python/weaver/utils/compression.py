@@ -0,0 +1,72 @@
+"""
+Chunk compression for uploads.
+
+gzip is always available; zstd is used when the optional ``zstandard``
+package is installed.
+"""
+import gzip
+import threading
+from typing import List, Optional
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+_local = threading.local()
+
+
+def available_encodings() -> List[str]:
+    """Content-Encodings this client can produce, most preferred first."""
+    return ['zstd', 'gzip'] if zstandard else ['gzip']
+
+
+def resolve_encoding(name: str) -> Optional[str]:
+    """
+    Map a ``--compression`` choice to a Content-Encoding, None meaning identity.
+
+    ``auto`` picks the best encoding available locally.
+    """
+    name = name.lower()
+    if name == 'none':
+        return None
+    if name == 'auto':
+        return available_encodings()[0]
+    if name not in ('gzip', 'zstd'):
+        raise ValueError(f"Unknown compression: {name}")
+    if name == 'zstd' and zstandard is None:
+        raise ValueError("zstd compression needs the 'zstandard' package")
+    return name
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """Compress data for the given Content-Encoding."""
+    if encoding == 'zstd':
+        # ZstdCompressor is not thread-safe; keep one per sender thread
+        compressor = getattr(_local, 'zstd', None)
+        if compressor is None:
+            compressor = _local.zstd = zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+        return compressor.compress(data)
+    if encoding == 'gzip':
+        return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+    raise ValueError(f"Unknown compression: {encoding}")
+
+
+def negotiate(offered: str, preferred: List[str]) -> Optional[str]:
+    """
+    Pick an encoding from a server's ``Accept-Encoding`` header value.
+
+    Returns the first of ``preferred`` the server lists, or None for identity.
+    """
+    accepted = {
+        token.split(';')[0].strip().lower()
+        for token in offered.split(',')
+        if token.strip()
+    }
+    for encoding in preferred:
+        if encoding in accepted:
+            return encoding
+    return None
@@ -0,0 +1,88 @@
+"""
+Client for content-addressed delta uploads.
+
+The CLI sends a manifest of (path, SHA-256) pairs, uploads only the file
+bodies the server reports missing, then commits the manifest; the server
+reassembles the collection in the usual ``File: <path>`` record layout.
+"""
+from typing import Iterable, List, NamedTuple, Set, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .http_utils import DEFAULT_TIMEOUT, RETRY_STATUS_CODES
+
+
+class ManifestEntry(NamedTuple):
+    path: str
+    digest: str
+
+
+class DeltaClient:
+    """
+    Talks to the backend's ``/api/delta`` routes.
+
+    All calls are idempotent, so transient failures are retried with
+    exponential backoff by the session's adapter. Errors surface as
+    ``requests`` exceptions.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        max_retries: int = 3,
+        timeout: Union[float, Tuple[float, float]] = DEFAULT_TIMEOUT
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.blobs_sent = 0
+        self.bytes_sent = 0
+
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=0.5,
+            status_forcelist=sorted(RETRY_STATUS_CODES),
+            allowed_methods=None,
+            raise_on_status=False
+        )
+        self.session = requests.Session()
+        self.session.mount("http://", HTTPAdapter(max_retries=retry))
+        self.session.mount("https://", HTTPAdapter(max_retries=retry))
+
+    def __enter__(self) -> "DeltaClient":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.session.close()
+
+    def missing(self, manifest: List[ManifestEntry]) -> Set[str]:
+        """Return the digests whose content the server does not have."""
+        response = self._post("manifest", {"files": [entry._asdict() for entry in manifest]})
+        return set(response["missing"])
+
+    def missing_chunks(self, digests: Iterable[str]) -> Set[str]:
+        """Return the chunk digests the server has not stored from earlier uploads."""
+        response = self._post("chunks", {"digests": sorted(set(digests))})
+        return set(response["missing"])
+
+    def upload_blobs(self, blobs: Iterable[Tuple[str, str]]) -> None:
+        """Upload (digest, content) pairs in one request."""
+        payload = [{"digest": digest, "content": content} for digest, content in blobs]
+        self._post("blobs", {"blobs": payload})
+        self.blobs_sent += len(payload)
+        self.bytes_sent += sum(len(blob["content"]) for blob in payload)
+
+    def commit(self, header: str, manifest: List[ManifestEntry]) -> dict:
+        """Ask the server to assemble the collection from the manifest."""
+        return self._post(
+            "collections",
+            {"header": header, "files": [entry._asdict() for entry in manifest]}
+        )
+
+    def _post(self, route: str, payload: dict) -> dict:
+        response = self.session.post(
+            f"{self.base_url}/{route}", json=payload, timeout=self.timeout
+        )
+        response.raise_for_status()
+        return response.json()
@@ -1,79 +1,503 @@
+import codecs
+import hashlib
+import mmap
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Set, Generator, List
-import re
-from .patterns import should_exclude, DEFAULT_EXCLUDE_PATTERNS
+from typing import (
+    Callable, Dict, Set, Generator, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+)
+from .charset import BINARY, SNIFF_SIZE, UTF8_ENCODINGS, sniff, to_utf8
+from .patterns import PatternMatcher
+
+_ListedEntry = Tuple[os.DirEntry, str, bool]
+
+# Memory-mapped files are validated a block at a time, and pages more than
+# MAP_WINDOW bytes behind the read position are dropped from the mapping
+MAP_BLOCK_SIZE = 1024 * 1024
+MAP_WINDOW = 8 * 1024 * 1024
+
+_Buffer = Union[mmap.mmap, bytes]
 
 def collect_files(
     directory: Path,
     extensions: Set[str],
     exclude_patterns: Set[str],
-    default_excludes: Set[str]
+    default_excludes: Set[str],
+    workers: int = 1
 ) -> Generator[Path, None, None]:
     """
     Collect files from directory that match the given criteria.
+
+    Excluded directories are pruned during the walk, so nothing below e.g.
+    node_modules or .git is ever listed or stat-ed. Files are yielded in
+    sorted path order.
     
     Args:
         directory: Root directory to search
         extensions: Set of file extensions to include
         exclude_patterns: Set of patterns to exclude
         default_excludes: Set of default exclusion patterns
+        workers: Number of threads listing directories
     """
-    all_excludes = exclude_patterns | default_excludes
-    
-    for path in directory.rglob("*"):
-        # Convert to relative path for consistent pattern matching
-        relative_path = str(path.relative_to(directory))
-        
-        if _should_include(path, relative_path, extensions, all_excludes):
-            yield path
+    matcher = PatternMatcher(exclude_patterns | default_excludes)
+
+    for entry, _ in scan_files(directory, extensions, matcher, workers):
+        yield Path(entry.path)
+
+def scan_files(
+    directory: Path,
+    extensions: Set[str],
+    matcher: PatternMatcher,
+    workers: int = 1
+) -> Generator[Tuple[os.DirEntry, str], None, None]:
+    """
+    Walk directory with os.scandir, yielding (entry, relative_path) pairs.
+
+    Directories are checked against the matcher before they are entered.
+    The DirEntry type information is reused, so regular files cost no
+    extra stat call on most platforms. Symlinked directories are not
+    followed.
+
+    With more than one worker, directory listings are prefetched by a thread
+    pool so per-directory syscall latency overlaps; the output order is the
+    same as for a single-threaded walk.
+
+    Args:
+        directory: Root directory to search
+        extensions: Set of file extensions to include
+        matcher: Compiled exclusion patterns
+        workers: Number of threads listing directories
+    """
+    if workers > 1:
+        yield from _scan_parallel(directory, extensions, matcher, workers)
+        return
+
+    stack = [iter(_list_dir(directory, "", extensions, matcher))]
+
+    while stack:
+        for entry, relative_path, is_dir in stack[-1]:
+            if is_dir:
+                # Descend depth-first so output stays in sorted path order
+                stack.append(iter(_list_dir(entry.path, relative_path + "/", extensions, matcher)))
+                break
+            yield entry, relative_path
+        else:
+            stack.pop()
+
+def _scan_parallel(
+    directory: Path,
+    extensions: Set[str],
+    matcher: PatternMatcher,
+    workers: int
+) -> Generator[Tuple[os.DirEntry, str], None, None]:
+    """
+    Same walk as scan_files, with directory listings done by a thread pool.
+
+    Every finished listing queues its subdirectories, up to a bounded number
+    of outstanding listings. The caller's thread walks the tree in sorted
+    depth-first order, waiting on prefetched listings and listing any
+    directory that did not fit in the queue itself.
+    """
+    max_pending = workers * 16
+    pending: Dict[str, Future] = {}
+    lock = threading.Lock()
+    closed = False
+
+    def listing(path: str, prefix: str) -> List[_ListedEntry]:
+        entries = _list_dir(path, prefix, extensions, matcher)
+        for entry, relative_path, is_dir in entries:
+            if is_dir:
+                prefetch(entry.path, relative_path + "/")
+        return entries
+
+    def prefetch(path: str, prefix: str) -> None:
+        with lock:
+            if closed or len(pending) >= max_pending:
+                return
+            pending[path] = executor.submit(listing, path, prefix)
+
+    def take(path: str, prefix: str) -> List[_ListedEntry]:
+        with lock:
+            future = pending.pop(path, None)
+        if future is None:
+            return listing(path, prefix)
+        return future.result()
+
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="weaver-scan")
+    try:
+        stack = [iter(take(str(directory), ""))]
+        while stack:
+            for entry, relative_path, is_dir in stack[-1]:
+                if is_dir:
+                    stack.append(iter(take(entry.path, relative_path + "/")))
+                    break
+                yield entry, relative_path
+            else:
+                stack.pop()
+    finally:
+        with lock:
+            closed = True
+            for future in pending.values():
+                future.cancel()
+            pending.clear()
+        executor.shutdown(wait=True)
+
+def _list_dir(
+    directory,
+    prefix: str,
+    extensions: Set[str],
+    matcher: PatternMatcher
+) -> List[_ListedEntry]:
+    """
+    List one directory as sorted (entry, relative_path, is_dir) tuples.
+
+    Excluded directories and files that should not be collected are
+    dropped; unreadable directories list as empty.
+    """
+    try:
+        with os.scandir(directory) as it:
+            entries = sorted(it, key=lambda entry: entry.name)
+    except OSError:
+        return []
+
+    listed = []
+    for entry in entries:
+        relative_path = prefix + entry.name
+        try:
+            is_dir = entry.is_dir(follow_symlinks=False)
+        except OSError:
+            continue
+
+        if is_dir:
+            if not matcher.matches_entry(relative_path, entry.name, True):
+                listed.append((entry, relative_path, True))
+        elif _should_include(entry, relative_path, extensions, matcher):
+            listed.append((entry, relative_path, False))
+    return listed
 
 def _should_include(
-    path: Path,
+    entry: os.DirEntry,
     relative_path: str,
     extensions: Set[str],
-    exclude_patterns: Set[str]
+    matcher: PatternMatcher
 ) -> bool:
     """
-    Check if a file should be included in collection.
+    Check if a non-directory walk entry should be included in collection.
     
     Args:
-        path: Path object for the file
+        entry: Directory entry for the file
         relative_path: Relative path string for pattern matching
         extensions: Allowed file extensions
-        exclude_patterns: Patterns to exclude
+        matcher: Compiled exclusion patterns
     """
-    if not path.is_file():
+    # Check file extension first (fast check, no syscall)
+    if os.path.splitext(entry.name)[1] not in extensions:
         return False
-        
-    # Check file extension first (fast check)
-    if path.suffix not in extensions:
+
+    if matcher.matches_entry(relative_path, entry.name, False):
         return False
-    
-    # Check exclusions
-    for pattern in exclude_patterns:
-        # Handle glob patterns
-        if "*" in pattern:
-            # Convert glob to regex
-            regex_pattern = pattern.replace(".", "\\.").replace("*", ".*")
-            if re.match(f"^{regex_pattern}$", relative_path):
-                return False
-        # Handle directory/path fragments
-        elif pattern in relative_path:
-            return False
-    
-    return True
+
+    try:
+        return entry.is_file()
+    except OSError:
+        return False
+
+class SourceFile(NamedTuple):
+    """A source file read in one pass. ``data`` is None if it was streamed instead."""
+    data: Optional[bytes]
+    size: int
+    lines: int
+    encoding: Optional[str]
+    digest: Optional[str] = None
+    # Set when counted while streaming, as there is no data to count later
+    tokens: Optional[int] = None
+
+def read_source(file_path: Path, digest: bool = False) -> SourceFile:
+    """
+    Read a file once as bytes and derive its size, line count and encoding.
+
+    The first bytes are sniffed before the rest is read: a binary file is
+    returned without data and with encoding 'binary'. Other files are
+    converted to UTF-8 (see ``charset.to_utf8``); ``encoding`` is the one
+    they were in, or None with no data if they cannot be decoded. Line
+    endings in ``data`` are normalized to LF. With ``digest``, a SHA-256 of
+    the normalized data is included.
+    """
+    with open(file_path, 'rb') as f:
+        head = f.read(SNIFF_SIZE)
+        encoding = sniff(head)
+        if encoding == BINARY:
+            return SourceFile(None, os.fstat(f.fileno()).st_size, 0, encoding)
+        data = head + f.read() if len(head) == SNIFF_SIZE else head
+
+    size = len(data)
+    data, encoding = to_utf8(data, encoding)
+    if data is None:
+        return SourceFile(None, size, 0, None)
+
+    data = _normalize_newlines(data)
+    content_digest = hashlib.sha256(data).hexdigest() if digest else None
+
+    return SourceFile(data, size, _count_newlines(data), encoding, content_digest)
+
+def file_record(relative_path: str, data: bytes) -> bytes:
+    """Encode one file as a collection record: a ``File:`` header, contents, blank line."""
+    return b"".join((_record_header(relative_path), data, b"\n\n"))
+
+def _record_header(relative_path: str) -> bytes:
+    return f"File: {relative_path}\n{'=' * 80}\n".encode('utf-8')
+
+def stream_source(
+    file_path: Path,
+    write_lines: Optional[Callable[[Iterable[bytes]], object]] = None,
+    relative_path: str = "",
+    digest: bool = False,
+    count_tokens: Optional[Callable[[bytes], int]] = None
+) -> SourceFile:
+    """
+    Analyse a file through a read-only memory map, optionally writing it as
+    a collection record, without reading it into memory.
+
+    One pass over the mapping, a block at a time, checks that it is valid
+    UTF-8 and counts lines, and tokens with ``count_tokens`` (summed over
+    blocks, so approximate at block edges). If it is valid and ``write_lines`` is given,
+    the record is then passed to it as an iterable of lines (the lines
+    ``file_record`` output splits into), see ``_iter_lines``. The result
+    has no ``data``. Binary files are recognized from their first bytes and
+    not scanned; files that are not UTF-8 are converted in memory by
+    ``read_source`` instead. Nothing is written for a file that is skipped.
+    """
+    with map_file(file_path) as buffer:
+        size = len(buffer)
+        encoding = sniff(buffer[:SNIFF_SIZE])
+        if encoding == BINARY:
+            return SourceFile(None, size, 0, encoding)
+        if encoding in UTF8_ENCODINGS:
+            scan = _scan_mapped(buffer, digest, count_tokens)
+        if encoding not in UTF8_ENCODINGS or scan.encoding is None:
+            # Converting from another encoding needs the whole file decoded
+            return _write_converted(file_path, write_lines, relative_path, digest, count_tokens)
+        if not scan.has_cr:
+            if write_lines is not None:
+                write_lines(_record_lines(relative_path, _iter_lines(buffer, False)))
+            return SourceFile(None, size, scan.lines, scan.encoding, scan.digest, scan.tokens)
+
+        # Line count and digest are of the normalized data, taken while streaming
+        hasher = hashlib.sha256() if digest else None
+        lines = 0
+
+        def counted() -> Generator[bytes, None, None]:
+            nonlocal lines
+            for line in _iter_lines(buffer, True):
+                lines += 1
+                if hasher:
+                    hasher.update(line)
+                yield line
+
+        if write_lines is None:
+            for _ in counted():
+                pass
+        else:
+            write_lines(_record_lines(relative_path, counted()))
+
+    return SourceFile(
+        None, size, lines, scan.encoding, hasher.hexdigest() if hasher else None, scan.tokens
+    )
+
+def _write_converted(
+    file_path: Path,
+    write_lines: Optional[Callable[[Iterable[bytes]], object]],
+    relative_path: str,
+    digest: bool,
+    count_tokens: Optional[Callable[[bytes], int]]
+) -> SourceFile:
+    source = read_source(file_path, digest)
+    if source.data is None:
+        return source
+    if write_lines is not None:
+        write_lines(file_record(relative_path, source.data).splitlines(keepends=True))
+    tokens = count_tokens(source.data) if count_tokens else None
+    return source._replace(data=None, tokens=tokens)
+
+@contextmanager
+def map_file(file_path: Path) -> Iterator[_Buffer]:
+    """
+    Map a file read-only for sequential access. Empty files, which cannot
+    be mapped, give an empty bytes object.
+    """
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b""
+            return
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if hasattr(mmap, "MADV_SEQUENTIAL"):
+                mapping.madvise(mmap.MADV_SEQUENTIAL)
+            yield mapping
+        finally:
+            try:
+                mapping.close()
+            except BufferError:
+                # Views still referenced (e.g. from a traceback); the mapping
+                # is unmapped when the last of them is released
+                pass
+
+def _drop_pages(buffer: _Buffer, start: int, end: int) -> int:
+    """
+    Unmap the pages of ``buffer[start:end]`` from this process. They stay in
+    the page cache and fault back in if touched again, so resident memory
+    stays bounded while a large mapping is scanned. Returns the new start.
+    """
+    end -= end % mmap.PAGESIZE
+    if end <= start or not isinstance(buffer, mmap.mmap) or not hasattr(mmap, "MADV_DONTNEED"):
+        return start
+    buffer.madvise(mmap.MADV_DONTNEED, start, end - start)
+    return end
+
+class _MappedScan(NamedTuple):
+    encoding: Optional[str]
+    has_cr: bool
+    # Only meaningful without CRs, when the data needs no normalizing
+    lines: int
+    digest: Optional[str]
+    tokens: Optional[int]
+
+def _scan_mapped(
+    buffer: _Buffer, digest: bool, count_tokens: Optional[Callable[[bytes], int]] = None
+) -> _MappedScan:
+    """Validate, line-count and optionally hash and token-count a mapped file a block at a time."""
+    decoder = None
+    hasher = hashlib.sha256() if digest else None
+    has_cr = False
+    newlines = 0
+    tokens = 0
+    for start in range(0, len(buffer), MAP_BLOCK_SIZE):
+        block = buffer[start:start + MAP_BLOCK_SIZE]
+        _drop_pages(buffer, start, start + len(block))
+        if decoder is not None or not block.isascii():
+            # Blocks so far were ASCII, so this one starts on a character boundary
+            decoder = decoder or codecs.getincrementaldecoder('utf-8')()
+            try:
+                decoder.decode(block)
+            except UnicodeDecodeError:
+                return _MappedScan(None, has_cr, 0, None, None)
+        has_cr = has_cr or b"\r" in block
+        newlines += block.count(b"\n")
+        if hasher:
+            hasher.update(block)
+        if count_tokens:
+            # Counted as collected, i.e. with normalized newlines
+            tokens += count_tokens(block.replace(b"\r\n", b"\n") if b"\r" in block else block)
+
+    encoding = 'ascii'
+    if decoder is not None:
+        try:
+            decoder.decode(b"", final=True)
+        except UnicodeDecodeError:
+            return _MappedScan(None, has_cr, 0, None, None)
+        encoding = 'utf-8'
+    if len(buffer) and buffer[-1] != ord("\n"):
+        newlines += 1
+    return _MappedScan(
+        encoding, has_cr, newlines, hasher.hexdigest() if hasher else None,
+        tokens if count_tokens else None
+    )
+
+def _iter_lines(buffer: _Buffer, normalize: bool) -> Generator[Union[bytes, memoryview], None, None]:
+    """
+    The lines of a mapped file, with line endings normalized to LF if
+    ``normalize`` is set.
+
+    Lines are split a block at a time, so at most one block is copied out
+    of the mapping at once; a line longer than a block is passed on as a
+    zero-copy view of the mapping unless it needs normalizing.
+    """
+    view = memoryview(buffer)
+    released = 0
+    start = 0
+    try:
+        while start < len(buffer):
+            block_end = start + MAP_BLOCK_SIZE
+            if block_end >= len(buffer):
+                end = len(buffer)
+            else:
+                end = buffer.rfind(b"\n", start, block_end) + 1
+            if end == 0:
+                # No line ends in this block: pass the long line on as a view
+                end = buffer.find(b"\n", block_end)
+                end = len(buffer) if end == -1 else end + 1
+                line = view[start:end]
+                if normalize:
+                    yield from _normalize_newlines(bytes(line)).splitlines(keepends=True)
+                else:
+                    yield line
+                del line
+            elif normalize:
+                yield from _normalize_newlines(buffer[start:end]).splitlines(keepends=True)
+            else:
+                yield from buffer[start:end].splitlines(keepends=True)
+            start = end
+            if start - released > 2 * MAP_WINDOW:
+                released = _drop_pages(buffer, released, start - MAP_WINDOW)
+    finally:
+        view.release()
+
+def _record_lines(
+    relative_path: str, lines: Iterable[Union[bytes, memoryview]]
+) -> Generator[Union[bytes, memoryview], None, None]:
+    """``file_record(relative_path, data)`` split into lines, given the lines of data."""
+    yield from _record_header(relative_path).splitlines(keepends=True)
+    last = None
+    for line in lines:
+        if last is not None:
+            yield last
+        last = line
+    if last is not None and last[-1] != ord("\n"):
+        # The record's blank-line terminator completes an unterminated last line
+        yield bytes(last) + b"\n"
+    else:
+        if last is not None:
+            yield last
+        yield b"\n"
+    yield b"\n"
+
+def read_normalized(file_path: Path, encoding: str = 'utf-8') -> bytes:
+    """
+    Read a file of known encoding as UTF-8 with line endings normalized,
+    without analysing it.
+    """
+    with open(file_path, 'rb') as f:
+        data = f.read()
+    if encoding not in UTF8_ENCODINGS:
+        data = to_utf8(data, encoding)[0] or b""
+    return _normalize_newlines(data)
+
+def _normalize_newlines(data: bytes) -> bytes:
+    if b'\r' in data:
+        data = data.replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+    return data
+
+def _count_newlines(data: bytes) -> int:
+    """Count lines the way iterating a text file does."""
+    lines = data.count(b'\n')
+    if data and not data.endswith(b'\n'):
+        lines += 1
+    return lines
 
 def count_lines(file_path: Path) -> int:
     """Count number of lines in a file."""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return sum(1 for _ in f)
+        with open(file_path, 'rb') as f:
+            return _count_newlines(f.read())
     except Exception:
         return 0
 
 def read_in_chunks(file_path: Path, chunk_size: int) -> Generator[str, None, None]:
     """Read file in chunks of specified size."""
-    with open(file_path, 'r') as f:
+    with open(file_path, 'r', encoding='utf-8') as f:
         while True:
             chunk = f.read(chunk_size)
             if not chunk:
@@ -0,0 +1,223 @@
+"""
+List a git checkout's files from its index (``.git/index``) for ``--git``.
+
+The index already holds every tracked path with its mode, size and mtime,
+so listing a repository is one file read instead of a directory walk.
+The index is parsed here directly (versions 2, 3 and 4), without running
+git. Tracked files that the repository's ignore rules match are left out
+as well.
+"""
+import os
+import struct
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+from .gitignore import GitIgnore
+from .patterns import PatternMatcher
+
+INDEX_SIGNATURE = b"DIRC"
+SUPPORTED_VERSIONS = (2, 3, 4)
+
+# ctime, mtime (seconds, nanoseconds), dev, ino, mode, uid, gid, size,
+# then the object name and the flags
+_FLAGS = struct.Struct(">H")
+_FLAG_EXTENDED = 0x4000
+_FLAG_STAGE = 0x3000
+_NAME_MASK = 0x0FFF
+_EXTENDED_SKIP_WORKTREE = 0x4000
+
+# Regular files, executable or not; symlinks, submodules and the directory
+# entries of a sparse index are not collected
+_REGULAR_FILE = 0o100000
+_OBJECT_TYPE_MASK = 0o170000
+
+
+class IndexEntry(NamedTuple):
+    """A tracked file, with its stat data as of the last time git refreshed it."""
+    path: str
+    mode: int
+    size: int
+    mtime_ns: int
+
+
+def find_repository(directory: Path) -> Optional[Tuple[Path, Path]]:
+    """
+    The (working tree root, git directory) of the checkout containing
+    ``directory``, or None. A ``.git`` file (worktrees, submodules) is
+    followed to the git directory it points at.
+    """
+    directory = directory.resolve()
+    for root in (directory, *directory.parents):
+        dot_git = root / ".git"
+        if dot_git.is_dir():
+            return root, dot_git
+        if dot_git.is_file():
+            content = dot_git.read_text(errors="replace").strip()
+            if content.startswith("gitdir:"):
+                return root, (root / content[len("gitdir:"):].strip()).resolve()
+    return None
+
+
+def _hash_size(git_dir: Path) -> int:
+    """Object name length: SHA-1, or SHA-256 for repositories created with it."""
+    for config in (git_dir / "config", git_dir / "commondir"):
+        try:
+            text = config.read_text(errors="replace")
+        except OSError:
+            continue
+        if config.name == "commondir":
+            # Worktrees keep the config in the main repository's git directory
+            return _hash_size((git_dir / text.strip()).resolve())
+        for line in text.splitlines():
+            key, _, value = line.partition("=")
+            if key.strip().lower() == "objectformat" and value.strip().lower() == "sha256":
+                return 32
+        return 20
+    return 20
+
+
+def read_index(index_path: Path, hash_size: int = 20) -> Iterator[IndexEntry]:
+    """
+    Parse the entries of an index file, in index (path) order. Only the
+    stage-0 or first stage of each path is returned, and files marked
+    skip-worktree (not checked out) are left out.
+
+    Raises ValueError for a file that is not a supported index.
+    """
+    for path, mode, size, mtime_ns in _parse_index(index_path.read_bytes(), hash_size):
+        yield IndexEntry(path.decode("utf-8", errors="surrogateescape"), mode, size, mtime_ns)
+
+
+def _parse_index(data: bytes, hash_size: int) -> Iterator[Tuple[bytes, int, int, int]]:
+    """(path, mode, size, mtime_ns) of the checked-out regular files in an index."""
+    if len(data) < 12 or data[:4] != INDEX_SIGNATURE:
+        raise ValueError("Not a git index")
+    version, count = struct.unpack_from(">II", data, 4)
+    if version not in SUPPORTED_VERSIONS:
+        raise ValueError(f"Unsupported git index version {version}")
+
+    # Everything but mtime, mode, size and flags is skipped; locals keep
+    # the per-entry loop cheap on repositories with 100k+ files
+    header = struct.Struct(f">8x2I8xI8xI{hash_size}xH")
+    unpack = header.unpack_from
+    header_size = header.size
+    find = data.index
+    offset = 12
+    previous = b""
+    for _ in range(count):
+        mtime, mtime_nsec, mode, size, flags = unpack(data, offset)
+        path_offset = offset + header_size
+        extended = 0
+        if flags & _FLAG_EXTENDED:
+            (extended,) = _FLAGS.unpack_from(data, path_offset)
+            path_offset += 2
+
+        if version == 4:
+            # Prefix-compressed: drop N bytes of the previous path, append the rest
+            strip, path_offset = _read_varint(data, path_offset)
+            end = find(b"\0", path_offset)
+            path = previous[:len(previous) - strip] + data[path_offset:end]
+            offset = end + 1
+        else:
+            length = flags & _NAME_MASK
+            end = path_offset + length if length < _NAME_MASK else find(b"\0", path_offset)
+            path = data[path_offset:end]
+            # Entries are NUL-padded to a multiple of 8 bytes
+            offset += (end - offset + 8) & ~7
+
+        if path == previous and flags & _FLAG_STAGE:
+            # Later stages of a conflicted path
+            continue
+        previous = path
+        if (mode & _OBJECT_TYPE_MASK) != _REGULAR_FILE or extended & _EXTENDED_SKIP_WORKTREE:
+            continue
+        yield path, mode, size, mtime * 1_000_000_000 + mtime_nsec
+
+
+def _read_varint(data: bytes, offset: int) -> Tuple[int, int]:
+    """Decode an offset-varint as git writes it; returns (value, next offset)."""
+    byte = data[offset]
+    offset += 1
+    value = byte & 0x7F
+    while byte & 0x80:
+        byte = data[offset]
+        offset += 1
+        value = ((value + 1) << 7) | (byte & 0x7F)
+    return value, offset
+
+
+def _ignore_rules(root: Path, git_dir: Path, ignore_files: List[str]) -> GitIgnore:
+    """Ignore rules of info/exclude and the given tracked .gitignore files."""
+    sources: Dict[str, List[str]] = {}
+    try:
+        sources[""] = (git_dir / "info" / "exclude").read_text(errors="replace").splitlines()
+    except OSError:
+        pass
+    for path in ignore_files:
+        try:
+            lines = (root / path).read_text(errors="replace").splitlines()
+        except OSError:
+            continue
+        directory = path.rpartition("/")[0]
+        sources[directory] = sources.get(directory, []) + lines
+    return GitIgnore(sources)
+
+
+class TrackedFiles(NamedTuple):
+    files: List[Path]
+    # (size, mtime_ns) of each file, as of the last time git refreshed it
+    stats: List[Tuple[int, int]]
+
+
+def list_tracked_files(
+    directory: Path,
+    extensions: Set[str],
+    matcher: PatternMatcher
+) -> Optional[TrackedFiles]:
+    """
+    Tracked files under ``directory`` that would be collected, in the same
+    order as a directory walk. Returns None if ``directory`` is not in a
+    git checkout.
+
+    Files are filtered like the walk does (extension, exclusion patterns
+    relative to ``directory``) and by the repository's ignore rules.
+    """
+    repository = find_repository(directory)
+    if repository is None:
+        return None
+    root, git_dir = repository
+    prefix = directory.resolve().relative_to(root).as_posix()
+    prefix = "" if prefix == "." else prefix + "/"
+
+    # Paths are filtered as bytes first. Candidates are kept as strings and
+    # tuples of ints, which the garbage collector stops tracking, until the
+    # Path objects are made at the end
+    suffixes = tuple(extension.encode() for extension in extensions if extension)
+    candidates = []
+    ignore_files = []
+    data = (git_dir / "index").read_bytes()
+    for raw_path, _, size, mtime_ns in _parse_index(data, _hash_size(git_dir)):
+        if raw_path.endswith(b".gitignore"):
+            path = raw_path.decode("utf-8", errors="surrogateescape")
+            if path.rpartition("/")[2] == ".gitignore":
+                ignore_files.append(path)
+        if not raw_path.endswith(suffixes):
+            continue
+        path = raw_path.decode("utf-8", errors="surrogateescape")
+        if not path.startswith(prefix):
+            continue
+        relative_path = path[len(prefix):]
+        if os.path.splitext(relative_path)[1] in extensions and not matcher.matches(relative_path):
+            candidates.append((path, (size, mtime_ns)))
+
+    ignore = _ignore_rules(root, git_dir, ignore_files)
+    candidates = [candidate for candidate in candidates if not ignore.ignored(candidate[0])]
+    # The index is in byte order ("a.py" before "a/b.py"); a walk lists
+    # each directory's entries by name, so "a/" comes before "a.py", which
+    # is the order with "/" sorting before every other character
+    candidates.sort(key=lambda candidate: candidate[0].replace("/", "\0"))
+    start = len(prefix)
+    return TrackedFiles(
+        [directory / path[start:] for path, _ in candidates],
+        [stat for _, stat in candidates]
+    )
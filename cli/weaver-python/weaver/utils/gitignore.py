@@ -0,0 +1,177 @@
+"""
+.gitignore rules, matched the way git matches them.
+
+Rules come from ``.git/info/exclude`` and from ``.gitignore`` files at any
+depth; a rule in a deeper file, or later in the same file, overrides
+earlier ones, and a ``!`` rule re-includes what an earlier one ignored.
+Nothing inside an ignored directory can be re-included.
+
+Every directory whose rule set differs gets one compiled regex of all the
+rules in effect there, highest precedence first, so a path is checked with
+a single match; the capturing group that matched tells which rule won.
+"""
+import re
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+
+class _Rule(NamedTuple):
+    regex: str
+    negate: bool
+    dir_only: bool
+
+
+def parse_rules(lines: Iterable[str], base: str = "") -> List[_Rule]:
+    """
+    Parse the lines of a .gitignore file in directory ``base`` (relative to
+    the repository root, '' for the root itself).
+    """
+    prefix = re.escape(base + "/") if base else ""
+    rules = []
+    for line in lines:
+        line = line.rstrip("\n").rstrip("\r")
+        if not line or line.startswith("#"):
+            continue
+        # Trailing spaces are dropped unless escaped with a backslash
+        stripped = line.rstrip(" ")
+        if stripped.endswith("\\") and len(stripped) < len(line):
+            stripped += " "
+        line = stripped
+        negate = line.startswith("!")
+        if negate:
+            line = line[1:]
+        elif line.startswith("\\"):
+            line = line[1:] if line[1:2] in ("#", "!") else line
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            continue
+        # A slash anywhere but at the end anchors the pattern to ``base``
+        anchored = "/" in line
+        line = line.lstrip("/")
+        body = _wildmatch_to_regex(line)
+        rules.append(_Rule(prefix + ("" if anchored else "(?:.*/)?") + body, negate, dir_only))
+    return rules
+
+
+def _wildmatch_to_regex(pattern: str) -> str:
+    parts = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if pattern.startswith("**", i):
+            end = i + 2
+            while end < len(pattern) and pattern[end] == "*":
+                end += 1
+            leading = i == 0 or pattern[i - 1] == "/"
+            if leading and pattern.startswith("/", end):
+                # "**/": any number of leading directories, including none
+                parts.append("(?:.*/)?")
+                i = end + 1
+                continue
+            if leading and end == len(pattern):
+                # "/**": everything inside
+                parts.append(".*")
+                i = end
+                continue
+            # Any other run of asterisks is a plain "*"
+            parts.append("[^/]*")
+            i = end
+        elif char == "*":
+            parts.append("[^/]*")
+            i += 1
+        elif char == "?":
+            parts.append("[^/]")
+            i += 1
+        elif char == "[":
+            end = pattern.find("]", i + 2)
+            if end < 0:
+                parts.append(r"\[")
+                i += 1
+                continue
+            body = pattern[i + 1:end]
+            if body[0] in "!^":
+                body = "^" + body[1:]
+            parts.append("[" + body.replace("\\", "\\\\") + "]")
+            i = end + 1
+        elif char == "\\" and i + 1 < len(pattern):
+            parts.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            parts.append(re.escape(char))
+            i += 1
+    return "".join(parts)
+
+
+class _CompiledRules(NamedTuple):
+    # Highest precedence first; group N (from 1) is rules[N - 1]
+    rules: Tuple[_Rule, ...]
+    files: Optional["re.Pattern[str]"]
+    dirs: Optional["re.Pattern[str]"]
+
+
+def _compile(rules: Tuple[_Rule, ...]) -> _CompiledRules:
+    def combine(dir_check: bool) -> Optional["re.Pattern[str]"]:
+        # Directory-only rules never match a file, but keep their group number
+        alternatives = [
+            f"({rule.regex})" if dir_check or not rule.dir_only else "((?!))"
+            for rule in rules
+        ]
+        if not alternatives:
+            return None
+        return re.compile("(?:" + "|".join(alternatives) + r")\Z", re.DOTALL)
+
+    return _CompiledRules(rules, combine(False), combine(True))
+
+
+class GitIgnore:
+    """
+    Decide whether repository-relative paths (forward slashes) are ignored.
+
+    ``sources`` maps the directory of each ignore file ('' for the root) to
+    its lines; ``.git/info/exclude`` belongs to the root, before the root
+    .gitignore.
+    """
+
+    def __init__(self, sources: Dict[str, List[str]]):
+        self._rules: Dict[str, Tuple[_Rule, ...]] = {
+            base: tuple(parse_rules(lines, base)) for base, lines in sources.items()
+        }
+        self._compiled: Dict[str, _CompiledRules] = {}
+        self._ignored_dirs: Dict[str, bool] = {"": False}
+
+    def ignored(self, path: str, is_dir: bool = False) -> bool:
+        parent = path.rpartition("/")[0]
+        if self._ignored_dir(parent):
+            return True
+        return self._match(parent, path, is_dir)
+
+    def _ignored_dir(self, directory: str) -> bool:
+        ignored = self._ignored_dirs.get(directory)
+        if ignored is None:
+            parent = directory.rpartition("/")[0]
+            ignored = self._ignored_dir(parent) or self._match(parent, directory, True)
+            self._ignored_dirs[directory] = ignored
+        return ignored
+
+    def _match(self, directory: str, path: str, is_dir: bool) -> bool:
+        compiled = self._rules_for(directory)
+        regex = compiled.dirs if is_dir else compiled.files
+        match = regex.match(path) if regex else None
+        return bool(match) and not compiled.rules[match.lastindex - 1].negate
+
+    def _rules_for(self, directory: str) -> _CompiledRules:
+        compiled = self._compiled.get(directory)
+        if compiled is None:
+            own = self._rules.get(directory)
+            if directory:
+                inherited = self._rules_for(directory.rpartition("/")[0])
+            else:
+                inherited = None
+            if inherited is not None and not own:
+                # Directories without an ignore file share their parent's regex
+                compiled = inherited
+            else:
+                rules = tuple(reversed(own or ())) + (inherited.rules if inherited else ())
+                compiled = _compile(rules)
+            self._compiled[directory] = compiled
+        return compiled
@@ -1,16 +1,686 @@
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Deque, Dict, Generator, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple, Union
+
 import requests
+from requests.adapters import HTTPAdapter
 from rich.console import Console
-from typing import Dict, Any
+from .async_http import AsyncHTTPClient, TransportError
+from .compression import available_encodings, compress, negotiate
+
+# (connect, read) timeouts in seconds
+DEFAULT_TIMEOUT = (10, 120)
+
+# Status codes worth retrying: the server may accept the same chunk later
+RETRY_STATUS_CODES = {408, 425, 429, 500, 502, 503, 504}
+
+# Answer to a by-digest chunk whose content the server no longer has
+UNKNOWN_DIGEST_STATUS = 409
+
+# Answers of backends without the batched collection routes
+NO_BATCH_STATUS_CODES = {404, 405}
+
+# Answer of backends that predate compression to a compressed chunk: they
+# only parse JSON, so the chunk arrives without content and the insert
+# fails. Backends that decode chunks send Accept-Encoding with every answer.
+UNDECODED_STATUS = 500
 
-def send_chunk(chunk: str, endpoint: str) -> bool:
+# Failures of a send worth retrying, from either transport
+TRANSIENT_ERRORS = (requests.ConnectionError, requests.Timeout, TransportError)
+
+Chunk = Union[bytes, str]
+
+def send_chunk(chunk: str, endpoint: str, timeout=DEFAULT_TIMEOUT) -> bool:
     try:
         response = requests.post(
             endpoint,
             json={"content": chunk},
-            headers={"Content-Type": "application/json"}
+            headers={"Content-Type": "application/json"},
+            timeout=timeout
         )
         response.raise_for_status()
         return True
     except Exception as e:
         Console().print(f"[red]Error sending chunk: {e}[/red]")
-        return False
\ No newline at end of file
+        return False
+
+
+def _print_error(message: str) -> None:
+    Console().print(f"[red]{message}[/red]")
+
+
+class ChunkStats(NamedTuple):
+    """Transfer statistics for one uploaded chunk."""
+    seq: int
+    # Bytes sent before compression: the content, or the reference to it
+    raw_bytes: int
+    wire_bytes: int
+    encoding: Optional[str]
+    cpu_seconds: float
+    # Wall time and attempts of the whole send, retries and backoff included
+    seconds: float = 0.0
+    attempts: int = 1
+
+
+class _Post(NamedTuple):
+    url: str
+    body: bytes
+    headers: Dict[str, str]
+
+
+class _Sleep(NamedTuple):
+    seconds: float
+
+
+class _Call(NamedTuple):
+    """CPU work (hashing, encoding) an async sender runs off the event loop."""
+    func: Callable
+    args: tuple
+
+
+class _Response(NamedTuple):
+    status: int
+    accept_encoding: str
+    body: bytes
+
+
+# A send, batch or completion written once as the steps it takes. Each
+# _Post is answered with a _Response or the exception it raised, each
+# _Call with its result. ChunkSender runs the steps over its session and
+# AsyncChunkSender on the event loop, so both treat answers the same way.
+Steps = Generator[Union[_Post, _Sleep, _Call], object, bool]
+
+
+class ChunkSender:
+    """
+    Send chunks over a pooled keep-alive session.
+
+    Up to ``concurrency`` chunks are in flight at once. Each chunk carries its
+    sequence number, so a chunk that failed with a connection error, timeout
+    or retryable status can be sent again safely; retries back off
+    exponentially from ``backoff`` seconds.
+
+    With an ``encoding`` (gzip or zstd) chunks are sent as compressed UTF-8
+    text with a matching Content-Encoding and the sequence number in the
+    X-Chunk-Seq header. If the server answers 415, the sender switches to an
+    encoding from the server's Accept-Encoding header, or to plain JSON.
+    A 500 without an Accept-Encoding header comes from a backend that
+    predates compression; until a compressed chunk has been accepted it
+    also switches to plain JSON. Other 500s are retried.
+
+    Every chunk carries the SHA-256 of its UTF-8 bytes. Chunks whose digest
+    is in ``known`` (digests the server already stores) are sent as a bare
+    reference; if the server answers 409 the full chunk is sent instead.
+
+    With a ``collection_id`` every chunk names the collection it belongs
+    to, and the server stores each (collection, seq) once, so a chunk sent
+    again after a lost response, or by ``weaver resume``, is not duplicated.
+    ``on_sent`` is called with the seq of every chunk the server accepted.
+
+    With a ``collection_id`` and ``batch_bytes`` the chunks are posted in
+    batches of about that many bytes to ``collections_url`` (the backend's
+    ``/api/collections``), where they are staged until `complete` asks the
+    server to join them into one collection. A backend without those routes
+    gets each chunk on its own, as without batching.
+
+    Chunks that fail for good are reported through ``on_error`` (printed to
+    the console by default).
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        concurrency: int = 1,
+        max_retries: int = 3,
+        backoff: float = 0.5,
+        timeout: Union[float, Tuple[float, float]] = DEFAULT_TIMEOUT,
+        encoding: Optional[str] = None,
+        on_error: Optional[Callable[[str], None]] = None,
+        collection_id: Optional[str] = None,
+        on_sent: Optional[Callable[[int], None]] = None,
+        collections_url: Optional[str] = None,
+        batch_bytes: int = 0
+    ):
+        self.endpoint = endpoint
+        self.on_error = on_error or _print_error
+        self.collection_id = collection_id
+        self.on_sent = on_sent
+        self.collections_url = collections_url.rstrip("/") if collections_url else None
+        self.batch_bytes = batch_bytes
+        self.batching = bool(collection_id and collections_url and batch_bytes > 0)
+        self.batches_sent = 0
+        self.encoding = encoding
+        self.encoding_confirmed = False
+        self.concurrency = max(1, concurrency)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.retries = 0
+        self.chunks_sent = 0
+        self.bytes_sent = 0
+        self.wire_bytes_sent = 0
+        self.chunks_reused = 0
+        self.known: Set[str] = set()
+        self.chunk_stats: List[ChunkStats] = []
+        self._lock = threading.Lock()
+
+        self.session = self._create_session()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _create_session(self) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.concurrency)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def __enter__(self) -> "ChunkSender":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._executor:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        if self.session is not None:
+            self.session.close()
+
+    @property
+    def compression_ratio(self) -> float:
+        """Raw bytes per byte on the wire over all chunks sent so far."""
+        return self.bytes_sent / self.wire_bytes_sent if self.wire_bytes_sent else 1.0
+
+    def send(self, chunk: Chunk, seq: int) -> bool:
+        """Send one chunk, retrying transient failures. Returns True on success."""
+        return self._run(self._send_steps(chunk, seq))
+
+    def _run(self, steps: Steps) -> bool:
+        """Run an operation's steps on this thread, over the session."""
+        reply: object = None
+        while True:
+            try:
+                step = steps.send(reply)
+            except StopIteration as done:
+                return done.value
+            if isinstance(step, _Post):
+                try:
+                    response = self.session.post(
+                        step.url, data=step.body, headers=step.headers, timeout=self.timeout
+                    )
+                    reply = _Response(
+                        response.status_code,
+                        response.headers.get("Accept-Encoding", ""),
+                        response.content
+                    )
+                except Exception as e:
+                    reply = e
+            elif isinstance(step, _Sleep):
+                time.sleep(step.seconds)
+                reply = None
+            else:
+                reply = step.func(*step.args)
+
+    def _send_steps(self, chunk: Chunk, seq: int) -> Steps:
+        """Steps of `send`."""
+        attempt = 0
+        encoded = None
+        start = time.perf_counter()
+        data = chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+        digest = yield _Call(_sha256, (data,))
+        by_reference = digest in self.known
+
+        while True:
+            encoding = None if by_reference else self.encoding
+            if encoded is None or encoded[0] != (encoding, by_reference):
+                encoded = (
+                    (encoding, by_reference),
+                    *(yield _Call(self._encode, (data, digest, seq, encoding, by_reference)))
+                )
+            _, body, headers, stats = encoded
+
+            reply = yield _Post(self.endpoint, body, headers)
+            if isinstance(reply, _Response):
+                if reply.status == 415 and encoding:
+                    self._downgrade(encoding, reply.accept_encoding)
+                    continue
+                if (
+                    reply.status == UNDECODED_STATUS and encoding
+                    and not reply.accept_encoding and self._drop_unconfirmed(encoding)
+                ):
+                    continue
+                if reply.status == UNKNOWN_DIGEST_STATUS and by_reference:
+                    by_reference = False
+                    continue
+                if reply.status not in RETRY_STATUS_CODES:
+                    if reply.status >= 400:
+                        self.on_error(
+                            f"Error sending chunk {seq}: {_status_error(reply.status, self.endpoint)}"
+                        )
+                        return False
+                    self._record(stats, by_reference, start, attempt + 1)
+                    return True
+                error: object = _status_error(reply.status, self.endpoint)
+            elif isinstance(reply, TRANSIENT_ERRORS):
+                error = reply
+            else:
+                self.on_error(f"Error sending chunk {seq}: {reply}")
+                return False
+
+            if not (yield from self._backoff(attempt, error, f"sending chunk {seq}")):
+                return False
+            attempt += 1
+
+    def _backoff(self, attempt: int, error: object, action: str) -> Steps:
+        """
+        Steps waiting before attempt ``attempt + 1``. Returns False, after
+        reporting ``error``, once the retries are used up.
+        """
+        if attempt >= self.max_retries:
+            self.on_error(f"Error {action} after {attempt + 1} attempts: {error}")
+            return False
+        yield _Sleep(self.backoff * (2 ** attempt))
+        with self._lock:
+            self.retries += 1
+        return True
+
+    def _record(self, stats: ChunkStats, by_reference: bool, start: float, attempts: int) -> None:
+        with self._lock:
+            self.encoding_confirmed = self.encoding_confirmed or stats.encoding is not None
+            self.chunks_sent += 1
+            self.chunks_reused += by_reference
+            self.bytes_sent += stats.raw_bytes
+            self.wire_bytes_sent += stats.wire_bytes
+            self.chunk_stats.append(stats._replace(
+                seconds=time.perf_counter() - start, attempts=attempts
+            ))
+        if self.on_sent:
+            self.on_sent(stats.seq)
+
+    def _encode(
+        self, data: bytes, digest: str, seq: int, encoding: Optional[str], by_reference: bool
+    ) -> Tuple[bytes, Dict[str, str], ChunkStats]:
+        start = time.thread_time()
+        if by_reference:
+            payload = {"digest": digest, "seq": seq}
+            if self.collection_id:
+                payload["collection"] = self.collection_id
+            body = json.dumps(payload).encode("utf-8")
+            headers = {"Content-Type": "application/json"}
+        elif encoding:
+            body = compress(data, encoding)
+            headers = {
+                "Content-Type": "text/plain; charset=utf-8",
+                "Content-Encoding": encoding,
+                "X-Chunk-Seq": str(seq),
+                "X-Chunk-Digest": digest,
+            }
+            if self.collection_id:
+                headers["X-Collection-Id"] = self.collection_id
+        else:
+            payload = {"content": data.decode("utf-8"), "seq": seq, "digest": digest}
+            if self.collection_id:
+                payload["collection"] = self.collection_id
+            body = json.dumps(payload).encode("utf-8")
+            headers = {"Content-Type": "application/json"}
+        # A chunk sent by reference sends the reference, not its content
+        raw_bytes = len(body) if by_reference else len(data)
+        stats = ChunkStats(seq, raw_bytes, len(body), encoding, time.thread_time() - start)
+        return body, headers, stats
+
+    def _encode_batch(
+        self, batch: List[Tuple[int, bytes, str]], encoding: Optional[str], references: Set[str]
+    ) -> Tuple[bytes, Dict[str, str], List[ChunkStats]]:
+        """
+        Encode (seq, data, digest) chunks as one JSON batch; chunks whose
+        digest is in ``references`` are sent as the bare digest.
+        """
+        start = time.thread_time()
+        chunks = []
+        for seq, data, digest in batch:
+            chunk = {"seq": seq, "digest": digest}
+            if digest not in references:
+                chunk["content"] = data.decode("utf-8")
+            chunks.append(chunk)
+        body = json.dumps({"chunks": chunks}).encode("utf-8")
+        headers = {"Content-Type": "application/json"}
+        if encoding:
+            body = compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+        # The batch's wire bytes and CPU time are shared out by the bytes
+        # each chunk sent: its content, or just the digest for a reference
+        cpu_seconds = time.thread_time() - start
+        sizes = [
+            len(digest) if digest in references else len(data) for _, data, digest in batch
+        ]
+        total = sum(sizes) or 1
+        stats = [
+            ChunkStats(
+                seq, size, len(body) * size // total, encoding, cpu_seconds * size / total
+            )
+            for (seq, _, _), size in zip(batch, sizes)
+        ]
+        return body, headers, stats
+
+    def _batch_url(self) -> str:
+        return f"{self.collections_url}/{self.collection_id}/chunks"
+
+    def _batch_outcome(
+        self, status: int, accept_encoding: str, body: bytes, encoding: Optional[str],
+        references: Set[str]
+    ) -> str:
+        """
+        What to do after a batch got ``status``: "sent", "retry", "fallback"
+        (the server has no batch route), "resend" (with the encoding or
+        references adjusted) or "failed".
+        """
+        if status in NO_BATCH_STATUS_CODES:
+            self.batching = False
+            return "fallback"
+        if status == 415 and encoding:
+            self._downgrade(encoding, accept_encoding)
+            return "resend"
+        if status == UNKNOWN_DIGEST_STATUS and references:
+            try:
+                missing = set(json.loads(body)["missing"])
+            except (ValueError, KeyError, TypeError):
+                missing = set(references)
+            references.difference_update(missing or references)
+            return "resend"
+        if status in RETRY_STATUS_CODES:
+            return "retry"
+        return "failed" if status >= 400 else "sent"
+
+    def _record_batch(
+        self, stats: List[ChunkStats], references: Set[str], digests: List[str],
+        start: float, attempts: int
+    ) -> None:
+        with self._lock:
+            self.batches_sent += 1
+        for chunk_stats, digest in zip(stats, digests):
+            self._record(chunk_stats, digest in references, start, attempts)
+
+    def send_batch(self, chunks: List[Tuple[int, Chunk]]) -> bool:
+        """Send (seq, chunk) pairs in one request, retrying transient failures."""
+        return self._run(self._batch_steps(chunks))
+
+    def _batch_steps(self, chunks: List[Tuple[int, Chunk]]) -> Steps:
+        """Steps of `send_batch`."""
+        if not self.batching:
+            return (yield from self._send_each_steps(chunks))
+
+        attempt = 0
+        encoded = None
+        start = time.perf_counter()
+        url = self._batch_url()
+        batch = []
+        for seq, chunk in chunks:
+            data = chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+            batch.append((seq, data, (yield _Call(_sha256, (data,)))))
+        references = {digest for _, _, digest in batch if digest in self.known}
+
+        while True:
+            encoding = self.encoding
+            if encoded is None or encoded[0] != (encoding, len(references)):
+                encoded = (
+                    (encoding, len(references)),
+                    *(yield _Call(self._encode_batch, (batch, encoding, references)))
+                )
+            _, body, headers, stats = encoded
+
+            reply = yield _Post(url, body, headers)
+            if isinstance(reply, _Response):
+                outcome = self._batch_outcome(
+                    reply.status, reply.accept_encoding, reply.body, encoding, references
+                )
+                if outcome == "fallback":
+                    return (yield from self._send_each_steps(chunks))
+                if outcome == "resend":
+                    continue
+                if outcome == "failed":
+                    self.on_error(
+                        f"Error sending chunks {_seq_range(batch)}: "
+                        f"{_status_error(reply.status, url)}"
+                    )
+                    return False
+                if outcome == "sent":
+                    self._record_batch(
+                        stats, references, [digest for _, _, digest in batch],
+                        start, attempt + 1
+                    )
+                    return True
+                error: object = _status_error(reply.status, url)
+            elif isinstance(reply, TRANSIENT_ERRORS):
+                error = reply
+            else:
+                self.on_error(f"Error sending chunks {_seq_range(batch)}: {reply}")
+                return False
+
+            if not (yield from self._backoff(attempt, error, f"sending chunks {_seq_range(batch)}")):
+                return False
+            attempt += 1
+
+    def _send_each_steps(self, chunks: List[Tuple[int, Chunk]]) -> Steps:
+        """Steps sending each chunk on its own, stopping at the first failure."""
+        for seq, chunk in chunks:
+            if not (yield from self._send_steps(chunk, seq)):
+                return False
+        return True
+
+    def _complete_outcome(self, status: int, body: bytes) -> Optional[bool]:
+        """True once the collection is assembled, False if it cannot be, None to retry."""
+        if status < 400:
+            return True
+        if status in RETRY_STATUS_CODES:
+            return None
+        if status == 409:
+            try:
+                missing = json.loads(body)["missing"]
+            except (ValueError, KeyError, TypeError):
+                missing = []
+            self.on_error(
+                f"Server is missing {len(missing):,} chunks of collection "
+                f"{self.collection_id}: {_seq_list(missing)}"
+            )
+        else:
+            self.on_error(f"Error completing collection {self.collection_id}: {status}")
+        return False
+
+    def complete(self, chunks: int) -> bool:
+        """
+        Ask the server to join the ``chunks`` batched chunks into the
+        collection. Does nothing unless the chunks were batched.
+        """
+        return self._run(self._complete_steps(chunks))
+
+    def _complete_steps(self, chunks: int) -> Steps:
+        """Steps of `complete`."""
+        if not self.batching:
+            return True
+        url = f"{self.collections_url}/{self.collection_id}/complete"
+        body = json.dumps({"chunks": chunks}).encode("utf-8")
+        attempt = 0
+        while True:
+            reply = yield _Post(url, body, {"Content-Type": "application/json"})
+            if isinstance(reply, _Response):
+                outcome = self._complete_outcome(reply.status, reply.body)
+                if outcome is not None:
+                    return outcome
+                error: object = _status_error(reply.status, url)
+            elif isinstance(reply, TRANSIENT_ERRORS):
+                error = reply
+            else:
+                self.on_error(f"Error completing collection {self.collection_id}: {reply}")
+                return False
+
+            action = f"completing collection {self.collection_id}"
+            if not (yield from self._backoff(attempt, error, action)):
+                return False
+            attempt += 1
+
+    def _downgrade(self, rejected: str, accepted: str) -> None:
+        """Switch away from an encoding the server rejected."""
+        preferred = [e for e in available_encodings() if e != rejected]
+        with self._lock:
+            if self.encoding == rejected:
+                self.encoding = negotiate(accepted, preferred)
+
+    def _drop_unconfirmed(self, rejected: str) -> bool:
+        """
+        Switch to plain JSON after a backend without compression failed a
+        compressed chunk, unless the server has already accepted one.
+        Returns True if the chunk should be sent again uncompressed.
+        """
+        with self._lock:
+            if self.encoding_confirmed:
+                return False
+            if self.encoding == rejected:
+                self.encoding = None
+            return True
+
+    def submit(self, chunk: Chunk, seq: int) -> "Future[bool]":
+        """Send one chunk on the sender's thread pool."""
+        return self._submit(self.send, chunk, seq)
+
+    def _submit(self, send: Callable[..., bool], *args) -> "Future[bool]":
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.concurrency, thread_name_prefix="weaver-send"
+            )
+        return self._executor.submit(send, *args)
+
+    def send_all(self, chunks: Iterable[Chunk], start_seq: int = 0) -> bool:
+        """
+        Send chunks in order with at most ``concurrency`` in flight.
+
+        Stops taking new chunks after the first chunk that fails for good,
+        and returns False in that case.
+        """
+        return self.send_numbered(enumerate(chunks, start_seq))
+
+    def send_numbered(self, chunks: Iterable[Tuple[int, Chunk]]) -> bool:
+        """send_all for (seq, chunk) pairs, e.g. the chunks left to resend."""
+        if self.batching:
+            calls = ((self.send_batch, batch) for batch in self._batches(chunks))
+        else:
+            calls = ((self.send, chunk, seq) for seq, chunk in chunks)
+
+        if self.concurrency == 1:
+            return all(send(*args) for send, *args in calls)
+
+        in_flight: Deque[Future] = deque()
+        ok = True
+        for send, *args in calls:
+            if len(in_flight) >= self.concurrency and not in_flight.popleft().result():
+                ok = False
+                break
+            in_flight.append(self._submit(send, *args))
+
+        for future in in_flight:
+            ok = future.result() and ok
+        return ok
+
+    def _batches(
+        self, chunks: Iterable[Tuple[int, Chunk]]
+    ) -> Iterator[List[Tuple[int, Chunk]]]:
+        """Group (seq, chunk) pairs into batches of at least ``batch_bytes`` (the last may be smaller)."""
+        batch: List[Tuple[int, Chunk]] = []
+        size = 0
+        for seq, chunk in chunks:
+            batch.append((seq, chunk))
+            size += len(chunk)
+            if size >= self.batch_bytes:
+                yield batch
+                batch, size = [], 0
+        if batch:
+            yield batch
+
+
+class AsyncChunkSender(ChunkSender):
+    """
+    ChunkSender for code running on an asyncio event loop.
+
+    `send_async`, `send_batch_async` and `complete_async` take the same
+    steps as `send`, `send_batch` and `complete` but post over an
+    AsyncHTTPClient, so up to ``concurrency`` sends share its keep-alive
+    connections without a thread each. Hashing and compression run on the
+    loop's default executor. Close it with `aclose` or ``async with``.
+    """
+
+    def __init__(self, endpoint: str, **kwargs):
+        super().__init__(endpoint, **kwargs)
+        self.client = AsyncHTTPClient(self.concurrency, self.timeout)
+
+    def _create_session(self) -> None:
+        return None
+
+    async def __aenter__(self) -> "AsyncChunkSender":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        self.close()
+        await self.client.close()
+
+    async def send_async(self, chunk: Chunk, seq: int) -> bool:
+        """`send` on the event loop."""
+        return await self._run_async(self._send_steps(chunk, seq))
+
+    async def send_batch_async(self, chunks: List[Tuple[int, Chunk]]) -> bool:
+        """`send_batch` on the event loop."""
+        return await self._run_async(self._batch_steps(chunks))
+
+    async def complete_async(self, chunks: int) -> bool:
+        """`complete` on the event loop."""
+        return await self._run_async(self._complete_steps(chunks))
+
+    async def _run_async(self, steps: Steps) -> bool:
+        """Run an operation's steps on the event loop, over the client."""
+        loop = asyncio.get_running_loop()
+        reply: object = None
+        while True:
+            try:
+                step = steps.send(reply)
+            except StopIteration as done:
+                return done.value
+            if isinstance(step, _Post):
+                try:
+                    response = await self.client.post(step.url, step.body, step.headers)
+                    reply = _Response(
+                        response.status,
+                        response.headers.get("accept-encoding", ""),
+                        response.body
+                    )
+                except Exception as e:
+                    reply = e
+            elif isinstance(step, _Sleep):
+                await asyncio.sleep(step.seconds)
+                reply = None
+            else:
+                reply = await loop.run_in_executor(None, step.func, *step.args)
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _status_error(status: int, url: str) -> str:
+    kind = "Client" if status < 500 else "Server"
+    return f"{status} {kind} Error for url: {url}"
+
+
+def _seq_range(batch: List[tuple]) -> str:
+    return f"{batch[0][0]}-{batch[-1][0]}" if len(batch) > 1 else str(batch[0][0])
+
+
+def _seq_list(seqs: List[int], limit: int = 10) -> str:
+    shown = ", ".join(str(seq) for seq in seqs[:limit])
+    return shown + (f" and {len(seqs) - limit:,} more" if len(seqs) > limit else "")
@@ -1,8 +1,10 @@
-import re
 """
 Default exclusion patterns for the Code Collector.
 Organized by category for better maintenance and configuration.
 """
+import os
+import re
+from typing import Dict, Iterable, Optional, Set, Tuple
 
 VERSION_CONTROL_PATTERNS = {
     '.git', '.svn', '.hg',
@@ -208,4 +210,123 @@ def should_exclude(path: str, custom_patterns: set = None) -> bool:
         elif pattern in path_str:
             return True
     
-    return False
\ No newline at end of file
+    return False
+
+
+class PatternMatcher:
+    """
+    Exclusion matcher compiled once from a set of patterns.
+
+    Patterns are split by shape so that each path component is checked with
+    a handful of set lookups instead of one regex per pattern:
+
+    - plain names (``node_modules``, ``package-lock.json``) match any path
+      component with that exact name
+    - names with a trailing slash (``tests/``) match directory components only
+    - ``*.ext``-style globs become a suffix table, ``NAME*`` globs a prefix table
+    - every other glob is folded into one compiled regex, matched against the
+      component name, or against the whole relative path if it contains a slash
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        self.patterns: Set[str] = set(patterns)
+        self.names: Set[str] = set()
+        self.dir_names: Set[str] = set()
+        suffixes = set()
+        prefixes = set()
+        name_globs = []
+        dir_globs = []
+        path_globs = []
+
+        for pattern in self.patterns:
+            is_dir = pattern.endswith("/")
+            body = pattern.rstrip("/")
+            if not body:
+                continue
+
+            if "/" in body:
+                path_globs.append(_glob_to_regex(body))
+            elif "*" not in body:
+                (self.dir_names if is_dir else self.names).add(body)
+            elif is_dir:
+                dir_globs.append(_glob_to_regex(body))
+            elif body.count("*") == 1 and body.startswith("*"):
+                suffixes.add(body[1:])
+            elif body.count("*") == 1 and body.endswith("*"):
+                prefixes.add(body[:-1])
+            else:
+                name_globs.append(_glob_to_regex(body))
+
+        # str.endswith/startswith scan a tuple in C, one call per name
+        self._suffixes: Tuple[str, ...] = tuple(sorted(suffixes))
+        self._prefixes: Tuple[str, ...] = tuple(sorted(prefixes))
+        self._name_regex = _combine(name_globs, r"\Z")
+        self._dir_regex = _combine(dir_globs, r"\Z")
+        # Path patterns also exclude everything below a matching directory
+        self._path_regex = _combine(path_globs, r"(?:/.*)?\Z")
+        self._dir_cache: Dict[str, bool] = {}
+
+    def matches_name(self, name: str) -> bool:
+        """Check a single file or directory name against the name patterns."""
+        if name in self.names:
+            return True
+        if name.endswith(self._suffixes) or name.startswith(self._prefixes):
+            return True
+        return bool(self._name_regex and self._name_regex.match(name))
+
+    def matches_dir(self, name: str) -> bool:
+        """Check whether a directory with this name is excluded."""
+        if name in self.dir_names or self.matches_name(name):
+            return True
+        return bool(self._dir_regex and self._dir_regex.match(name))
+
+    def matches_entry(self, relative_path: str, name: str, is_dir: bool) -> bool:
+        """
+        Check one entry of a top-down walk.
+
+        Unlike `matches`, this assumes the entry's parent directories were
+        already checked, so only the entry's own name is tested.
+        ``relative_path`` must use forward slashes.
+        """
+        if self._path_regex and self._path_regex.match(relative_path):
+            return True
+        return self.matches_dir(name) if is_dir else self.matches_name(name)
+
+    def matches(self, relative_path: str) -> bool:
+        """
+        Check if a relative file path is excluded.
+
+        Verdicts for parent directories are cached, so paths that share a
+        directory only pay for their own file name.
+        """
+        if os.sep != "/":
+            relative_path = relative_path.replace(os.sep, "/")
+
+        if self._path_regex and self._path_regex.match(relative_path):
+            return True
+
+        parent, _, name = relative_path.rpartition("/")
+        if parent and self._excluded_parent(parent):
+            return True
+        return self.matches_name(name)
+
+    def _excluded_parent(self, parent: str) -> bool:
+        cached = self._dir_cache.get(parent)
+        if cached is None:
+            head, _, name = parent.rpartition("/")
+            cached = (
+                bool(head) and self._excluded_parent(head)
+            ) or self.matches_dir(name)
+            self._dir_cache[parent] = cached
+        return cached
+
+
+def _glob_to_regex(pattern: str) -> str:
+    return re.escape(pattern).replace(r"\*", ".*")
+
+
+def _combine(regexes: Iterable[str], tail: str) -> Optional["re.Pattern[str]"]:
+    regexes = sorted(regexes)
+    if not regexes:
+        return None
+    return re.compile("(?:" + "|".join(regexes) + ")" + tail, re.DOTALL)
@@ -0,0 +1,157 @@
+"""
+Process-pool file pipeline for ``--workers``.
+
+Reading, newline normalization, line and token counting, hashing and record
+encoding run in worker processes, a batch of paths per task. Exact token
+counts saved by earlier runs are looked up in the parent's cache. The parent receives
+finished record bytes and per-file stats in the original file order and
+only has to stitch them into the output.
+"""
+import os
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Deque, Iterator, List, NamedTuple, Optional, Sequence
+
+from ..cache import TokenCacheView
+from .file_utils import file_record, read_source
+from .tokens import ESTIMATE, TokenCounter, get_counter
+
+# Files per task: large enough that pickling and queueing cost little per
+# file, small enough that every worker gets several batches
+MAX_BATCH_FILES = 256
+BATCHES_PER_WORKER = 8
+
+
+class FileResult(NamedTuple):
+    """Outcome of processing one file in a worker."""
+    rel_path: str
+    record: Optional[bytes]
+    size: int
+    lines: int
+    encoding: Optional[str]
+    digest: Optional[str]
+    stat: Optional[os.stat_result]
+    error: Optional[str]
+    seconds: float
+    # Large file left for the parent to stream from a memory map
+    mapped: bool = False
+    tokens: int = 0
+
+
+def process_batch(
+    paths: Sequence[str],
+    search_dir: str,
+    digest: bool,
+    with_stat: bool,
+    mmap_threshold: int = 0,
+    tokenizer: str = ESTIMATE,
+    token_cache: Optional[str] = None
+) -> List[FileResult]:
+    """
+    Read and encode a batch of files. Runs in a worker process.
+
+    Files of at least ``mmap_threshold`` bytes are not read; their result
+    has ``mapped`` set. Token counts are reused per content digest, from
+    the FileCache in the ``token_cache`` directory when one is given.
+    """
+    counter = get_counter(tokenizer)
+    counter.cache = TokenCacheView(Path(token_cache)) if token_cache else None
+    try:
+        return [
+            _process_file(path, search_dir, digest, with_stat, mmap_threshold, counter)
+            for path in paths
+        ]
+    finally:
+        if counter.cache is not None:
+            counter.cache.close()
+            counter.cache = None
+
+
+def _process_file(
+    path: str,
+    search_dir: str,
+    digest: bool,
+    with_stat: bool,
+    mmap_threshold: int,
+    counter: TokenCounter
+) -> FileResult:
+    start = time.perf_counter()
+    rel_path = os.path.relpath(path, search_dir)
+    try:
+        stat = os.stat(path) if with_stat or mmap_threshold else None
+        if mmap_threshold and stat.st_size >= mmap_threshold:
+            return FileResult(
+                rel_path, None, stat.st_size, 0, None, None, stat, None, 0.0, mapped=True
+            )
+        source = read_source(Path(path), digest=digest)
+        # Binary and undecodable files come back without a record
+        record = tokens = None
+        if source.data is not None:
+            record = file_record(rel_path, source.data)
+            tokens = counter.count_file(source.data, source.digest)
+        return FileResult(
+            rel_path, record, source.size, source.lines, source.encoding,
+            source.digest, stat, None, time.perf_counter() - start, tokens=tokens or 0
+        )
+    except Exception as e:
+        return FileResult(
+            rel_path, None, 0, 0, None, None, None, str(e), time.perf_counter() - start
+        )
+
+
+class RecordPool:
+    """
+    Process files on a pool of ``workers`` processes.
+
+    ``results`` yields one FileResult per input file, in input order. At
+    most two batches per worker are in flight, so finished records do not
+    pile up in memory when the consumer (e.g. an upload) is slower.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        search_dir: Path,
+        digest: bool = False,
+        with_stat: bool = False,
+        mmap_threshold: int = 0,
+        tokenizer: str = ESTIMATE,
+        token_cache: Optional[Path] = None
+    ):
+        self.workers = workers
+        self.search_dir = str(search_dir)
+        self.digest = digest
+        self.with_stat = with_stat
+        self.mmap_threshold = mmap_threshold
+        self.tokenizer = tokenizer
+        self.token_cache = str(token_cache) if token_cache else None
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def __enter__(self) -> "RecordPool":
+        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def batch_size(self, total: int) -> int:
+        return max(1, min(MAX_BATCH_FILES, total // (self.workers * BATCHES_PER_WORKER)))
+
+    def results(self, files: Sequence[Path]) -> Iterator[FileResult]:
+        size = self.batch_size(len(files))
+        batches = (
+            [str(file) for file in files[start:start + size]]
+            for start in range(0, len(files), size)
+        )
+        in_flight: Deque[Future] = deque()
+        for batch in batches:
+            if len(in_flight) >= self.workers * 2:
+                yield from in_flight.popleft().result()
+            in_flight.append(self._executor.submit(
+                process_batch, batch, self.search_dir, self.digest, self.with_stat,
+                self.mmap_threshold, self.tokenizer, self.token_cache
+            ))
+        while in_flight:
+            yield from in_flight.popleft().result()
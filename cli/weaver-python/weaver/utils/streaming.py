@@ -0,0 +1,83 @@
+"""
+Streaming upload pipeline: chunks cut while the collection is written are
+uploaded from a background thread while collection continues.
+"""
+import queue
+import threading
+from typing import Callable, Iterable, Iterator, Optional
+
+_DONE = object()
+
+
+class ChunkUploader:
+    """
+    Upload chunks from a background thread through a bounded queue.
+
+    ``send_all`` is called once on the upload thread with an iterator over
+    the queued chunks (e.g. `ChunkSender.send_all`). ``put`` blocks while
+    ``max_pending`` chunks are waiting, so memory stays at about
+    ``max_pending * chunk_size`` however large the collection is. Once
+    ``send_all`` gives up, ``failed`` is set and further chunks are dropped;
+    producers should check it and stop.
+    """
+
+    def __init__(self, send_all: Callable[[Iterable[bytes]], bool], max_pending: int = 4):
+        self.failed = False
+        self._send_all = send_all
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_pending)
+        self._thread: Optional[threading.Thread] = None
+        self._done = False
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="weaver-upload", daemon=True)
+        self._thread.start()
+
+    def put(self, chunk: bytes) -> None:
+        if not self.failed:
+            self._queue.put(chunk)
+
+    def close(self) -> bool:
+        """Wait for queued chunks to be sent. Returns True if all succeeded."""
+        self._queue.put(_DONE)
+        if self._thread:
+            self._thread.join()
+        return not self.failed
+
+    def abort(self) -> None:
+        """
+        Stop uploading without waiting; chunks still queued are discarded.
+
+        The upload thread may be inside a send that is still retrying, so
+        queued chunks are dropped to make room for the stop marker rather
+        than waiting for the thread to take them.
+        """
+        self.failed = True
+        while True:
+            try:
+                self._queue.put_nowait(_DONE)
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def _run(self) -> None:
+        if not self._send_all(self._chunks()):
+            self.failed = True
+        # Keep draining so a producer blocked in put() is released
+        while not self._done:
+            self._next()
+
+    def _chunks(self) -> Iterator[bytes]:
+        while not self.failed:
+            chunk = self._next()
+            if chunk is _DONE:
+                return
+            yield chunk
+
+    def _next(self):
+        chunk = self._queue.get()
+        if chunk is _DONE:
+            self._done = True
+        return chunk
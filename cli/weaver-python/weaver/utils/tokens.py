@@ -0,0 +1,143 @@
+"""
+Token counts for collected files.
+
+By default tokens are estimated from byte classes (word characters,
+punctuation runs, newlines, non-ASCII bytes) counted with a few
+bytes.translate and bytes.count passes, so the estimate runs at C speed
+without reading the text as str. An exact count is used when a tokenizer
+backend is installed and asked for:
+
+- ``tiktoken`` or ``tiktoken:<encoding>`` with the optional ``tiktoken`` package
+- a path to a ``tokenizer.json`` file with the optional ``tokenizers`` package
+"""
+import functools
+import hashlib
+import string
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+try:
+    import tiktoken
+except ImportError:  # optional dependency
+    tiktoken = None
+
+try:
+    import tokenizers
+except ImportError:  # optional dependency
+    tokenizers = None
+
+ESTIMATE = "estimate"
+DEFAULT_TIKTOKEN_ENCODING = "cl100k_base"
+
+# Word characters map to one byte and everything else to another, and a
+# second table marks punctuation (not word, blank or non-ASCII) the same way
+_WORD_BYTES = (string.ascii_letters + string.digits + "_").encode()
+_NOT_PUNCT = _WORD_BYTES + b" \t\r\n\x0b\x0c" + bytes(range(0x80, 0x100))
+_WORDS = bytes(ord("a") if byte in _WORD_BYTES else ord(" ") for byte in range(256))
+_PUNCT = bytes(ord(" ") if byte in _NOT_PUNCT else ord(".") for byte in range(256))
+_HIGH_BYTES = bytes(range(0x80, 0x100))
+
+# Tokens per word byte, punctuation run, newline and non-ASCII byte, fitted
+# by least squares (relative error) against a BPE tokenizer on ~1,800
+# source files in 15 languages; see benchmarks/bench_tokens.py
+_WORD_WEIGHT = 0.249
+_PUNCT_RUN_WEIGHT = 1.227
+_NEWLINE_WEIGHT = 0.543
+_HIGH_WEIGHT = 0.643
+
+
+def estimate_tokens(data: bytes) -> int:
+    """Estimate the number of tokens in UTF-8 source text."""
+    if not data:
+        return 0
+    punct = data.translate(_PUNCT)
+    estimate = (
+        _WORD_WEIGHT * data.translate(_WORDS).count(b"a")
+        + _PUNCT_RUN_WEIGHT * (punct.count(b" .") + punct.startswith(b"."))
+        + _NEWLINE_WEIGHT * data.count(b"\n")
+    )
+    if not data.isascii():
+        estimate += _HIGH_WEIGHT * (len(data) - len(data.translate(None, _HIGH_BYTES)))
+    return max(1, round(estimate))
+
+
+def check_tokenizer(name: str) -> None:
+    """Raise ValueError if the tokenizer ``name`` cannot be used here."""
+    if name == ESTIMATE:
+        return
+    if name == "tiktoken" or name.startswith("tiktoken:"):
+        if tiktoken is None:
+            raise ValueError("The tiktoken tokenizer needs the 'tiktoken' package")
+        return
+    if tokenizers is None:
+        raise ValueError(f"Tokenizer file {name} needs the 'tokenizers' package")
+    if not Path(name).is_file():
+        raise ValueError(
+            f"Unknown tokenizer {name!r}: expected estimate, tiktoken[:encoding] "
+            "or a tokenizer.json path"
+        )
+
+
+def _load_backend(name: str) -> Callable[[str], int]:
+    check_tokenizer(name)
+    if name.startswith("tiktoken"):
+        encoding = tiktoken.get_encoding(name.partition(":")[2] or DEFAULT_TIKTOKEN_ENCODING)
+        return lambda text: len(encoding.encode_ordinary(text))
+    tokenizer = tokenizers.Tokenizer.from_file(name)
+    return lambda text: len(tokenizer.encode(text, add_special_tokens=False).ids)
+
+
+class TokenCounter:
+    """
+    Count tokens with the estimator or an exact tokenizer.
+
+    Counts of whole files are kept per content digest, in memory and in the
+    FileCache when one is attached, so unchanged or duplicate contents are
+    not tokenized again.
+    """
+
+    def __init__(self, tokenizer: str = ESTIMATE):
+        self.name = tokenizer
+        self.exact = tokenizer != ESTIMATE
+        self.cache = None
+        self._backend: Optional[Callable[[str], int]] = None
+        self._counts: Dict[str, int] = {}
+
+    def count(self, data: bytes) -> int:
+        """Count the tokens in UTF-8 ``data``, without caching."""
+        if not self.exact:
+            return estimate_tokens(data)
+        if self._backend is None:
+            self._backend = _load_backend(self.name)
+        # Blocks of a streamed file may end inside a character
+        return self._backend(data.decode("utf-8", errors="ignore"))
+
+    def cached(self, digest: str) -> Optional[int]:
+        count = self._counts.get(digest)
+        if count is None and self.cache is not None:
+            count = self.cache.get_tokens(digest, self.name)
+        return count
+
+    def remember(self, digest: str, count: int) -> None:
+        self._counts[digest] = count
+        if self.cache is not None:
+            self.cache.put_tokens(digest, self.name, count)
+
+    def count_file(self, data: bytes, digest: Optional[str] = None) -> int:
+        """Count a whole file's tokens, reusing the count for known contents."""
+        if digest is None:
+            if not self.exact:
+                # Estimating is cheaper than hashing
+                return estimate_tokens(data)
+            digest = hashlib.sha256(data).hexdigest()
+        count = self.cached(digest)
+        if count is None:
+            count = self.count(data)
+            self.remember(digest, count)
+        return count
+
+
+@functools.lru_cache(maxsize=None)
+def get_counter(tokenizer: str) -> TokenCounter:
+    """A TokenCounter shared within this process, e.g. by a pool worker."""
+    return TokenCounter(tokenizer)
@@ -1,24 +1,28 @@
-import { useState, useEffect, useCallback } from "react";
+import { useState, useEffect, useMemo, useRef } from "react";
 import { Socket } from "socket.io-client";
 import { Loader } from "lucide-react";
 import { Header } from "./components/Header";
 import { MessageList } from "./components/MessageList";
 import { Footer } from "./components/Footer";
-import { TextData, ExpandedState } from "./types/types";
+import { TextData, ExpandedState, ContentState, SortOrder } from "./types/types";
 import { ApiService } from "./services/ApiService";
 
 export default function App() {
   const [texts, setTexts] = useState<TextData[]>([]);
-  const [filteredTexts, setFilteredTexts] = useState<TextData[]>([]);
+  const [nextCursor, setNextCursor] = useState<number | null>(null);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
+  const [contents, setContents] = useState<ContentState>({});
   const [error, setError] = useState<string>("");
   const [isLoading, setIsLoading] = useState(true);
   const [isConnected, setIsConnected] = useState(false);
   const [expandedStates, setExpandedStates] = useState<ExpandedState>({});
   const [searchTerm, setSearchTerm] = useState("");
-  const [sortOrder, setSortOrder] = useState<"newest" | "oldest">("newest");
+  const [sortOrder, setSortOrder] = useState<SortOrder>("newest");
   const [darkMode, setDarkMode] = useState(false);
   const [selectedMessage, setSelectedMessage] = useState<number | null>(null);
   const [, setSocket] = useState<Socket | null>(null);
+  // Content fetches, finished or in flight, by text id
+  const contentRequests = useRef(new Map<number, Promise<string>>());
 
   const handleMessageClick = (e: React.MouseEvent, id: number) => {
     if (!(e.target as HTMLElement).closest(".message-content")) {
@@ -28,32 +32,75 @@ export default function App() {
   };
 
   const toggleExpand = (id: number) => {
+    if (!expandedStates[id]) {
+      loadContent(id).catch(() => {});
+    }
     setExpandedStates((prev) => ({ ...prev, [id]: !prev[id] }));
   };
 
-  const handleSearch = useCallback(
-    (value: string) => {
-      setSearchTerm(value);
-      const filtered = texts.filter(
-        (text) =>
-          text.content.toLowerCase().includes(value.toLowerCase()) ||
-          text.id.toString().includes(value)
+  // Content is not part of the listing; it is streamed in when first needed,
+  // and shown as it arrives
+  const loadContent = (id: number): Promise<string> => {
+    let request = contentRequests.current.get(id);
+    if (!request) {
+      request = ApiService.fetchContent(id, (received) =>
+        setContents((prev) => ({ ...prev, [id]: received }))
       );
-      setFilteredTexts(filtered);
-    },
-    [texts]
-  );
+      contentRequests.current.set(id, request);
+      request.then(
+        (content) => setContents((prev) => ({ ...prev, [id]: content })),
+        (error) => {
+          contentRequests.current.delete(id);
+          setError(
+            error instanceof Error ? error.message : "Failed to load message content"
+          );
+        }
+      );
+    }
+    return request;
+  };
+
+  const handleSearch = (value: string) => {
+    setSearchTerm(value);
+  };
+
+  // Only contents already loaded can be searched; ids always can
+  const filteredTexts = useMemo(() => {
+    if (!searchTerm) return texts;
+    const term = searchTerm.toLowerCase();
+    return texts.filter(
+      (text) =>
+        text.id.toString().includes(searchTerm) ||
+        contents[text.id]?.toLowerCase().includes(term)
+    );
+  }, [texts, contents, searchTerm]);
 
   const toggleSortOrder = () => {
     setSortOrder((prev) => (prev === "newest" ? "oldest" : "newest"));
   };
 
-  const sortTexts = (textsToSort: TextData[]) => {
-    return [...textsToSort].sort((a, b) => {
-      const comparison =
-        new Date(b.created_at).getTime() - new Date(a.created_at).getTime();
-      return sortOrder === "newest" ? comparison : -comparison;
-    });
+  const loadMore = async () => {
+    if (nextCursor === null || isLoadingMore) return;
+    setIsLoadingMore(true);
+    try {
+      const page = await ApiService.fetchTexts(sortOrder, nextCursor);
+      setTexts((prev) => [...prev, ...page.texts]);
+      setNextCursor(page.next);
+    } catch (error) {
+      setError(error instanceof Error ? error.message : "Unknown error occurred");
+    } finally {
+      setIsLoadingMore(false);
+    }
+  };
+
+  // A text stored while the list is open goes first when newest first, or
+  // last once every older page is loaded
+  const addText = (text: TextData) => {
+    if (sortOrder === "newest") {
+      setTexts((prev) => [text, ...prev.filter((other) => other.id !== text.id)]);
+    } else if (nextCursor === null) {
+      setTexts((prev) => [...prev.filter((other) => other.id !== text.id), text]);
+    }
   };
 
   // Initialize WebSocket connection
@@ -72,27 +119,41 @@ export default function App() {
       console.error("WebSocket connection error:", error);
     });
 
-    newSocket.on("newText", (newText: TextData) => {
-      setTexts((prevTexts) => {
-        const updatedTexts = Array.isArray(prevTexts)
-          ? [newText, ...prevTexts]
-          : [newText];
-        return updatedTexts;
-      });
-    });
-
     return () => {
       newSocket.disconnect();
     };
   }, []);
 
-  // Fetch initial texts
+  useEffect(() => {
+    const socket = ApiService.initializeSocket();
+
+    // Single uploads arrive with their content
+    const onNewText = ({ content, ...text }: TextData & { content: string }) => {
+      contentRequests.current.set(text.id, Promise.resolve(content));
+      setContents((prev) => ({ ...prev, [text.id]: content }));
+      addText(text);
+    };
+    // Chunks of a collection, and collections joined from batches, are
+    // announced without their content
+    const onSummary = (text: TextData) => addText(text);
+
+    socket.on("newText", onNewText);
+    socket.on("newChunk", onSummary);
+    socket.on("collectionReady", onSummary);
+    return () => {
+      socket.off("newText", onNewText);
+      socket.off("newChunk", onSummary);
+      socket.off("collectionReady", onSummary);
+    };
+  });
+
+  // Fetch the first page, again whenever the order changes
   useEffect(() => {
     const fetchInitialTexts = async () => {
       try {
-        const data = await ApiService.fetchTexts();
-        setTexts(data);
-        setFilteredTexts(data);
+        const page = await ApiService.fetchTexts(sortOrder);
+        setTexts(page.texts);
+        setNextCursor(page.next);
       } catch (error) {
         console.error("Error fetching texts:", error);
         setError(
@@ -104,12 +165,7 @@ export default function App() {
     };
 
     fetchInitialTexts();
-  }, []);
-
-  // Update filtered texts when sort order changes
-  useEffect(() => {
-    setFilteredTexts(sortTexts(searchTerm ? filteredTexts : texts));
-  }, [sortOrder, texts, searchTerm]);
+  }, [sortOrder]);
 
   if (isLoading) {
     return (
@@ -162,10 +218,15 @@ export default function App() {
         darkMode={darkMode}
         error={error}
         filteredTexts={filteredTexts}
+        contents={contents}
+        loadContent={loadContent}
         expandedStates={expandedStates}
         selectedMessage={selectedMessage}
         handleMessageClick={handleMessageClick}
         searchTerm={searchTerm}
+        hasMore={nextCursor !== null}
+        isLoadingMore={isLoadingMore}
+        loadMore={loadMore}
       />
       <Footer darkMode={darkMode} />
     </div>
@@ -2,10 +2,11 @@ import { useState, useEffect } from "react";
 import { Copy, Check } from "lucide-react";
 
 const CopyButton = ({
-  text,
+  getText,
   darkMode,
 }: {
-  text: string;
+  // Content may have to be fetched first
+  getText: () => Promise<string>;
   darkMode: boolean;
 }) => {
   const [copied, setCopied] = useState(false);
@@ -29,7 +30,7 @@ const CopyButton = ({
   const handleCopy = async (e: React.MouseEvent) => {
     e.stopPropagation();
     try {
-      await navigator.clipboard.writeText(text);
+      await navigator.clipboard.writeText(await getText());
       setCopied(true);
     } catch (err) {
       console.error("Failed to copy text:", err);
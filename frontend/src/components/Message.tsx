@@ -5,12 +5,16 @@ import { MessageHeader } from "./MessageHeader";
 
 export const Message = ({
   text,
+  content,
+  loadContent,
   darkMode,
   isExpanded,
   isSelected,
   onClick,
 }: {
   text: TextData;
+  content: string | undefined;
+  loadContent: (id: number) => Promise<string>;
   darkMode: boolean;
   isExpanded: boolean;
   isSelected: boolean;
@@ -33,9 +37,9 @@ export const Message = ({
     >
       <MessageHeader text={text} darkMode={darkMode} />
       <div className="flex items-center space-x-2 flex-shrink-0">
-        <CopyButton text={text.content} darkMode={darkMode} />
+        <CopyButton getText={() => loadContent(text.id)} darkMode={darkMode} />
       </div>
     </div>
-    {isExpanded && <MessageContent text={text} darkMode={darkMode} />}
+    {isExpanded && <MessageContent content={content} darkMode={darkMode} />}
   </div>
 );
@@ -1,11 +1,11 @@
-import { TextData } from "../types/types";
 import { formatContent } from "../utils/formatters";
 
 export const MessageContent = ({
-  text,
+  content,
   darkMode,
 }: {
-  text: TextData;
+  // Undefined until the first of the content arrives
+  content: string | undefined;
   darkMode: boolean;
 }) => (
   <div
@@ -19,7 +19,7 @@ export const MessageContent = ({
       } font-medium leading-relaxed`}
       onClick={(e) => e.stopPropagation()}
     >
-      {formatContent(text.content)}
+      {content === undefined ? "Loading..." : formatContent(content)}
     </div>
   </div>
 );
@@ -1,5 +1,5 @@
 import { TextData } from "../types/types";
-import { formatDate } from "../utils/formatters";
+import { formatBytes, formatDate } from "../utils/formatters";
 
 export const MessageHeader = ({
   text,
@@ -20,6 +20,14 @@ export const MessageHeader = ({
       >
         {formatDate(text.created_at)}
       </span>
+      <span
+        className={`${
+          darkMode ? "text-gray-400" : "text-gray-500"
+        } text-sm truncate`}
+      >
+        {text.file_count === 1 ? "1 file" : `${text.file_count} files`} ·{" "}
+        {formatBytes(text.size)}
+      </span>
     </div>
   </div>
 );
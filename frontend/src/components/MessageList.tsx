@@ -1,4 +1,4 @@
-import { ExpandedState, TextData } from "../types/types";
+import { ContentState, ExpandedState, TextData } from "../types/types";
 import { EmptyState } from "./EmptyState";
 import { ErrorMessage } from "./ErrorMessage";
 import { Message } from "./Message";
@@ -7,18 +7,28 @@ export const MessageList = ({
   darkMode,
   error,
   filteredTexts,
+  contents,
+  loadContent,
   expandedStates,
   selectedMessage,
   handleMessageClick,
-  searchTerm
+  searchTerm,
+  hasMore,
+  isLoadingMore,
+  loadMore
 }: {
   darkMode: boolean;
   error: string;
   filteredTexts: TextData[];
+  contents: ContentState;
+  loadContent: (id: number) => Promise<string>;
   expandedStates: ExpandedState;
   selectedMessage: number | null;
   handleMessageClick: (e: React.MouseEvent, id: number) => void;
   searchTerm: string;
+  hasMore: boolean;
+  isLoadingMore: boolean;
+  loadMore: () => void;
 }) => (
   <main className="max-w-6xl mx-auto py-6 px-4">
     {error && <ErrorMessage error={error} darkMode={darkMode} />}
@@ -28,6 +38,8 @@ export const MessageList = ({
           <Message
             key={text.id}
             text={text}
+            content={contents[text.id]}
+            loadContent={loadContent}
             darkMode={darkMode}
             isExpanded={expandedStates[text.id]}
             isSelected={selectedMessage === text.id}
@@ -37,6 +49,19 @@ export const MessageList = ({
       ) : (
         <EmptyState darkMode={darkMode} searchTerm={searchTerm} />
       )}
+      {hasMore && (
+        <button
+          onClick={loadMore}
+          disabled={isLoadingMore}
+          className={`w-full py-3 rounded-xl border text-sm font-medium ${
+            darkMode
+              ? "bg-gray-800/90 border-gray-700 text-indigo-400 hover:bg-gray-700"
+              : "bg-white/80 border-indigo-100 text-indigo-600 hover:border-indigo-300 hover:bg-indigo-50"
+          } transition-all duration-200 disabled:opacity-60`}
+        >
+          {isLoadingMore ? "Loading..." : "Load more messages"}
+        </button>
+      )}
     </div>
   </main>
 );
\ No newline at end of file
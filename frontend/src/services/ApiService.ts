@@ -1,9 +1,10 @@
 import { io, Socket } from "socket.io-client";
-import { TextData } from "../types/types";
+import { SortOrder, TextData, TextPage } from "../types/types";
 
 console.log(process.env.REACT_APP_API_URL);
 
 const API_URL = process.env.REACT_APP_API_URL || "http://localhost:4000";
+const PAGE_SIZE = 50;
 
 export class ApiService {
   private static socket: Socket | null = null;
@@ -30,20 +31,50 @@ export class ApiService {
     return this.socket;
   }
 
-  static async fetchTexts(): Promise<TextData[]> {
+  static async fetchTexts(
+    order: SortOrder = "newest",
+    cursor: number | null = null
+  ): Promise<TextPage> {
     try {
-      const response = await fetch(`${API_URL}/api/texts`);
+      const params = new URLSearchParams({ order, limit: String(PAGE_SIZE) });
+      if (cursor !== null) params.set("cursor", String(cursor));
+      const response = await fetch(`${API_URL}/api/texts?${params}`);
       if (!response.ok) {
         throw new Error(`HTTP error! status: ${response.status}`);
       }
-      const data = await response.json();
-      return data;
+      return await response.json();
     } catch (error) {
       console.error("Error fetching texts:", error);
       throw error;
     }
   }
 
+  // Streams a text's content; onProgress gets the text received so far
+  static async fetchContent(
+    id: number,
+    onProgress?: (content: string) => void
+  ): Promise<string> {
+    try {
+      const response = await fetch(`${API_URL}/api/texts/${id}/content`);
+      if (!response.ok || !response.body) {
+        throw new Error(`HTTP error! status: ${response.status}`);
+      }
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let content = "";
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        content += decoder.decode(value, { stream: true });
+        onProgress?.(content);
+      }
+      return content + decoder.decode();
+    } catch (error) {
+      console.error("Error fetching content:", error);
+      throw error;
+    }
+  }
+
   static async postText(content: string): Promise<TextData> {
     try {
       const response = await fetch(`${API_URL}/api/text`, {
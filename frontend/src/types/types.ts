@@ -1,9 +1,25 @@
+// A stored text as listed: its content is fetched separately, on demand
 export interface TextData {
   id: number;
-  content: string;
   created_at: string;
+  collection_id?: string | null;
+  // Bytes of content and number of files collected in it
+  size: number;
+  file_count: number;
 }
 
+export interface TextPage {
+  texts: TextData[];
+  // Cursor of the next page, or null on the last one
+  next: number | null;
+}
+
+export type SortOrder = "newest" | "oldest";
+
 export interface ExpandedState {
   [key: number]: boolean;
 }
+
+export interface ContentState {
+  [key: number]: string;
+}
@@ -7,6 +7,17 @@ export const formatContent = (content: string) => {
   ));
 };
 
+export const formatBytes = (bytes: number) => {
+  const units = ["B", "KB", "MB", "GB"];
+  let value = bytes;
+  let unit = 0;
+  while (value >= 1024 && unit < units.length - 1) {
+    value /= 1024;
+    unit++;
+  }
+  return `${unit === 0 ? value : value.toFixed(1)} ${units[unit]}`;
+};
+
 export const formatDate = (dateString: string) => {
   const date = new Date(dateString);
   const now = new Date();